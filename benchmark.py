@@ -0,0 +1,441 @@
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+from wikipedia_fastapi import WikipediaService, create_http_session
+from wiki_text import html_to_text, clean_wiki_content
+from wiki_index import LocalSearchIndex
+
+# Kaydedilmiş sayfa HTML'lerinin bulunduğu klasör (corpus komutuyla doldurulur)
+BENCHMARK_CORPUS_DIR = "benchmark_corpus"
+# Derlenmiş temizleyici eski regex zincirinin bu oranından yavaşsa ölçüm başarısız sayılır
+CLEAN_MIN_SPEED_RATIO = 1.2
+# Temizleme ölçümünde metinler en az bu boyuta kadar tekrarlanır (büyük makale benzetimi)
+CLEAN_MIN_DOCUMENT_BYTES = 300 * 1024
+# Açılış ölçümünün eşikleri (sn): modülün içe aktarılması ve sunucunun ilk yanıtı
+STARTUP_MAX_IMPORT_SECONDS = 1.0
+STARTUP_MAX_FIRST_RESPONSE_SECONDS = 3.0
+# Açılışta yüklenmemesi gereken (ilk kullanımda yüklenen) ağır modüller
+STARTUP_LAZY_MODULES = ["google.generativeai"]
+# İlk yanıt ölçümünde istenen, Wikipedia'ya gitmeyen uç nokta
+STARTUP_PROBE_PATH = "/pool/stats"
+
+
+class CountingSession:
+    """
+    HTTP oturumunu sarar, yapılan istek sayısını ve indirilen bayt miktarını sayar
+    """
+    def __init__(self, session):
+        self.session = session
+        self.calls = 0
+        self.bytes = 0
+
+    def get(self, *args, **kwargs):
+        response = self.session.get(*args, **kwargs)
+        self.calls += 1
+        self.bytes += len(response.content)
+        return response
+
+    def reset(self):
+        self.calls = 0
+        self.bytes = 0
+
+
+def measure(func, *args, repeat=3):
+    """
+    Fonksiyonu verilen sayıda çalıştırır
+    :return: (son sonuç, en iyi süre (sn))
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def benchmark_content(title, language="tr", repeat=3, session=None):
+    """
+    Tam içerik alma yollarını karşılaştırır: bölüm başına parse istekleri
+    (get_full_content_per_section) ve tek parse isteği (get_full_content_by_title)
+    :return: Yol adı -> ölçüm sözlüğü
+    """
+    counter = CountingSession(session if session is not None else create_http_session())
+    service = WikipediaService(language=language, session=counter)
+
+    report = {}
+    for name, func in (
+        ("per_section", service.get_full_content_per_section),
+        ("whole_page", service.get_full_content_by_title),
+    ):
+        counter.reset()
+        content, best = measure(func, title, repeat=repeat)
+        report[name] = {
+            "calls": counter.calls // repeat,
+            "bytes": counter.bytes // repeat,
+            "seconds": best,
+            "words": len(content.split()),
+            "sections": content.count("\n## ")
+        }
+    return report
+
+
+def legacy_html_to_text(html_content):
+    """
+    Eski regex zinciri; html_to_text ölçümünde karşılaştırma için korunur
+    """
+    html_content = re.sub(r'<style[^>]*>.*?</style>', ' ', html_content, flags=re.DOTALL)
+    html_content = re.sub(r'\.mw-parser-output\s+\.[^{]+\{[^}]+\}', ' ', html_content)
+    text = re.sub(r'<[^>]+>', ' ', html_content)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.replace('&nbsp;', ' ')
+    text = text.replace('&lt;', '<')
+    text = text.replace('&gt;', '>')
+    text = text.replace('&amp;', '&')
+    text = text.replace('&quot;', '"')
+    text = text.replace('&apos;', "'")
+    return text.strip()
+
+
+def legacy_clean_wiki_content(content):
+    """
+    Eski temizleme zinciri; clean_wiki_content ölçümünde karşılaştırma için korunur
+    """
+    content = re.sub(r'\[\s*değiştir\s*\|\s*kaynağı\s*değiştir\s*\]', '', content)
+    content = re.sub(r'\[\s*edit\s*\|\s*edit source\s*\]', '', content)
+    content = re.sub(r'\(\s*[Dd]üzenle\s*\)', '', content)
+    content = re.sub(r'\(\s*[Ee]dit\s*\)', '', content)
+    content = re.sub(r'\.mw-parser-output\s+\.[^{]+\{[^}]+\}', '', content)
+    content = re.sub(r'Dosya:[^\]]+\]', '', content)
+    content = re.sub(r'File:[^\]]+\]', '', content)
+    content = re.sub(r'Media:[^\]]+\]', '', content)
+    content = re.sub(r'\[\d+\]', '', content)
+    content = re.sub(r'\n{3,}', '\n\n', content)
+    return content
+
+
+def load_corpus(corpus_dir=BENCHMARK_CORPUS_DIR, with_titles=False):
+    """
+    Kaydedilmiş sayfa HTML'lerini okur
+    :param with_titles: Dosya adından çözülen sayfa başlığı da döndürülsün mü
+    :return: [(dil kodu, HTML), ...] veya [(dil kodu, başlık, HTML), ...]
+    """
+    documents = []
+    for file_name in sorted(os.listdir(corpus_dir)):
+        if file_name.endswith(".html"):
+            with open(os.path.join(corpus_dir, file_name), encoding="utf-8") as f:
+                language, _, quoted_title = file_name[:-len(".html")].partition("_")
+                if with_titles:
+                    title = urllib.parse.unquote(quoted_title).replace("_", " ")
+                    documents.append((language, title, f.read()))
+                else:
+                    documents.append((language, f.read()))
+    return documents
+
+
+def save_corpus(titles, language="tr", corpus_dir=BENCHMARK_CORPUS_DIR, session=None):
+    """
+    Sayfaların action=parse HTML'ini ölçüm için diske kaydeder
+    :param titles: Sayfa başlıkları
+    :return: Kaydedilen dosya yolları
+    """
+    session = session if session is not None else create_http_session()
+    service = WikipediaService(language=language, session=session)
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    paths = []
+    for title in titles:
+        data = service._api_get({
+            "action": "parse",
+            "page": title,
+            "prop": "text",
+            "formatversion": 2,
+            "redirects": 1
+        })
+        if "parse" not in data:
+            print(f"'{title}' alınamadı: {data.get('error', {}).get('info', 'bilinmeyen hata')}")
+            continue
+        file_name = f"{language}_{urllib.parse.quote(title.replace(' ', '_'), safe='')}.html"
+        path = os.path.join(corpus_dir, file_name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data["parse"]["text"])
+        paths.append(path)
+    return paths
+
+
+def benchmark_html(corpus_dir=BENCHMARK_CORPUS_DIR, repeat=3):
+    """
+    Kaydedilmiş sayfalar üzerinde HTML -> metin dönüştürücülerinin hızını (MB/sn) ölçer
+    :return: Dönüştürücü adı -> ölçüm sözlüğü
+    """
+    documents = [document for _, document in load_corpus(corpus_dir)]
+    total_bytes = sum(len(document.encode("utf-8")) for document in documents)
+
+    def convert_all(func):
+        return [func(document) for document in documents]
+
+    report = {}
+    for name, func in (("legacy", legacy_html_to_text), ("single_pass", html_to_text)):
+        texts, best = measure(convert_all, func, repeat=repeat)
+        report[name] = {
+            "pages": len(documents),
+            "bytes": total_bytes,
+            "seconds": best,
+            "mb_per_second": total_bytes / (1024 * 1024) / best if best else 0.0,
+            "words": sum(len(text.split()) for text in texts),
+            "paragraphs": sum(text.count("\n\n") + 1 for text in texts if text)
+        }
+    return report
+
+
+def benchmark_clean(corpus_dir=BENCHMARK_CORPUS_DIR, repeat=3, min_ratio=CLEAN_MIN_SPEED_RATIO):
+    """
+    Kaydedilmiş sayfaların düz metni üzerinde eski temizleme zinciri ile derlenmiş
+    temizleyicinin hızını (MB/sn) karşılaştırır. Kısa metinler büyük makaleleri
+    temsil etmesi için CLEAN_MIN_DOCUMENT_BYTES boyutuna kadar tekrarlanır.
+    :return: (ölçüm sözlüğü, eşik aşıldıysa True)
+    """
+    documents = []
+    for language, document in load_corpus(corpus_dir):
+        text = html_to_text(document)
+        if not text:
+            continue
+        copies = -(-CLEAN_MIN_DOCUMENT_BYTES // len(text.encode("utf-8")))
+        documents.append((language, "\n\n".join([text] * copies)))
+    total_bytes = sum(len(text.encode("utf-8")) for _, text in documents)
+
+    def clean_all(func):
+        return [func(text, language) for language, text in documents]
+
+    report = {}
+    for name, func in (
+        ("legacy", lambda text, language: legacy_clean_wiki_content(text)),
+        ("compiled", clean_wiki_content),
+    ):
+        _, best = measure(clean_all, func, repeat=repeat)
+        report[name] = {
+            "documents": len(documents),
+            "bytes": total_bytes,
+            "seconds": best,
+            "mb_per_second": total_bytes / (1024 * 1024) / best if best else 0.0
+        }
+    legacy_speed = report["legacy"]["mb_per_second"]
+    ratio = report["compiled"]["mb_per_second"] / legacy_speed if legacy_speed else 0.0
+    report["compiled"]["speed_ratio"] = ratio
+    return report, ratio >= min_ratio
+
+
+def benchmark_local_search(queries, corpus_dir=BENCHMARK_CORPUS_DIR, repeat=20):
+    """
+    Kaydedilmiş sayfalarla bellek içi bir yerel dizin kurar ve sorgu sürelerini ölçer
+    :param queries: Arama sorguları
+    :return: Sorgu -> ölçüm sözlüğü
+    """
+    index = LocalSearchIndex(db_path=None)
+    languages = set()
+    for page_id, (language, title, document) in enumerate(load_corpus(corpus_dir, with_titles=True), start=1):
+        content = clean_wiki_content(f"# {title}\n\n" + html_to_text(document), language)
+        index.add_page(language, page_id, title=title, content=content)
+        languages.add(language)
+    documents = index.get_stats()["documents"]
+
+    report = {}
+    for query in queries:
+        results = 0
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = sum(len(index.search(language, query, limit=10)) for language in languages)
+            timings.append((time.perf_counter() - start) / len(languages))
+        timings.sort()
+        report[query] = {
+            "documents": documents,
+            "results": results,
+            "median_ms": timings[len(timings) // 2] * 1000,
+            "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000
+        }
+    index.close()
+    return report
+
+
+def startup_environment(directory):
+    """
+    Ölçülen sürecin önbelleklerini geçici klasöre yönlendirir ve bağlantı ön ısıtmasını kapatır
+    """
+    env = dict(os.environ)
+    env.update({
+        "WIKI_CONTENT_CACHE_DB": os.path.join(directory, "wiki_cache.sqlite3"),
+        "WIKI_SEARCH_INDEX_DB": os.path.join(directory, "wiki_index.sqlite3"),
+        "WIKI_IMAGE_CACHE_DIR": os.path.join(directory, "image_cache"),
+        "WIKI_REPORT_DIR": os.path.join(directory, "reports"),
+        "WIKI_PREWARM_LANGUAGES": ""
+    })
+    return env
+
+
+def measure_import(env):
+    """
+    Yeni bir yorumlayıcıda wikipedia_fastapi modülünün içe aktarılma süresini ölçer
+    :return: (süre, açılışta yüklenen tembel modüller listesi)
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import wikipedia_fastapi\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [name for name in {STARTUP_LAZY_MODULES!r} if name in sys.modules]\n"
+        "print(elapsed, ','.join(loaded))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout.split()
+    return float(output[0]), output[1].split(",") if len(output) > 1 else []
+
+
+def measure_first_response(env, timeout=30.0):
+    """
+    uvicorn ile sunucuyu başlatır, süreç başlangıcından ilk başarılı yanıta kadar geçen süreyi ölçer
+    :return: Süre (sn)
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}{STARTUP_PROBE_PATH}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "wikipedia_fastapi:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Sunucu başlatılamadı (çıkış kodu {process.returncode})")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Sunucu zaman aşımına kadar yanıt vermedi")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def benchmark_startup(repeat=3):
+    """
+    Modülün içe aktarılma süresini ve sunucunun ilk yanıt süresini (time-to-first-response)
+    yeni süreçlerde ölçer; ağır entegrasyonların açılışta yüklenip yüklenmediğini kontrol eder
+    :return: (ölçüm sözlüğü, eşikler aşılmadıysa True)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        env = startup_environment(directory)
+        imports = [measure_import(env) for _ in range(repeat)]
+        first_responses = sorted(measure_first_response(env) for _ in range(repeat))
+    import_times = sorted(seconds for seconds, _ in imports)
+    eager_modules = sorted({name for _, loaded in imports for name in loaded})
+    report = {
+        "import": {
+            "median_seconds": import_times[len(import_times) // 2],
+            "best_seconds": import_times[0],
+            "eager_modules": ", ".join(eager_modules) or "-"
+        },
+        "first_response": {
+            "median_seconds": first_responses[len(first_responses) // 2],
+            "best_seconds": first_responses[0]
+        }
+    }
+    passed = (
+        report["import"]["median_seconds"] <= STARTUP_MAX_IMPORT_SECONDS
+        and report["first_response"]["median_seconds"] <= STARTUP_MAX_FIRST_RESPONSE_SECONDS
+        and not eager_modules
+    )
+    return report, passed
+
+
+def print_report(report):
+    for name, values in report.items():
+        print(f"{name}:")
+        for key, value in values.items():
+            if isinstance(value, float):
+                print(f"   {key}: {value:.4f}")
+            else:
+                print(f"   {key}: {value}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Kullanım: python3 benchmark.py content <sayfa_başlığı> [dil_kodu] [tekrar]")
+        print("          python3 benchmark.py corpus <dil_kodu> <sayfa_başlığı> [sayfa_başlığı...]")
+        print("          python3 benchmark.py html [klasör] [tekrar]")
+        print("          python3 benchmark.py clean [klasör] [tekrar]")
+        print("          python3 benchmark.py local-search <sorgu> [sorgu...]")
+        print("          python3 benchmark.py startup [tekrar]")
+        print("Örnek: python3 benchmark.py content 'Göreme' tr 3")
+        print("Örnek: python3 benchmark.py corpus tr 'Göreme' 'Kapadokya' 'Ürgüp'")
+        return
+
+    command = sys.argv[1]
+    if command == "content" and len(sys.argv) > 2:
+        title = sys.argv[2]
+        language = sys.argv[3] if len(sys.argv) > 3 else "tr"
+        repeat = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+        print(f"'{title}' için içerik alma yolları karşılaştırılıyor...")
+        print_report(benchmark_content(title, language, repeat))
+    elif command == "corpus" and len(sys.argv) > 3:
+        language = sys.argv[2]
+        paths = save_corpus(sys.argv[3:], language)
+        print(f"{len(paths)} sayfa '{BENCHMARK_CORPUS_DIR}' klasörüne kaydedildi")
+    elif command == "html":
+        corpus_dir = sys.argv[2] if len(sys.argv) > 2 else BENCHMARK_CORPUS_DIR
+        repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+        if not os.path.isdir(corpus_dir):
+            print(f"Klasör bulunamadı: {corpus_dir} (önce corpus komutunu çalıştırın)")
+            return
+        print(f"'{corpus_dir}' üzerinde HTML dönüştürücüleri karşılaştırılıyor...")
+        print_report(benchmark_html(corpus_dir, repeat))
+    elif command == "clean":
+        corpus_dir = sys.argv[2] if len(sys.argv) > 2 else BENCHMARK_CORPUS_DIR
+        repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+        if not os.path.isdir(corpus_dir):
+            print(f"Klasör bulunamadı: {corpus_dir} (önce corpus komutunu çalıştırın)")
+            return
+        print(f"'{corpus_dir}' üzerinde içerik temizleyicileri karşılaştırılıyor...")
+        report, passed = benchmark_clean(corpus_dir, repeat)
+        print_report(report)
+        if not passed:
+            print(f"Performans gerilemesi: derlenmiş temizleyici eşik oranın ({CLEAN_MIN_SPEED_RATIO}) altında")
+            sys.exit(1)
+    elif command == "local-search" and len(sys.argv) > 2:
+        if not os.path.isdir(BENCHMARK_CORPUS_DIR):
+            print(f"Klasör bulunamadı: {BENCHMARK_CORPUS_DIR} (önce corpus komutunu çalıştırın)")
+            return
+        print(f"'{BENCHMARK_CORPUS_DIR}' ile kurulan yerel dizinde sorgu süreleri ölçülüyor...")
+        print_report(benchmark_local_search(sys.argv[2:]))
+    elif command == "startup":
+        repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+        print("Açılış süreleri ölçülüyor (içe aktarma ve ilk yanıt)...")
+        report, passed = benchmark_startup(repeat)
+        print_report(report)
+        if not passed:
+            print(
+                f"Açılış gerilemesi: içe aktarma {STARTUP_MAX_IMPORT_SECONDS} sn, ilk yanıt "
+                f"{STARTUP_MAX_FIRST_RESPONSE_SECONDS} sn eşiğini aştı ya da tembel modüller açılışta yüklendi"
+            )
+            sys.exit(1)
+    else:
+        print(f"Bilinmeyen komut veya eksik argüman: {command}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import unittest
+
+from wiki_text import HTMLTextExtractor, html_to_text
+
+
+class HTMLToTextTests(unittest.TestCase):
+    def test_style_and_script_are_removed(self):
+        text = html_to_text(
+            '<style>.mw-parser-output .hatnote{font-style:italic}</style>'
+            '<script>if (a < b) { x = "</div>"; }</script><p>Göreme</p>'
+        )
+        self.assertEqual(text, "Göreme")
+
+    def test_references_are_removed(self):
+        text = html_to_text(
+            '<p>Ürgüp<sup id="cite_ref-1" class="reference"><a href="#cite_note-1">'
+            '<span class="cite-bracket">&#91;</span>1<span class="cite-bracket">&#93;</span></a></sup> ilçesi</p>'
+            '<div class="reflist"><ol class="references"><li>Kaynak</li></ol></div>'
+        )
+        self.assertEqual(text, "Ürgüp ilçesi")
+
+    def test_navbox_and_edit_links_are_removed(self):
+        text = html_to_text(
+            '<h2>Tarih<span class="mw-editsection"><span>[</span><a href="#">değiştir</a><span>]</span></span></h2>'
+            '<p>Metin</p>'
+            '<div role="navigation" class="navbox"><div><div>Gezinti</div></div><ul><li>Bağlantı</li></ul></div>'
+            '<p>Son</p>'
+        )
+        self.assertEqual(text, "Tarih\n\nMetin\n\nSon")
+
+    def test_class_must_match_whole_name(self):
+        self.assertEqual(html_to_text('<span class="reference-text">Kalır</span>'), "Kalır")
+        self.assertEqual(html_to_text('<p>class="navbox" metni</p>'), 'class="navbox" metni')
+
+    def test_entities_are_decoded(self):
+        text = html_to_text("<p>Tom &amp; Jerry &lt;b&gt; &quot;x&quot; &eacute;&#233;&#xE9; a&nbsp;b&#8211;c</p>")
+        self.assertEqual(text, 'Tom & Jerry <b> "x" ééé a b–c')
+
+    def test_paragraph_and_line_breaks_are_kept(self):
+        text = html_to_text(
+            "<p>Birinci <b>paragraf</b>\n devam</p><p>İkinci<br>satır</p>"
+            "<ul><li>a</li><li>b</li></ul><table><tr><td>1</td><td>2</td></tr></table>"
+        )
+        self.assertEqual(text, "Birinci paragraf devam\n\nİkinci\nsatır\n\na\nb\n\n1 2")
+
+    def test_comments_are_removed(self):
+        self.assertEqual(html_to_text('<p>a<!-- <div class="navbox"> -->b</p>'), "ab")
+
+    def test_chunked_feed_matches_whole_document(self):
+        document = (
+            '<p>Kapadokya<sup class="reference"><a>[1]</a></sup> &amp; Nevşehir</p>'
+            '<div class="navbox"><div>x</div></div><!-- yorum --><p>Son&#160;paragraf</p>'
+        ) * 20
+        expected = html_to_text(document)
+        for size in (1, 7, 64):
+            extractor = HTMLTextExtractor()
+            for i in range(0, len(document), size):
+                extractor.feed(document[i:i + size])
+            self.assertEqual(extractor.get_text(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,18 +1,33 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import sys
 import urllib.parse
-import re
+
+from wiki_text import html_to_text, clean_wiki_content, get_content_cleaner
+
+# Bağlantı havuzu ayarları: istemci ömrü boyunca bağlantılar yeniden kullanılır (keep-alive)
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 10
+HTTP_USER_AGENT = "KapadokyaWikiAPI/1.0 (https://github.com/Merttnkt/kapadokya_hackathon_webapi)"
+
 
 class WikipediaAPI:
-    def __init__(self, language="tr"):
+    def __init__(self, language="tr", session=None):
         """
         Wikipedia API istemcisi
         :param language: Dil kodu (örn: tr, en, de, fr)
+        :param session: Paylaşılan HTTP oturumu (None ise bağlantı havuzlu yeni bir oturum açılır)
         """
         self.language = language
         self.base_url = f"https://{language}.wikipedia.org/w/api.php"
         self.wiki_url = f"https://{language}.wikipedia.org/wiki/"
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.headers.update({"User-Agent": HTTP_USER_AGENT})
+        self.session = session
     
     def search(self, query, limit=10):
         """
@@ -30,7 +45,7 @@ class WikipediaAPI:
             "utf8": 1
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         if "query" in data and "search" in data["query"]:
@@ -53,7 +68,7 @@ class WikipediaAPI:
             "exintro": 0    # 0: tam içerik, 1: sadece giriş bölümü
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         content = ""
@@ -73,7 +88,7 @@ class WikipediaAPI:
                 "inprop": "url|displaytitle"
             }
             
-            response = requests.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params)
             data = response.json()
             
             page_title = ""
@@ -102,7 +117,7 @@ class WikipediaAPI:
             "prop": "sections"
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         full_content = f"# {title}\n\n"
@@ -117,7 +132,7 @@ class WikipediaAPI:
             "formatversion": 2
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         try:
             data = response.json()
             if "parse" in data and "text" in data["parse"]:
@@ -137,7 +152,7 @@ class WikipediaAPI:
             "prop": "sections"
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         try:
             data = response.json()
             if "parse" in data and "sections" in data["parse"]:
@@ -146,7 +161,7 @@ class WikipediaAPI:
                     section_title = section.get("line", "")
                     
                     # Referans, Kaynakça gibi bölümleri atlayalım
-                    if any(skip_word in section_title.lower() for skip_word in ["kaynakça", "referans", "dipnot", "dış bağlantı", "ayrıca bakınız"]):
+                    if get_content_cleaner(self.language).is_skipped_section(section_title):
                         continue
                     
                     # Her bölümü ayrı ayrı alalım
@@ -159,7 +174,7 @@ class WikipediaAPI:
                         "formatversion": 2
                     }
                     
-                    section_response = requests.get(self.base_url, params=params)
+                    section_response = self.session.get(self.base_url, params=params)
                     try:
                         section_data = section_response.json()
                         if "parse" in section_data and "text" in section_data["parse"]:
@@ -178,7 +193,7 @@ class WikipediaAPI:
         if len(full_content) < 1000:
             try:
                 mobile_url = f"https://{self.language}.wikipedia.org/api/rest_v1/page/mobile-sections/{urllib.parse.quote(title)}"
-                response = requests.get(mobile_url)
+                response = self.session.get(mobile_url)
                 data = response.json()
                 
                 # Giriş bölümü
@@ -192,7 +207,7 @@ class WikipediaAPI:
                 if "remaining" in data and "sections" in data["remaining"]:
                     for section in data["remaining"]["sections"]:
                         # Referans, Kaynakça gibi bölümleri atlayalım
-                        if "line" in section and any(skip_word in section["line"].lower() for skip_word in ["kaynakça", "referans", "dipnot", "dış bağlantı", "ayrıca bakınız"]):
+                        if "line" in section and get_content_cleaner(self.language).is_skipped_section(section["line"]):
                             continue
                             
                         if "line" in section:
@@ -211,57 +226,15 @@ class WikipediaAPI:
     
     def html_to_text(self, html_content):
         """
-        HTML içeriğini basit düz metne dönüştürür
+        HTML içeriğini düz metne dönüştürür (bkz. wiki_text.HTMLTextExtractor)
         """
-        # CSS içeriklerini temizle
-        html_content = re.sub(r'<style[^>]*>.*?</style>', ' ', html_content, flags=re.DOTALL)
-        
-        # CSS sınıf tanımlamalarını temizle
-        html_content = re.sub(r'\.mw-parser-output\s+\.[^{]+\{[^}]+\}', ' ', html_content)
-        
-        # HTML etiketlerini kaldır
-        text = re.sub(r'<[^>]+>', ' ', html_content)
-        
-        # Fazla boşlukları temizle
-        text = re.sub(r'\s+', ' ', text)
-        
-        # HTML karakter kodlarını çöz
-        text = text.replace('&nbsp;', ' ')
-        text = text.replace('&lt;', '<')
-        text = text.replace('&gt;', '>')
-        text = text.replace('&amp;', '&')
-        text = text.replace('&quot;', '"')
-        text = text.replace('&apos;', "'")
-        
-        return text.strip()
+        return html_to_text(html_content)
     
     def clean_wiki_content(self, content):
         """
-        Wikipedia içeriğinden gereksiz metinleri temizler
+        Wikipedia içeriğinden gereksiz metinleri dilin kural tablosuna göre temizler
         """
-        # [değiştir | kaynağı değiştir] tarzı metinleri temizle
-        content = re.sub(r'\[\s*değiştir\s*\|\s*kaynağı\s*değiştir\s*\]', '', content)
-        content = re.sub(r'\[\s*edit\s*\|\s*edit source\s*\]', '', content)
-        
-        # İçerik düzenleme bağlantılarını temizle
-        content = re.sub(r'\(\s*[Dd]üzenle\s*\)', '', content)
-        content = re.sub(r'\(\s*[Ee]dit\s*\)', '', content)
-        
-        # CSS sınıf tanımlarını temizle
-        content = re.sub(r'\.mw-parser-output\s+\.[^{]+\{[^}]+\}', '', content)
-        
-        # Dosya ve medya referanslarını temizle
-        content = re.sub(r'Dosya:[^\]]+\]', '', content)
-        content = re.sub(r'File:[^\]]+\]', '', content)
-        content = re.sub(r'Media:[^\]]+\]', '', content)
-        
-        # Sayfa referanslarını temizle
-        content = re.sub(r'\[\d+\]', '', content)
-        
-        # Fazla boş satırları temizle
-        content = re.sub(r'\n{3,}', '\n\n', content)
-        
-        return content
+        return clean_wiki_content(content, self.language)
     
     def get_page_images(self, page_id):
         """
@@ -276,7 +249,7 @@ class WikipediaAPI:
             "pageids": page_id
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         if "query" in data and "pages" in data["query"]:
@@ -302,7 +275,7 @@ class WikipediaAPI:
             "iiprop": "url"
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         if "query" in data and "pages" in data["query"]:
@@ -311,6 +284,33 @@ class WikipediaAPI:
                     return page_data["imageinfo"][0]["url"]
         return None
     
+    def get_page_image_urls(self, page_id, limit=5):
+        """
+        Sayfadaki resimleri URL'leriyle birlikte generator=images ile tek sorguda alır
+        :param page_id: Wikipedia sayfa ID'si
+        :param limit: En fazla resim sayısı
+        :return: Başlığa göre sıralı (başlık, URL) listesi
+        """
+        params = {
+            "action": "query",
+            "format": "json",
+            "generator": "images",
+            "pageids": page_id,
+            "gimlimit": limit,
+            "prop": "imageinfo",
+            "iiprop": "url"
+        }
+        
+        response = self.session.get(self.base_url, params=params)
+        data = response.json()
+        
+        images = []
+        if "query" in data and "pages" in data["query"]:
+            for page_data in data["query"]["pages"].values():
+                if "imageinfo" in page_data and len(page_data["imageinfo"]) > 0:
+                    images.append((page_data["title"], page_data["imageinfo"][0]["url"]))
+        return sorted(images)[:limit]
+    
     def get_page_categories(self, page_id):
         """
         Sayfa ID'sine göre kategorileri alır
@@ -325,7 +325,7 @@ class WikipediaAPI:
             "cllimit": 50
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         categories = []
@@ -390,14 +390,12 @@ class WikipediaAPI:
                     file.write("İçerik bulunamadı.\n\n")
                 
                 # Resimleri al
-                images = self.get_page_images(result['pageid'])
+                images = self.get_page_image_urls(result['pageid'], limit=5)  # İlk 5 resmi kaydet
                 if images:
                     file.write("RESİMLER:\n")
-                    for j, img in enumerate(images[:5]):  # İlk 5 resmi kaydet
-                        img_url = self.get_image_url(img)
+                    for j, (img, img_url) in enumerate(images):
                         file.write(f"{j+1}. {img}\n")
-                        if img_url:
-                            file.write(f"   URL: {img_url}\n")
+                        file.write(f"   URL: {img_url}\n")
                     file.write("\n")
                 
                 file.write("-" * 50 + "\n\n")
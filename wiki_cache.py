@@ -0,0 +1,833 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+try:
+    # zstd ön sıkıştırması isteğe bağlıdır (pip install zstandard)
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bellek içi önbellek boyutu ve kalıcı önbellek dosyası
+CONTENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+CONTENT_CACHE_DB = os.environ.get("WIKI_CONTENT_CACHE_DB", "wiki_cache.sqlite3")
+# Bu süre dolmadan önbellekteki içerik revizyon kontrolü yapılmadan kullanılır (sn)
+CONTENT_CACHE_REVALIDATE_AFTER = 300
+# Bellekte tutulacak en fazla benzerlik imzası (her biri ~1 KB)
+SIGNATURE_CACHE_MAX_ENTRIES = 20000
+# Küçük resim disk önbelleği klasörü ve en fazla boyutu
+IMAGE_CACHE_DIR = os.environ.get("WIKI_IMAGE_CACHE_DIR", "image_cache")
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Arama raporu deposu: klasör, en fazla toplam boyut (sıkıştırılmış kopyalar dahil) ve en uzun saklama süresi (sn)
+REPORT_STORE_DIR = os.environ.get("WIKI_REPORT_DIR", "reports")
+REPORT_STORE_MAX_BYTES = 256 * 1024 * 1024
+REPORT_STORE_MAX_AGE = 7 * 24 * 3600
+# Bu boyuttan küçük raporlar için sıkıştırılmış kopya üretilmez
+REPORT_COMPRESS_MIN_BYTES = 1024
+# Kodlama adı -> dosya uzantısı
+REPORT_ENCODINGS = {"zstd": ".zst", "gzip": ".gz"}
+# Depo içindeki üst veri, sıkıştırılmış kopya ve geçici dosyaların uzantıları; rapor adı bunlarla bitemez
+REPORT_RESERVED_SUFFIXES = (".json", ".tmp", ".part") + tuple(REPORT_ENCODINGS.values())
+
+logger = logging.getLogger(__name__)
+
+
+class PageContentCache:
+    """
+    İki katmanlı sayfa içeriği önbelleği.
+    Bellekte boyut sınırlı bir LRU, arkasında (language, page_id, revid) ile
+    anahtarlanan kalıcı bir SQLite deposu bulunur. Girdiler revizyon numarasıyla
+    saklanır; süresi dolan girdiler prop=info lastrevid ile ucuzca doğrulanır.
+    """
+    def __init__(self, max_bytes=CONTENT_CACHE_MAX_BYTES, db_path=CONTENT_CACHE_DB,
+                 revalidate_after=CONTENT_CACHE_REVALIDATE_AFTER):
+        """
+        :param max_bytes: Bellek içi önbelleğin en fazla boyutu (bayt)
+        :param db_path: SQLite dosyası (None ise yalnızca bellek kullanılır)
+        :param revalidate_after: Revizyon kontrolü yapılmadan geçecek süre (sn)
+        """
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.entries = OrderedDict()  # (language, kind, page_id) -> girdi
+        self.titles = {}  # (language, kind, title) -> page_id
+        self.signatures = OrderedDict()  # (language, page_id) -> (revid, imza baytları)
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "revalidations": 0,
+            "stale": 0,
+            "signature_hits": 0,
+            "signature_misses": 0
+        }
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS page_content ("
+                " language TEXT NOT NULL,"
+                " page_id INTEGER NOT NULL,"
+                " revid INTEGER NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " title TEXT,"
+                " content TEXT NOT NULL,"
+                " checked_at REAL NOT NULL,"
+                " PRIMARY KEY (language, page_id, revid, kind))"
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS page_content_title ON page_content (language, kind, title)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS page_signature ("
+                " language TEXT NOT NULL,"
+                " page_id INTEGER NOT NULL,"
+                " revid INTEGER NOT NULL,"
+                " signature BLOB NOT NULL,"
+                " PRIMARY KEY (language, page_id))"
+            )
+            self.db.commit()
+
+    def lookup(self, language, kind, page_id=None, title=None):
+        """
+        Önbellekte girdi arar; önce bellekte, sonra SQLite deposunda
+        :param language: Dil kodu
+        :param kind: İçerik türü (page, full)
+        :param page_id: Sayfa ID'si
+        :param title: Sayfa başlığı (page_id bilinmiyorsa)
+        :return: Girdi sözlüğü (page_id, revid, title, content, checked_at) veya None
+        """
+        with self.lock:
+            if page_id is None and title is not None:
+                page_id = self.titles.get((language, kind, title))
+            if page_id is not None:
+                entry = self.entries.get((language, kind, page_id))
+                if entry is not None:
+                    self.entries.move_to_end((language, kind, page_id))
+                    self.stats["memory_hits"] += 1
+                    return entry
+            if self.db is None:
+                self.stats["misses"] += 1
+                return None
+            if page_id is not None:
+                row = self.db.execute(
+                    "SELECT page_id, revid, title, content, checked_at FROM page_content"
+                    " WHERE language = ? AND kind = ? AND page_id = ?",
+                    (language, kind, page_id)
+                ).fetchone()
+            elif title is not None:
+                row = self.db.execute(
+                    "SELECT page_id, revid, title, content, checked_at FROM page_content"
+                    " WHERE language = ? AND kind = ? AND title = ?",
+                    (language, kind, title)
+                ).fetchone()
+            else:
+                row = None
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            entry = {
+                "page_id": row[0],
+                "revid": row[1],
+                "title": row[2],
+                "content": row[3],
+                "checked_at": row[4]
+            }
+            self._remember(language, kind, entry)
+            return entry
+
+    def put(self, language, kind, page_id, revid, title, content):
+        """
+        İçeriği her iki katmana yazar, aynı sayfanın eski revizyonlarını siler
+        """
+        entry = {
+            "page_id": page_id,
+            "revid": revid,
+            "title": title,
+            "content": content,
+            "checked_at": time.time()
+        }
+        with self.lock:
+            self._remember(language, kind, entry)
+            if self.db is not None:
+                self.db.execute(
+                    "DELETE FROM page_content WHERE language = ? AND kind = ? AND page_id = ? AND revid != ?",
+                    (language, kind, page_id, revid)
+                )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO page_content"
+                    " (language, page_id, revid, kind, title, content, checked_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (language, page_id, revid, kind, title, content, entry["checked_at"])
+                )
+                self.db.commit()
+
+    def get_signature(self, language, page_id, revid):
+        """
+        Sayfanın verilen revizyonu için saklanmış benzerlik imzasını döndürür
+        :return: İmza baytları, yoksa veya başka revizyona aitse None
+        """
+        key = (language, page_id)
+        with self.lock:
+            cached = self.signatures.get(key)
+            if cached is None and self.db is not None:
+                row = self.db.execute(
+                    "SELECT revid, signature FROM page_signature WHERE language = ? AND page_id = ?",
+                    (language, page_id)
+                ).fetchone()
+                if row is not None:
+                    cached = (row[0], bytes(row[1]))
+                    self._remember_signature(key, cached)
+            if cached is None or cached[0] != revid:
+                self.stats["signature_misses"] += 1
+                return None
+            self.signatures.move_to_end(key)
+            self.stats["signature_hits"] += 1
+            return cached[1]
+
+    def put_signature(self, language, page_id, revid, signature):
+        """
+        Sayfa revizyonunun benzerlik imzasını içeriğin yanına yazar (eski revizyonunkinin yerine)
+        """
+        with self.lock:
+            self._remember_signature((language, page_id), (revid, signature))
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO page_signature (language, page_id, revid, signature)"
+                    " VALUES (?, ?, ?, ?)",
+                    (language, page_id, revid, signature)
+                )
+                self.db.commit()
+
+    def is_fresh(self, entry):
+        """
+        Girdinin revizyon kontrolü yapılmadan kullanılıp kullanılamayacağını belirtir
+        """
+        return time.time() - entry["checked_at"] < self.revalidate_after
+
+    def mark_checked(self, language, kind, entry):
+        """
+        Revizyonu doğrulanan girdinin kontrol zamanını günceller
+        """
+        entry["checked_at"] = time.time()
+        with self.lock:
+            self.stats["revalidations"] += 1
+            if self.db is not None:
+                self.db.execute(
+                    "UPDATE page_content SET checked_at = ?"
+                    " WHERE language = ? AND kind = ? AND page_id = ? AND revid = ?",
+                    (entry["checked_at"], language, kind, entry["page_id"], entry["revid"])
+                )
+                self.db.commit()
+
+    def mark_stale(self):
+        """
+        Revizyonu değişmiş (eskimiş) bir girdiyi istatistiklere işler
+        """
+        with self.lock:
+            self.stats["stale"] += 1
+
+    def get_stats(self):
+        """
+        Önbellek sayaçlarını ve boyut bilgisini döndürür
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self.entries)
+            stats["memory_bytes"] = self.size
+            stats["signatures"] = len(self.signatures)
+            stats["max_bytes"] = self.max_bytes
+            if self.db is not None:
+                stats["disk_entries"] = self.db.execute("SELECT COUNT(*) FROM page_content").fetchone()[0]
+            return stats
+
+    def iter_contents(self, kind="page", batch_size=100):
+        """
+        Kalıcı depodaki (yoksa bellekteki) içerikleri parça parça dolaşır;
+        kilit yalnızca her parça okunurken tutulur
+        :param kind: İçerik türü (page, full)
+        :param batch_size: Tek seferde okunacak satır sayısı
+        :return: (language, page_id, content) üreteci
+        """
+        if self.db is None:
+            with self.lock:
+                items = [
+                    (language, entry["page_id"], entry["content"])
+                    for (language, entry_kind, _), entry in self.entries.items()
+                    if entry_kind == kind
+                ]
+            yield from items
+            return
+        last_rowid = 0
+        while True:
+            with self.lock:
+                if self.db is None:
+                    return
+                rows = self.db.execute(
+                    "SELECT rowid, language, page_id, content FROM page_content"
+                    " WHERE kind = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (kind, last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, language, page_id, content in rows:
+                last_rowid = rowid
+                yield language, page_id, content
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+    def _remember_signature(self, key, value):
+        # Kilit altında çağrılır
+        self.signatures[key] = value
+        self.signatures.move_to_end(key)
+        while len(self.signatures) > SIGNATURE_CACHE_MAX_ENTRIES:
+            self.signatures.popitem(last=False)
+
+    def _remember(self, language, kind, entry):
+        # Kilit altında çağrılır: girdiyi LRU'ya ekler ve boyut sınırını korur
+        key = (language, kind, entry["page_id"])
+        entry["size"] = len(entry["content"].encode("utf-8"))
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= old["size"]
+        if entry["title"]:
+            self.titles[(language, kind, entry["title"])] = entry["page_id"]
+        if entry["size"] > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.size += entry["size"]
+        while self.size > self.max_bytes:
+            (old_language, old_kind, _), old = self.entries.popitem(last=False)
+            self.size -= old["size"]
+            self.titles.pop((old_language, old_kind, old["title"]), None)
+            self.stats["evictions"] += 1
+
+
+class TTLCache:
+    """
+    Süre (TTL) ve LRU sınırlı genel amaçlı önbellek.
+    Aynı anahtar için eşzamanlı gelen hesaplamalar birleştirilir (single-flight):
+    yalnızca ilk çağrı hesaplamayı yapar, diğerleri onun sonucunu bekler.
+    """
+    def __init__(self, max_entries=1000, ttl=24 * 3600):
+        """
+        :param max_entries: En fazla girdi sayısı
+        :param ttl: Girdinin geçerlilik süresi (sn)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # anahtar -> (son geçerlilik zamanı, değer)
+        self.inflight = {}  # anahtar -> Future
+        self.lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+            "coalesced": 0
+        }
+
+    def get(self, key):
+        """
+        :return: Geçerli değer, yoksa None
+        """
+        with self.lock:
+            return self._get(key)
+
+    def put(self, key, value):
+        with self.lock:
+            self._put(key, value)
+
+    def get_or_compute(self, key, compute):
+        """
+        Değeri önbellekten verir; yoksa compute() ile hesaplar ve saklar.
+        Hesaplama sırasında hata olursa sonuç saklanmaz, bekleyen tüm çağrılara iletilir.
+        :param key: Önbellek anahtarı
+        :param compute: Değeri üreten fonksiyon
+        :return: Değer
+        """
+        with self.lock:
+            value = self._get(key)
+            if value is not None:
+                return value
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.inflight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except Exception as e:
+            with self.lock:
+                self.inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self._put(key, value)
+            self.inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = len(self.entries)
+            stats["inflight"] = len(self.inflight)
+            return stats
+
+    def _get(self, key):
+        # Kilit altında çağrılır
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self.entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            del self.entries[key]
+            self.stats["expired"] += 1
+        self.stats["misses"] += 1
+        return None
+
+    def _put(self, key, value):
+        # Kilit altında çağrılır
+        self.entries.pop(key, None)
+        self.entries[key] = (time.time() + self.ttl, value)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+
+class ImageDiskCache:
+    """
+    Boyut sınırlı, LRU çıkarmalı disk önbelleği (küçük resim vekili için).
+    Her girdi klasörde içerik dosyası ve yanında küçük bir JSON üst veri dosyası
+    (içerik türü, ETag, boyut) olarak saklanır. Erişim sırası bellekte tutulur,
+    açılışta dosyaların değiştirilme zamanına göre yeniden kurulur.
+    Aynı anahtar için eşzamanlı indirmeler birleştirilir (single-flight).
+    """
+    def __init__(self, directory=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        """
+        :param directory: Önbellek klasörü
+        :param max_bytes: Önbelleğin en fazla boyutu (bayt)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # anahtar -> üst veri
+        self.inflight = {}  # anahtar -> Future
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "coalesced": 0
+        }
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def make_key(self, *parts):
+        """
+        Parçalardan dosya adı olarak kullanılabilecek bir anahtar üretir
+        """
+        return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        """
+        :return: Girdinin içerik dosyasının yolu
+        """
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """
+        :return: Girdinin üst verisi (content_type, etag, size, path), yoksa None
+        """
+        with self.lock:
+            return self._get(key)
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Girdiyi önbellekten verir; yoksa fetch() ile indirip diske yazar.
+        İndirme hatası saklanmaz, bekleyen tüm çağrılara iletilir.
+        :param key: make_key ile üretilmiş anahtar
+        :param fetch: (içerik baytları, içerik türü) döndüren fonksiyon
+        :return: Girdinin üst verisi
+        """
+        with self.lock:
+            entry = self._get(key)
+            if entry is not None:
+                return entry
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.inflight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            content, content_type = fetch()
+            entry = self._write(key, content, content_type)
+        except Exception as e:
+            with self.lock:
+                self.inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.inflight.pop(key, None)
+        future.set_result(entry)
+        return entry
+
+    def read_or_fetch(self, key, fetch):
+        """
+        get_or_fetch gibi çalışır, ayrıca içerik baytlarını döndürür. İçerik dosyası
+        yanıt gönderilmeden önce okunur; böylece girdinin eşzamanlı bir yazma
+        tarafından çıkarılması gönderilen yanıtı bozmaz. Dosya okunamadan
+        çıkarıldıysa girdi bir kez daha alınır (gerekirse yeniden indirilir).
+        :return: (girdinin üst verisi, içerik baytları)
+        """
+        for attempt in range(2):
+            entry = self.get_or_fetch(key, fetch)
+            try:
+                with open(entry["path"], "rb") as f:
+                    return entry, f.read()
+            except FileNotFoundError:
+                if attempt:
+                    raise
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = len(self.entries)
+            stats["bytes"] = self.size
+            stats["max_bytes"] = self.max_bytes
+            return stats
+
+    def _load(self):
+        # Klasördeki girdileri eskiden yeniye (değiştirilme zamanı) sıralayarak okur,
+        # yarım kalmış geçici dosyaları siler. Üst verisi olmayan ya da içerikle uyuşmayan
+        # girdilerin dosyaları da silinir; aksi halde boyut sınırına hiç sayılmadan kalırlar
+        loaded = []
+        file_names = os.listdir(self.directory)
+        for file_name in file_names:
+            if file_name.endswith(".tmp"):
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                except OSError:
+                    pass
+                continue
+            if not file_name.endswith(".json"):
+                continue
+            key = file_name[:-len(".json")]
+            try:
+                with open(os.path.join(self.directory, file_name), encoding="utf-8") as f:
+                    entry = json.load(f)
+                if os.path.getsize(self.path(key)) != entry["size"] or not entry["content_type"] or not entry["etag"]:
+                    continue
+                mtime = os.path.getmtime(self.path(key))
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            entry["path"] = self.path(key)
+            loaded.append((mtime, key, entry))
+        for _, key, entry in sorted(loaded):
+            self.entries[key] = entry
+            self.size += entry["size"]
+        for file_name in file_names:
+            key = file_name[:-len(".json")] if file_name.endswith(".json") else file_name
+            if key not in self.entries and not file_name.endswith(".tmp"):
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                except OSError:
+                    pass
+        self._evict()
+
+    def _get(self, key):
+        # Kilit altında çağrılır
+        entry = self.entries.get(key)
+        if entry is None or not os.path.exists(entry["path"]):
+            if entry is not None:
+                self.size -= self.entries.pop(key)["size"]
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        try:
+            # Sıra bir sonraki açılışta da korunabilsin diye erişim zamanı dosyaya işlenir
+            os.utime(entry["path"])
+        except OSError:
+            pass
+        return entry
+
+    def _write(self, key, content, content_type):
+        # İçerik ve üst veri önce geçici dosyalara yazılır, sonra atomik olarak yerine taşınır;
+        # üst veri içerikten sonra taşındığından yarım kalan yazma açılışta boyut farkıyla ayıklanır
+        entry = {
+            "content_type": content_type,
+            "etag": '"' + hashlib.sha256(content).hexdigest()[:32] + '"',
+            "size": len(content)
+        }
+        path = self.path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+        meta_temp_path = f"{path}.json.{threading.get_ident()}.tmp"
+        with open(meta_temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(meta_temp_path, f"{path}.json")
+        entry["path"] = path
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old["size"]
+            self.entries[key] = entry
+            self.size += entry["size"]
+            self._evict()
+        return entry
+
+    def _evict(self):
+        # Kilit altında çağrılır: en uzun süredir kullanılmayan girdileri siler
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            key, entry = self.entries.popitem(last=False)
+            self.size -= entry["size"]
+            self.stats["evictions"] += 1
+            for path in (entry["path"], f"{entry['path']}.json"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class ReportStore:
+    """
+    Arama raporları için ayrılmış, boyut ve yaş sınırlı klasör.
+    Yayınlanan her rapor için ETag hesaplanır, gzip (ve zstandard kuruluysa zstd)
+    ile önceden sıkıştırılmış kopyalar üretilir; üst veri yanındaki JSON dosyasında
+    tutulur. Süresi dolan raporlar ve boyut sınırını aşan en eski raporlar silinir.
+    """
+    def __init__(self, directory=REPORT_STORE_DIR, max_bytes=REPORT_STORE_MAX_BYTES, max_age=REPORT_STORE_MAX_AGE):
+        """
+        :param directory: Rapor klasörü
+        :param max_bytes: Raporların en fazla toplam boyutu (bayt)
+        :param max_age: Raporların en uzun saklama süresi (sn)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.entries = OrderedDict()  # dosya adı -> üst veri (eskiden yeniye)
+        self.pending = set()  # yazılmakta olan rapor adları
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = {
+            "published": 0,
+            "downloads": 0,
+            "evictions": 0,
+            "expired": 0
+        }
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def is_valid_name(self, name):
+        """
+        Adın klasör dışına çıkmayan, gizli olmayan ve depo yan dosyalarıyla (üst veri,
+        sıkıştırılmış kopya, geçici dosya) çakışmayan düz bir dosya adı olup olmadığını kontrol eder
+        """
+        return (
+            bool(name) and name == os.path.basename(name) and not name.startswith(".") and "\\" not in name
+            and not name.lower().endswith(REPORT_RESERVED_SUFFIXES)
+        )
+
+    def path(self, name):
+        """
+        :return: Raporun depodaki yolu
+        """
+        return os.path.join(self.directory, name)
+
+    def reserve(self, name):
+        """
+        Arka planda yazılacak raporu "hazırlanıyor" olarak işaretler
+        """
+        with self.lock:
+            self.pending.add(name)
+
+    def discard(self, name):
+        """
+        Yazılamayan raporun işaretini kaldırır
+        """
+        with self.lock:
+            self.pending.discard(name)
+
+    def is_pending(self, name):
+        with self.lock:
+            return name in self.pending
+
+    def publish(self, name):
+        """
+        path(name) konumuna yazılmış raporu depoya ekler: ETag hesaplar, sıkıştırılmış
+        kopyaları üretir ve çıkarma politikasını uygular
+        :param name: Rapor dosya adı
+        :return: Raporun üst verisi
+        """
+        path = self.path(name)
+        with open(path, "rb") as f:
+            content = f.read()
+        entry = {
+            "etag": '"' + hashlib.sha256(content).hexdigest()[:32] + '"',
+            "size": len(content),
+            "created_at": time.time(),
+            "encodings": {}
+        }
+        for extension in REPORT_ENCODINGS.values():
+            # Aynı adla önceden yayınlanmış raporun sıkıştırılmış kopyaları geçersizdir
+            try:
+                os.remove(path + extension)
+            except OSError:
+                pass
+        if len(content) >= REPORT_COMPRESS_MIN_BYTES:
+            compressors = {"gzip": lambda data: gzip.compress(data, compresslevel=6)}
+            if zstandard is not None:
+                compressors["zstd"] = zstandard.ZstdCompressor(level=10).compress
+            for encoding, compress in compressors.items():
+                compressed = compress(content)
+                if len(compressed) >= len(content):
+                    continue
+                encoded_path = path + REPORT_ENCODINGS[encoding]
+                temp_path = f"{encoded_path}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(compressed)
+                os.replace(temp_path, encoded_path)
+                entry["encodings"][encoding] = len(compressed)
+        # Üst veri de geçici dosyaya yazılıp yerine taşınır; yarım kalan JSON başlangıçta okunmaz
+        temp_path = f"{path}.json.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, f"{path}.json")
+        entry["path"] = path
+        with self.lock:
+            self._remove_entry(name, delete_files=False)
+            self.entries[name] = entry
+            self.size += self._entry_bytes(entry)
+            self.pending.discard(name)
+            self.stats["published"] += 1
+            self._evict()
+        return entry
+
+    def get(self, name):
+        """
+        :return: Raporun üst verisi (path, size, etag, encodings), yoksa veya süresi dolmuşsa None
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return None
+            if time.time() - entry["created_at"] > self.max_age or not os.path.exists(entry["path"]):
+                self._remove_entry(name)
+                self.stats["expired"] += 1
+                return None
+            self.stats["downloads"] += 1
+            return entry
+
+    def variant_path(self, entry, encoding):
+        """
+        :return: Raporun verilen kodlamadaki (gzip, zstd) kopyasının yolu
+        """
+        return entry["path"] + REPORT_ENCODINGS[encoding]
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self.entries)
+            stats["pending"] = len(self.pending)
+            stats["bytes"] = self.size
+            stats["max_bytes"] = self.max_bytes
+            stats["zstd_available"] = zstandard is not None
+            return stats
+
+    def _load(self):
+        # Klasördeki raporları oluşturulma sırasıyla okur, yarım kalmış geçici dosyaları siler
+        loaded = []
+        for file_name in os.listdir(self.directory):
+            file_path = os.path.join(self.directory, file_name)
+            if file_name.endswith((".tmp", ".part")):
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+                continue
+            if not file_name.endswith(".json"):
+                continue
+            name = file_name[:-len(".json")]
+            try:
+                with open(file_path, encoding="utf-8") as f:
+                    entry = json.load(f)
+                entry["path"] = self.path(name)
+                entry["created_at"] = float(entry["created_at"])
+                self._entry_bytes(entry)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                logger.warning("Bozuk rapor üst verisi atlandı (%s)", file_path, exc_info=True)
+                continue
+            if os.path.exists(entry["path"]):
+                loaded.append((entry["created_at"], name, entry))
+        for _, name, entry in sorted(loaded):
+            self.entries[name] = entry
+            self.size += self._entry_bytes(entry)
+        self._evict()
+
+    def _entry_bytes(self, entry):
+        return entry["size"] + sum(entry["encodings"].values())
+
+    def _remove_entry(self, name, delete_files=True):
+        # Kilit altında çağrılır
+        entry = self.entries.pop(name, None)
+        if entry is None:
+            return
+        self.size -= self._entry_bytes(entry)
+        if not delete_files:
+            return
+        paths = [entry["path"], f"{entry['path']}.json"]
+        paths += [self.variant_path(entry, encoding) for encoding in entry["encodings"]]
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        # Kilit altında çağrılır: süresi dolan raporları, sonra sınır aşılıyorsa en eskileri siler
+        expires_before = time.time() - self.max_age
+        for name, entry in list(self.entries.items()):
+            if entry["created_at"] >= expires_before:
+                break
+            self._remove_entry(name)
+            self.stats["expired"] += 1
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            self._remove_entry(next(iter(self.entries)))
+            self.stats["evictions"] += 1
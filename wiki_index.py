@@ -0,0 +1,197 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Yerel tam metin dizini dosyası (None/boş ise yalnızca bellekte tutulur)
+SEARCH_INDEX_DB = os.environ.get("WIKI_SEARCH_INDEX_DB", "wiki_index.sqlite3")
+# BM25 sütun ağırlıkları: başlık, bölüm başlıkları, kategoriler, içerik
+SEARCH_INDEX_WEIGHTS = (10.0, 4.0, 3.0, 1.0)
+# Sonuç parçacığında (snippet) gösterilecek en fazla sözcük
+SEARCH_INDEX_SNIPPET_TOKENS = 24
+# Sonuçlarda döndürülen içerik başlangıcının uzunluğu (özet için)
+SEARCH_INDEX_CONTENT_CHARS = 600
+
+# Bölüm başlığı satırları: "## Başlık" (parse içeriği) veya "== Başlık ==" (TextExtracts)
+SECTION_LINE_RE = re.compile(r'^(?:##\s+(.+?)|={2,5}\s*(.+?)\s*={2,5})\s*$', re.MULTILINE)
+QUERY_TOKEN_RE = re.compile(r'\w+')
+
+
+class LocalSearchIndex:
+    """
+    Getirilen makalelerden artımlı olarak doldurulan SQLite FTS5 tam metin dizini.
+    Başlık, bölüm başlıkları, kategoriler ve temizlenmiş içerik ayrı sütunlarda
+    tutulur; sorgular BM25 ile (başlık ağırlıklı) sıralanır ve Wikipedia'daki gibi
+    vurgulanmış parçacıklar döndürülür.
+    """
+    def __init__(self, db_path=SEARCH_INDEX_DB):
+        """
+        :param db_path: SQLite dosyası (None ise bellek içi veritabanı kullanılır)
+        """
+        self.lock = threading.Lock()
+        self.stats = {
+            "queries": 0,
+            "results": 0,
+            "updates": 0
+        }
+        self.db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        if db_path:
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS page_index_meta ("
+            " doc_id INTEGER PRIMARY KEY,"
+            " language TEXT NOT NULL,"
+            " page_id INTEGER NOT NULL,"
+            " revid INTEGER,"
+            " word_count INTEGER NOT NULL,"
+            " indexed_at REAL NOT NULL,"
+            " UNIQUE (language, page_id))"
+        )
+        # remove_diacritics 2: "goreme" sorgusu "Göreme" ile eşleşir
+        self.db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS page_index USING fts5("
+            " title, sections, categories, content,"
+            " tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self.db.commit()
+
+    def add_page(self, language, page_id, title=None, content=None, categories=None, revid=None, word_count=None):
+        """
+        Sayfayı dizine ekler ya da günceller. Verilmeyen alanlar (None) mevcut
+        kayıttan korunur; aynı revizyonun daha kısa içeriği (örn. yalnızca giriş
+        metni) tam içeriğin üzerine yazılmaz. Yalnızca giriş metni verilen sayfalarda
+        sözcük sayısı içerikten hesaplanmaz, word_count ile (örn. list=search
+        wordcount) verilmelidir.
+        :param language: Dil kodu
+        :param page_id: Sayfa ID'si
+        :param title: Sayfa başlığı (kayıt yoksa zorunlu)
+        :param content: Temizlenmiş düz metin içerik ("## Bölüm" satırlarıyla)
+        :param categories: Kategori listesi
+        :param revid: Revizyon numarası (biliniyorsa)
+        :param word_count: Sayfanın tamamının sözcük sayısı (None ise içerikten hesaplanır)
+        :return: Dizin güncellendiyse True
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT m.doc_id, m.revid, m.word_count, p.title, p.categories, p.content"
+                " FROM page_index_meta m JOIN page_index p ON p.rowid = m.doc_id"
+                " WHERE m.language = ? AND m.page_id = ?",
+                (language, page_id)
+            ).fetchone()
+            if row is None and not title:
+                return False
+
+            doc_id, old_revid, old_word_count, old_title, old_categories, old_content = (
+                row if row else (None, None, 0, "", "", "")
+            )
+            new_revision = revid is not None and old_revid is not None and revid != old_revid
+            if content is None or (len(content) < len(old_content) and not new_revision):
+                content = old_content
+                if word_count is None:
+                    word_count = old_word_count
+            if word_count is None:
+                word_count = len(content.split())
+            categories_text = "\n".join(categories) if categories is not None else old_categories
+            title = title or old_title
+            revid = revid if revid is not None else old_revid
+            if row is not None and (title, categories_text, content, revid, word_count) == (
+                old_title, old_categories, old_content, old_revid, old_word_count
+            ):
+                return False
+
+            sections = "\n".join(
+                markdown or wiki for markdown, wiki in SECTION_LINE_RE.findall(content)
+            )
+            if doc_id is None:
+                cursor = self.db.execute(
+                    "INSERT INTO page_index_meta (language, page_id, revid, word_count, indexed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (language, page_id, revid, word_count, time.time())
+                )
+                doc_id = cursor.lastrowid
+            else:
+                self.db.execute(
+                    "UPDATE page_index_meta SET revid = ?, word_count = ?, indexed_at = ? WHERE doc_id = ?",
+                    (revid, word_count, time.time(), doc_id)
+                )
+                self.db.execute("DELETE FROM page_index WHERE rowid = ?", (doc_id,))
+            self.db.execute(
+                "INSERT INTO page_index (rowid, title, sections, categories, content) VALUES (?, ?, ?, ?, ?)",
+                (doc_id, title, sections, categories_text, content)
+            )
+            self.db.commit()
+            self.stats["updates"] += 1
+            return True
+
+    def build_match_query(self, query):
+        """
+        Serbest metin sorgusunu FTS5 sorgusuna çevirir (tüm sözcükler aranır,
+        FTS5 işleçleri etkisizleştirilir)
+        :return: FTS5 MATCH ifadesi, sorguda sözcük yoksa None
+        """
+        tokens = QUERY_TOKEN_RE.findall(query)
+        if not tokens:
+            return None
+        return " ".join(f'"{token}"' for token in tokens)
+
+    def search(self, language, query, limit=10, offset=0):
+        """
+        Yerel dizinde BM25 sıralı arama yapar
+        :param language: Dil kodu
+        :param query: Arama sorgusu
+        :param limit: Sonuç sayısı sınırı
+        :param offset: Başlangıç indeksi
+        :return: pageid, title, snippet, score, word_count, categories ve content (içeriğin başı)
+                 alanlarını içeren sonuç listesi
+        """
+        match_query = self.build_match_query(query)
+        if match_query is None:
+            return []
+        with self.lock:
+            # Önce yalnızca BM25 ile ilk sonuçlar bulunur; parçacık ve içerik yalnızca
+            # bu sonuçlar için üretilir (snippet() tüm eşleşmelerde pahalıdır)
+            ranked = self.db.execute(
+                "SELECT p.rowid, bm25(page_index, ?, ?, ?, ?) AS score"
+                " FROM page_index p JOIN page_index_meta m ON m.doc_id = p.rowid"
+                " WHERE page_index MATCH ? AND m.language = ?"
+                " ORDER BY score LIMIT ? OFFSET ?",
+                (*SEARCH_INDEX_WEIGHTS, match_query, language, limit, offset)
+            ).fetchall()
+            rows = []
+            for doc_id, score in ranked:
+                row = self.db.execute(
+                    "SELECT m.page_id, p.title, m.word_count, p.categories, substr(p.content, 1, ?),"
+                    " snippet(page_index, 3, '<span class=\"searchmatch\">', '</span>', '...', ?)"
+                    " FROM page_index p JOIN page_index_meta m ON m.doc_id = p.rowid"
+                    " WHERE page_index MATCH ? AND p.rowid = ?",
+                    (SEARCH_INDEX_CONTENT_CHARS, SEARCH_INDEX_SNIPPET_TOKENS, match_query, doc_id)
+                ).fetchone()
+                if row is not None:
+                    rows.append(row + (score,))
+            self.stats["queries"] += 1
+            self.stats["results"] += len(rows)
+        return [
+            {
+                "pageid": row[0],
+                "title": row[1],
+                "word_count": row[2],
+                "categories": row[3].split("\n") if row[3] else [],
+                "content": row[4],
+                "snippet": row[5],
+                # bm25() küçük değerleri daha iyi sayar; dışarıya büyük-iyi olarak verelim
+                "score": -row[6]
+            }
+            for row in rows
+        ]
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["documents"] = self.db.execute("SELECT COUNT(*) FROM page_index_meta").fetchone()[0]
+            return stats
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
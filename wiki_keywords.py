@@ -0,0 +1,223 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+# Dizinde terim frekansı tutulacak en fazla sayfa (aşılınca en eski sayfa çıkarılır)
+KEYWORD_INDEX_MAX_DOCS = 5000
+# Anahtar kelime sayılmayacak en kısa sözcük uzunluğu
+KEYWORD_MIN_LENGTH = 3
+# Önbellekteki anahtar kelimeler, dildeki sayfa sayısının IDF'e katkısı
+# (log(1 + N)) bu kadardan fazla değişene kadar yeniden hesaplanmaz (~%5 sayfa)
+KEYWORD_IDF_TOLERANCE = 0.05
+
+# Dile göre durdurma sözcükleri (küçük harf)
+STOPWORDS = {
+    "tr": {
+        "acaba", "ama", "ancak", "artık", "aslında", "az", "bana", "bazen", "bazı", "bazıları",
+        "belki", "ben", "beni", "benim", "beş", "bile", "bin", "bir", "birçok", "biri", "birkaç",
+        "birlikte", "birşey", "biz", "bize", "bizi", "bizim", "böyle", "böylece", "bu", "buna",
+        "bunda", "bundan", "bunlar", "bunları", "bunların", "bunu", "bunun", "burada", "çok",
+        "çünkü", "da", "daha", "dahi", "de", "defa", "değil", "diğer", "diye", "dolayı", "dört",
+        "elbette", "en", "fakat", "falan", "gibi", "göre", "hangi", "hem", "henüz", "hep", "hepsi",
+        "her", "herhangi", "herkes", "hiç", "hiçbir", "için", "ile", "ilgili", "ise", "işte", "iki",
+        "kadar", "karşı", "kendi", "kendine", "kendini", "kez", "ki", "kim", "kimi", "kimse",
+        "madem", "mi", "mı", "mu", "mü", "nasıl", "ne", "neden", "nedenle", "nerede", "nereye",
+        "niye", "niçin", "olan", "olarak", "oldu", "olduğu", "olduğunu", "olmak", "olması",
+        "olmayan", "olmuş", "olup", "olur", "on", "ona", "ondan", "onlar", "onları", "onların",
+        "onu", "onun", "orada", "oysa", "öyle", "önce", "pek", "rağmen", "sadece", "sanki",
+        "sen", "siz", "sonra", "sonraki", "şey", "şimdi", "şöyle", "şu", "şuna", "şunu", "tarafından",
+        "tüm", "üç", "üzere", "üzerinde", "var", "vardır", "ve", "veya", "ya", "yani", "yapılan",
+        "yedi", "yerine", "yine", "yoksa", "zaten", "aynı", "ayrıca", "arasında", "başka", "bulunan",
+        "büyük", "dolayısıyla", "edilen", "eden", "etmek", "ettiği", "fazla", "günümüzde", "ilk",
+        "iken", "içinde", "kısmı", "nin", "nın", "nun", "nün", "yıl", "yılında", "yılı", "sonucu",
+        "şekilde", "yaklaşık", "yeni", "çeşitli", "genellikle", "özellikle", "değiştir",
+        "kaynağı", "dosya", "vardı", "idi", "edildi", "yapıldı"
+    },
+    "en": {
+        "a", "about", "above", "after", "again", "against", "all", "also", "am", "an", "and", "any",
+        "are", "as", "at", "be", "because", "been", "before", "being", "below", "between", "both",
+        "but", "by", "can", "could", "did", "do", "does", "doing", "down", "during", "each", "edit",
+        "few", "for", "from", "further", "had", "has", "have", "having", "he", "her", "here", "hers",
+        "him", "his", "how", "however", "i", "if", "in", "into", "is", "it", "its", "itself", "many",
+        "may", "more", "most", "much", "must", "my", "no", "nor", "not", "now", "of", "off", "on",
+        "once", "one", "only", "or", "other", "our", "out", "over", "own", "same", "she", "should",
+        "since", "so", "some", "such", "than", "that", "the", "their", "them", "then", "there",
+        "these", "they", "this", "those", "through", "to", "too", "two", "under", "until", "up",
+        "use", "used", "very", "was", "we", "were", "what", "when", "where", "which", "while", "who",
+        "whom", "why", "will", "with", "within", "would", "year", "years", "you", "your", "known",
+        "including", "several", "first", "later", "became", "well", "three", "new", "source"
+    },
+    "de": {
+        "aber", "alle", "allem", "allen", "aller", "als", "also", "am", "an", "auch", "auf", "aus",
+        "bei", "bis", "bearbeiten", "bereits", "dann", "das", "dass", "dem", "den", "denen", "der",
+        "des", "die", "dies", "diese", "diesem", "diesen", "dieser", "dieses", "doch", "dort", "durch",
+        "ein", "eine", "einem", "einen", "einer", "eines", "er", "es", "etwa", "für", "gegen", "hat",
+        "hatte", "ihr", "ihre", "im", "in", "ist", "jedoch", "kann", "kein", "man", "mehr", "mit",
+        "nach", "nicht", "noch", "nur", "oder", "ohne", "quelltext", "sein", "seine", "sich", "sie",
+        "sind", "so", "sowie", "um", "und", "unter", "vom", "von", "vor", "war", "waren", "wie",
+        "wird", "wurde", "wurden", "zu", "zum", "zur", "zwei", "zwischen", "über", "seit", "sowohl"
+    },
+    "fr": {
+        "au", "aux", "avec", "ce", "ces", "cette", "dans", "de", "des", "du", "elle", "en", "est",
+        "et", "été", "il", "ils", "la", "le", "les", "leur", "leurs", "lui", "mais", "modifier",
+        "code", "ne", "ni", "nos", "notre", "ou", "où", "par", "pas", "plus", "pour", "qu", "que",
+        "qui", "sa", "se", "ses", "son", "sont", "sur", "un", "une", "vers", "aussi", "entre",
+        "comme", "ont", "dont", "était", "sous", "deux", "après", "avant", "fait", "peut", "tout",
+        "tous", "très", "selon", "ainsi", "depuis", "lors", "année", "années"
+    },
+    "es": {
+        "al", "como", "con", "de", "del", "el", "ella", "en", "entre", "era", "es", "esta", "este",
+        "fue", "ha", "han", "la", "las", "lo", "los", "más", "no", "o", "para", "pero", "por", "que",
+        "se", "sin", "sobre", "su", "sus", "también", "un", "una", "uno", "y", "ya", "editar",
+        "código", "desde", "durante", "hasta", "muy", "son", "otros", "otras", "dos", "año", "años"
+    }
+}
+
+# Harflerden oluşan sözcükler; kesme işaretinden sonraki ek (Göreme'nin) ayrı tutulur
+WORD_RE = re.compile(r"([^\W\d_]+)(?:['’][^\W\d_]+)?")
+# Türkçede I/İ harflerinin doğru küçültülmesi için
+TURKISH_LOWER_TABLE = str.maketrans({"I": "ı", "İ": "i"})
+
+
+def tokenize(content, language="tr"):
+    """
+    İçeriği küçük harfli sözcüklere ayırır; kısa sözcükler ve durdurma sözcükleri atılır
+    :param content: Düz metin içerik
+    :param language: Dil kodu
+    :return: Sözcük listesi
+    """
+    if language in ("tr", "az"):
+        content = content.translate(TURKISH_LOWER_TABLE)
+    stopwords = STOPWORDS.get(language, STOPWORDS["en"])
+    return [
+        word for word in WORD_RE.findall(content.lower())
+        if len(word) >= KEYWORD_MIN_LENGTH and word not in stopwords
+    ]
+
+
+class KeywordIndex:
+    """
+    TF-IDF anahtar kelime çıkarıcı.
+    Her sayfanın terim frekansı vektörü (Counter) bir kez hesaplanıp saklanır;
+    belge frekansları (IDF istatistikleri) sayfa eklendikçe ya da çıkarıldıkça
+    artımlı olarak güncellenir; hiçbir sayfada kalmayan terimler silinir. Bir
+    sayfanın anahtar kelimeleri, sayfa değişmedikçe ve dildeki sayfa sayısı IDF'i
+    KEYWORD_IDF_TOLERANCE'tan fazla kaydırmadıkça önbellekten verilir.
+    """
+    def __init__(self, max_docs=KEYWORD_INDEX_MAX_DOCS, idf_tolerance=KEYWORD_IDF_TOLERANCE):
+        """
+        :param max_docs: Terim frekansı tutulacak en fazla sayfa
+        :param idf_tolerance: Önbellekteki skorların geçerli sayıldığı en fazla IDF kayması
+        """
+        self.max_docs = max_docs
+        self.idf_tolerance = idf_tolerance
+        self.documents = OrderedDict()  # (language, page_id) -> belge kaydı
+        self.document_frequency = {}  # language -> Counter(terim -> belge sayısı)
+        self.document_count = Counter()  # language -> dizindeki sayfa sayısı
+        self.lock = threading.Lock()
+        self.stats = {
+            "documents_added": 0,
+            "hits": 0,
+            "recomputed": 0,
+            "evictions": 0
+        }
+
+    def add_document(self, language, page_id, content):
+        """
+        Sayfanın terim frekanslarını hesaplar ve IDF istatistiklerine ekler.
+        İçerik değişmemişse hiçbir şey yapılmaz.
+        :return: Belge kaydı
+        """
+        key = (language, page_id)
+        content_key = (len(content), hash(content))
+        with self.lock:
+            document = self.documents.get(key)
+            if document is not None and document["content_key"] == content_key:
+                self.documents.move_to_end(key)
+                return document
+
+        # Sayma işlemi kilit dışında (C ile yazılmış Counter ile) yapılır
+        term_counts = Counter(tokenize(content, language))
+        document = {
+            "content_key": content_key,
+            "terms": term_counts,
+            "total": sum(term_counts.values()),
+            "keywords": None,
+            "document_count": None  # anahtar kelimeler hesaplanırken dildeki sayfa sayısı
+        }
+        with self.lock:
+            frequency = self.document_frequency.setdefault(language, Counter())
+            old = self.documents.pop(key, None)
+            if old is not None:
+                self._remove_terms(frequency, old["terms"])
+            else:
+                self.document_count[language] += 1
+            frequency.update(term_counts.keys())
+            self.documents[key] = document
+            self.stats["documents_added"] += 1
+            while len(self.documents) > self.max_docs:
+                (old_language, _), evicted = self.documents.popitem(last=False)
+                self._remove_terms(self.document_frequency[old_language], evicted["terms"])
+                self.document_count[old_language] -= 1
+                self.stats["evictions"] += 1
+        return document
+
+    def keywords(self, language, page_id, content, top_n=10):
+        """
+        Sayfanın TF-IDF skoruna göre en önemli anahtar kelimelerini döndürür
+        :param language: Dil kodu
+        :param page_id: Sayfa ID'si
+        :param content: Sayfa içeriği (dizinde yoksa veya değiştiyse eklenir)
+        :param top_n: Döndürülecek anahtar kelime sayısı
+        :return: [(anahtar kelime, geçme sayısı, TF-IDF skoru), ...] skora göre azalan
+        """
+        document = self.add_document(language, page_id, content)
+        with self.lock:
+            documents = self.document_count[language]
+            cached = document["keywords"]
+            # Sayfada top_n'den az terim varsa önbellekteki liste zaten tüm terimleri içerir
+            if cached is not None and len(cached) >= min(top_n, len(document["terms"])) and abs(
+                math.log((1 + documents) / (1 + document["document_count"]))
+            ) <= self.idf_tolerance:
+                self.stats["hits"] += 1
+                return cached[:top_n]
+            frequency = self.document_frequency[language]
+            terms = document["terms"]
+            total = document["total"] or 1
+            # Yumuşatılmış IDF: tüm sayfalarda geçen terimler de sıfırlanmaz
+            scored = heapq.nlargest(
+                top_n,
+                (
+                    (count / total * (math.log((1 + documents) / (1 + frequency[term])) + 1), term, count)
+                    for term, count in terms.items()
+                )
+            )
+            keywords = [(term, count, round(score, 6)) for score, term, count in scored]
+            document["keywords"] = keywords
+            document["document_count"] = documents
+            self.stats["recomputed"] += 1
+            return keywords
+
+    @staticmethod
+    def _remove_terms(frequency, terms):
+        # Kilit altında çağrılır: belge frekanslarını azaltır, sıfıra inen terimleri siler
+        for term in terms:
+            remaining = frequency[term] - 1
+            if remaining > 0:
+                frequency[term] = remaining
+            else:
+                frequency.pop(term, None)
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["documents"] = len(self.documents)
+            stats["terms"] = {
+                language: len(frequency) for language, frequency in self.document_frequency.items() if frequency
+            }
+            stats["languages"] = {
+                language: count for language, count in self.document_count.items() if count
+            }
+            return stats
@@ -0,0 +1,260 @@
+import bisect
+import contextvars
+import threading
+import time
+from collections import Counter
+
+# Gecikme histogramlarının kova sınırları (sn)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# İstek başına dış servis çağrısı histogramının kova sınırları
+METRICS_CALL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+# Prometheus metin biçimi (exposition format 0.0.4)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Etkin HTTP isteğinin dış servis çağrı sayacı (istek dışında None)
+current_tally = contextvars.ContextVar("current_tally", default=None)
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labelnames, labels, extra=None):
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class CounterMetric:
+    """
+    Yalnızca artan sayaç; etiket değerleri sırasıyla verilir
+    """
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}  # etiket değerleri -> sayı
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        return [(self.name, labels, None, value) for labels, value in values.items()]
+
+
+class GaugeMetric(CounterMetric):
+    """
+    Artıp azalabilen anlık değer (örn. devam eden istek sayısı)
+    """
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        with self.lock:
+            self.values[labels] = value
+
+
+class HistogramMetric:
+    """
+    Sabit kovalı histogram; kova sayaçları gözlemde birikimsiz tutulur,
+    çıktı üretilirken birikimli hale getirilir
+    """
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=METRICS_LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}  # etiket değerleri -> [kova sayaçları (+Inf dahil), toplam, adet]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self.lock:
+            values = {labels: (list(counts), total, count) for labels, (counts, total, count) in self.values.items()}
+        samples = []
+        for labels, (counts, total, count) in values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((self.name + "_bucket", labels, f'le="{format_value(float(bound))}"', cumulative))
+            samples.append((self.name + "_sum", labels, None, total))
+            samples.append((self.name + "_count", labels, None, count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Süreç içi metrik kaydı; kayıtlı metrikleri ve çıktı anında toplanan
+    değerleri Prometheus metin biçiminde üretir. Gözlemler yalnızca bir
+    sözlük güncellemesidir, biçimlendirme yalnızca /metrics isteğinde yapılır.
+    """
+    def __init__(self):
+        self.metrics = {}  # ad -> metrik
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(CounterMetric(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(GaugeMetric(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=METRICS_LATENCY_BUCKETS):
+        return self._register(HistogramMetric(name, documentation, labelnames, buckets))
+
+    def render(self, collected=()):
+        """
+        Metrikleri Prometheus metin biçiminde üretir
+        :param collected: Çıktı anında toplanan ek metrikler; her biri
+                          (ad, tür, açıklama, etiket adları, [(etiket değerleri, değer), ...])
+        :return: Metin
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, extra, value in metric.samples():
+                lines.append(f"{name}{format_labels(metric.labelnames, labels, extra)} {format_value(value)}")
+        for name, kind, documentation, labelnames, values in collected:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                lines.append(f"{name}{format_labels(labelnames, labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestTally:
+    """
+    Tek bir HTTP isteği (ya da isteğin bir bölümü) süresince yapılan dış servis
+    çağrılarını sayar. Bağlam değişkeniyle (current_tally) iş parçacığı havuzundaki
+    çağrılara da taşınır. Alt sayaçlar (örn. tarama derinliği başına) saydıkları
+    çağrıları üst sayaca da ekler.
+    """
+    def __init__(self, parent=None):
+        """
+        :param parent: Çağrıların ayrıca ekleneceği üst sayaç (None ise yok)
+        """
+        self.calls = Counter()  # servis (wikipedia, gemini) -> çağrı sayısı
+        self.parent = parent
+        self.lock = threading.Lock()
+
+    def add(self, service):
+        with self.lock:
+            self.calls[service] += 1
+        if self.parent is not None:
+            self.parent.add(service)
+
+    def count(self, service):
+        with self.lock:
+            return self.calls[service]
+
+
+def count_upstream_call(service):
+    """
+    Etkin isteğin (varsa) dış servis çağrı sayacını artırır
+    :param service: Servis adı (wikipedia, gemini)
+    """
+    tally = current_tally.get()
+    if tally is not None:
+        tally.add(service)
+
+
+class MetricsMiddleware:
+    """
+    ASGI ara katmanı: uç nokta (rota şablonu) başına gecikme histogramı, devam
+    eden istek göstergesi ve istek başına dış servis çağrısı histogramı tutar.
+    Gecikme yanıt gövdesinin son parçası gönderildiğinde ölçülür (akışlar dahil);
+    çağrı sayısına yanıttan sonra çalışan arka plan görevleri de eklenir.
+    """
+    def __init__(self, app, registry, upstream_services=("wikipedia", "gemini")):
+        """
+        :param app: Sarılan ASGI uygulaması
+        :param registry: Metriklerin kaydedileceği MetricsRegistry
+        :param upstream_services: İstek başına çağrı sayısı raporlanacak servisler
+        """
+        self.app = app
+        self.upstream_services = upstream_services
+        self.latency = registry.histogram(
+            "wiki_http_request_duration_seconds", "Uç nokta yanıt süresi (sn)", ("method", "route", "status")
+        )
+        self.in_flight = registry.gauge("wiki_http_requests_in_flight", "Devam eden HTTP istekleri")
+        self.upstream_calls = registry.histogram(
+            "wiki_http_request_upstream_calls", "İstek başına dış servis çağrısı", ("route", "service"),
+            buckets=METRICS_CALL_COUNT_BUCKETS
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        tally = RequestTally()
+        token = current_tally.set(tally)
+        status = [500]
+        observed = [False]
+
+        def route_name():
+            # FastAPI eşleşen rotayı kapsama (scope) ekler; şablon yolu etiket sayısını sınırlı tutar
+            route = scope.get("route")
+            return getattr(route, "path", None) or "unmatched"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observed[0] = True
+                self.latency.observe(time.perf_counter() - start, scope["method"], route_name(), status[0])
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not observed[0]:
+                self.latency.observe(time.perf_counter() - start, scope["method"], route_name(), 500)
+            raise
+        finally:
+            self.in_flight.dec()
+            current_tally.reset(token)
+            route = route_name()
+            with tally.lock:
+                calls = dict(tally.calls)
+            for service in self.upstream_services:
+                self.upstream_calls.observe(calls.get(service, 0), route, service)
@@ -0,0 +1,118 @@
+import hashlib
+import math
+import operator
+from array import array
+from collections import Counter
+
+from wiki_keywords import tokenize
+
+# MinHash imzasındaki kova (bin) sayısı; tek geçişli (one permutation) MinHash kullanılır
+SIGNATURE_SIZE = 128
+# SimHash parmak izinin bit sayısı
+SIMHASH_BITS = 64
+# Boş kova işareti (hiçbir terim bu kovaya düşmedi)
+EMPTY_BIN = (1 << 64) - 1
+# Benzerlik yöntemleri: minhash (sözcük kümesi Jaccard tahmini), simhash (TF ağırlıklı parmak izi)
+SIMILARITY_METHODS = ("minhash", "simhash")
+
+
+def term_hash(term):
+    """
+    Süreçten bağımsız (PYTHONHASHSEED'den etkilenmeyen) 128 bitlik terim özeti
+    :return: (MinHash için 64 bit, SimHash için 64 bit)
+    """
+    digest = hashlib.blake2b(term.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+def compute_signature(content, language="tr"):
+    """
+    İçerikten sabit boyutlu benzerlik imzası üretir. Sayfa revizyonu başına bir kez
+    hesaplanması yeterlidir; karşılaştırma yalnızca imzalar üzerinden yapılır.
+    :param content: Düz metin içerik
+    :param language: Dil kodu (durdurma sözcükleri için)
+    :return: minhash (array), filled (dolu kovaların bit maskesi) ve simhash (int) alanlarını içeren sözlük
+    """
+    counts = Counter(tokenize(content, language))
+    minhash = array("Q", [EMPTY_BIN]) * SIGNATURE_SIZE
+    bit_weights = [0.0] * SIMHASH_BITS
+    for term, count in counts.items():
+        min_part, sim_part = term_hash(term)
+        index = min_part % SIGNATURE_SIZE
+        value = min_part // SIGNATURE_SIZE
+        if value < minhash[index]:
+            minhash[index] = value
+        weight = 1 + math.log(count)
+        for bit in range(SIMHASH_BITS):
+            if sim_part >> bit & 1:
+                bit_weights[bit] += weight
+            else:
+                bit_weights[bit] -= weight
+    simhash = 0
+    for bit, weight in enumerate(bit_weights):
+        if weight > 0:
+            simhash |= 1 << bit
+    return make_signature(minhash, simhash)
+
+
+def make_signature(minhash, simhash):
+    filled = 0
+    for index, value in enumerate(minhash):
+        if value != EMPTY_BIN:
+            filled |= 1 << index
+    return {"minhash": minhash, "filled": filled, "simhash": simhash}
+
+
+def signature_to_bytes(signature):
+    """
+    İmzayı önbellekte saklamak için bayt dizisine çevirir
+    """
+    return signature["minhash"].tobytes() + signature["simhash"].to_bytes(SIMHASH_BITS // 8, "little")
+
+
+def signature_from_bytes(data):
+    """
+    signature_to_bytes ile saklanan imzayı geri yükler
+    """
+    minhash = array("Q")
+    minhash.frombytes(data[:SIGNATURE_SIZE * 8])
+    return make_signature(minhash, int.from_bytes(data[SIGNATURE_SIZE * 8:], "little"))
+
+
+def minhash_similarity(first, second):
+    """
+    İki sayfanın sözcük kümeleri arasındaki Jaccard benzerliğinin MinHash tahmini
+    :return: 0 ile 1 arasında benzerlik
+    """
+    used = bin(first["filled"] | second["filled"]).count("1")
+    if used == 0:
+        return 0.0
+    # İki imzada da boş olan kovalar eşit sayılır; bunları çıkaralım
+    matches = sum(map(operator.eq, first["minhash"], second["minhash"])) - (SIGNATURE_SIZE - used)
+    return matches / used
+
+
+def simhash_similarity(first, second):
+    """
+    SimHash parmak izleri arasındaki Hamming uzaklığına dayalı benzerlik
+    :return: 0 ile 1 arasında benzerlik
+    """
+    return 1 - bin(first["simhash"] ^ second["simhash"]).count("1") / SIMHASH_BITS
+
+
+def similarity_matrix(signatures, method="minhash"):
+    """
+    İmzalar için N×N simetrik benzerlik matrisi üretir
+    :param signatures: İmza listesi
+    :param method: minhash veya simhash
+    :return: Liste listesi (köşegen 1.0)
+    """
+    compare = minhash_similarity if method == "minhash" else simhash_similarity
+    size = len(signatures)
+    matrix = [[1.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1, size):
+            value = round(compare(signatures[i], signatures[j]), 4)
+            matrix[i][j] = value
+            matrix[j][i] = value
+    return matrix
@@ -0,0 +1,332 @@
+import html
+import re
+
+# İçeriğiyle birlikte tamamen atlanan etiketler
+SKIPPED_TAGS = {"style", "script", "noscript", "template"}
+# Bu sınıflardan birini taşıyan düğümler (kaynak işaretleri, gezinti kutuları vb.) atlanır
+SKIPPED_CLASSES = {
+    "reference", "references", "reflist", "mw-references-wrap", "mw-cite-backlink",
+    "navbox", "navbox-styles", "vertical-navbox", "mw-editsection", "noprint",
+    "metadata", "toc", "mw-empty-elt"
+}
+# Paragraf (boş satır) ve satır sonu üreten blok etiketleri
+PARAGRAPH_TAGS = {
+    "p", "div", "table", "ul", "ol", "dl", "blockquote", "pre", "section",
+    "figure", "h1", "h2", "h3", "h4", "h5", "h6"
+}
+LINE_TAGS = {"br", "li", "tr", "dd", "dt", "figcaption", "caption"}
+CELL_TAGS = {"td", "th"}
+# Kapanış etiketi olmayan (boş) HTML öğeleri
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr"
+}
+
+# Atlanan düğümlerin başlangıçları iki ayrı ifadeyle aranır: yorumlar ve atlanan
+# etiketler ("<" ile başlar) ile atlanacak sınıf taşıyan class öznitelikleri
+# ('class="' ile başlar). Her iki ifade de sabit bir önekle başladığı için re
+# belge üzerinde hızlı önek aramasıyla ilerler; tek bir seçenekli ifadede bu
+# ön süzgeç kaybolur. Sınıf ifadesi yalnızca tam sınıf adlarını eşler
+# ("reference-text" eşleşmez). MediaWiki etiketleri küçük harfle ürettiği için
+# ifadeler büyük/küçük harf duyarlıdır (IGNORECASE taramayı birkaç kat yavaşlatır).
+SKIPPED_TAG_RE = re.compile(r'<(?:!--|(' + "|".join(sorted(SKIPPED_TAGS)) + r')\b)')
+SKIPPED_CLASS_RE = re.compile(
+    r'class="(?:[^"]*\s)?(?:' + "|".join(re.escape(name) for name in sorted(SKIPPED_CLASSES)) + r')[\s"]'
+)
+TAG_NAME_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)')
+# İçeriği ham metin olan (iç içe etiket içermeyen) etiketler; kapanışları doğrudan aranır
+RAW_TEXT_TAGS = {"style", "script"}
+# Kalan etiketler paragraf tamponu yerine get_text() içinde sabit değiştirmelerle
+# işlenir: blok etiketleri işarete, hücreler boşluğa dönüşür, diğerleri silinir
+PARAGRAPH_TAG_RE = re.compile(r'</?(?:' + "|".join(sorted(PARAGRAPH_TAGS)) + r')\b[^>]*>')
+LINE_TAG_RE = re.compile(r'</?(?:' + "|".join(sorted(LINE_TAGS)) + r')\b[^>]*>')
+CELL_TAG_RE = re.compile(r'</?(?:' + "|".join(sorted(CELL_TAGS)) + r')\b[^>]*>')
+INLINE_TAG_RE = re.compile(r'<[^>]*>')
+# Tarama sırasında paragraf/satır sonu yerine konan işaretler ve bunları
+# (aralarındaki boşluklarla birlikte) tek bir sona indiren ifadeler. Her ifade
+# bir işaretle başlar; paragraf işaretinden önceki satır işaretleri önce silinir,
+# böylece geri çağırma (callback) olmadan en güçlü son seçilir.
+PARAGRAPH_MARK = "\x00"
+LINE_MARK = "\x01"
+LEADING_LINE_MARKS_RE = re.compile(r'\x01[\x01 ]*(?=\x00)')
+PARAGRAPH_BREAK_RE = re.compile(r'\x00[\x00\x01 ]*')
+LINE_BREAK_RE = re.compile(r'\x01[\x01 ]*')
+_open_tag_patterns = {}
+
+
+def _open_tag_pattern(tag):
+    # Atlanan düğümün içindeki aynı adlı açılış etiketlerini bulan ifade (etiket başına bir kez derlenir)
+    pattern = _open_tag_patterns.get(tag)
+    if pattern is None:
+        pattern = re.compile(r'<' + re.escape(tag) + r'\b')
+        _open_tag_patterns[tag] = pattern
+    return pattern
+
+
+class HTMLTextExtractor:
+    """
+    HTML'i düz metne çeviren artımlı (incremental) dönüştürücü.
+    Belge yalnızca atlanacak düğümlerin (yorum, stil, betik, kaynak, gezinti
+    kutusu vb.) başlangıçları için taranır; atlanan düğümün sonuna kapanış
+    etiketi str.find ile aranarak tek adımda geçilir. Aradaki düz metin ve
+    etiketler belirteç belirteç işlenmez, olduğu gibi tampona eklenir; blok
+    etiketleri, satır içi etiketler ve karakter kodları get_text() içinde tüm
+    metin üzerinde birkaç sabit değiştirmeyle işlenir.
+    Tüm HTML karakter kodları çözülür, paragraf sonları korunur.
+    Büyük belgeler parça parça feed() ile verilebilir; sonuç get_text() ile alınır.
+    """
+    def __init__(self):
+        self.parts = []
+        self.skip_tag = None
+        self.skip_depth = 0
+        self.rest = ""
+
+    def feed(self, data):
+        """
+        HTML'in bir sonraki parçasını işler; yarım kalan etiket sonraki parçaya bırakılır
+        """
+        data = self.rest + data
+        end = len(data)
+        last_open = data.rfind("<")
+        if last_open != -1 and data.find(">", last_open) == -1:
+            end = last_open
+        comment_open = data.rfind("<!--", 0, end)
+        if comment_open != -1 and data.find("-->", comment_open) == -1:
+            end = comment_open
+        self.rest = data[end:]
+        self._scan(data, end)
+
+    def get_text(self):
+        """
+        Şimdiye kadar verilen HTML'in düz metnini döndürür
+        """
+        if self.rest:
+            rest, self.rest = self.rest, ""
+            if self.skip_tag is None:
+                self.parts.append(rest)
+        # Etiketler, karakter kodları ve boşluklar tüm metin üzerinde tek seferde
+        # işlenir; işaretler en güçlü satır/paragraf sonuna indirgenir
+        text = "".join(self.parts)
+        self.parts = [text]
+        if "<" in text:
+            text = PARAGRAPH_TAG_RE.sub(PARAGRAPH_MARK, text)
+            text = LINE_TAG_RE.sub(LINE_MARK, text)
+            text = CELL_TAG_RE.sub(" ", text)
+            text = INLINE_TAG_RE.sub("", text)
+        if "&" in text:
+            text = html.unescape(text)
+        text = " ".join(text.split())
+        if PARAGRAPH_MARK in text:
+            text = LEADING_LINE_MARKS_RE.sub("", text)
+            text = PARAGRAPH_BREAK_RE.sub("\n\n", text)
+        if LINE_MARK in text:
+            text = LINE_BREAK_RE.sub("\n", text)
+        return text.replace(" \n", "\n").strip()
+
+    def _scan(self, data, end):
+        pos = 0
+        parts = self.parts
+        # Her ifadenin son eşleşmesi, gerisinde kalınmadıkça yeniden aranmaz
+        # (False: henüz aranmadı, None: parçada başka eşleşme yok)
+        tag_match = class_match = False
+        while pos < end:
+            if self.skip_tag is not None:
+                pos = self._skip(data, pos, end)
+                continue
+            if tag_match is False or (tag_match is not None and tag_match.start() < pos):
+                tag_match = SKIPPED_TAG_RE.search(data, pos, end)
+            if class_match is False or (class_match is not None and class_match.start() < pos):
+                class_match = SKIPPED_CLASS_RE.search(data, pos, end)
+            if tag_match is None and class_match is None:
+                parts.append(data[pos:end])
+                break
+            
+            if class_match is None or (tag_match is not None and tag_match.start() < class_match.start()):
+                start = tag_match.start()
+                tag = tag_match.group(1)
+                if tag is None:
+                    # Yorum: feed() kapanmamış yorumu sonraki parçaya bıraktığı için kapanış bu parçadadır
+                    parts.append(data[pos:start])
+                    pos = data.find("-->", tag_match.end(), end) + 3
+                    continue
+            else:
+                # class özniteliğinin ait olduğu açılış etiketi
+                start = data.rfind("<", pos, class_match.start())
+                name = TAG_NAME_RE.match(data, start) if start != -1 else None
+                if name is None or data.find(">", start, class_match.start()) != -1:
+                    # Etiket dışındaki metin
+                    parts.append(data[pos:class_match.end()])
+                    pos = class_match.end()
+                    continue
+                tag = name.group(1)
+            
+            parts.append(data[pos:start])
+            tag_end = data.find(">", start, end) + 1
+            pos = tag_end
+            if tag not in VOID_TAGS and data[tag_end - 2] != "/":
+                self.skip_tag = tag
+                self.skip_depth = 1
+    
+    def _skip(self, data, pos, end):
+        # Atlanan düğümün kapanış etiketine str.find ile atlar; aradaki aynı adlı
+        # açılış etiketleri sayılarak iç içe düğümler birlikte atlanır
+        tag = self.skip_tag
+        close = "</" + tag
+        while True:
+            close_at = data.find(close, pos, end)
+            while close_at != -1 and data[close_at + len(close)] not in "> \t\r\n":
+                # "</a" araması "</abbr" ile eşleşmemeli
+                close_at = data.find(close, close_at + len(close), end)
+            if tag not in RAW_TEXT_TAGS:
+                self.skip_depth += len(_open_tag_pattern(tag).findall(data, pos, end if close_at == -1 else close_at))
+            if close_at == -1:
+                return end
+            pos = data.find(">", close_at, end) + 1
+            self.skip_depth -= 1
+            if self.skip_depth == 0:
+                self.skip_tag = None
+                return pos
+
+
+def html_to_text(html_content):
+    """
+    HTML içeriğini düz metne dönüştürür (paragraflar boş satırla ayrılır)
+    :param html_content: HTML metni
+    :return: Düz metin
+    """
+    extractor = HTMLTextExtractor()
+    extractor.feed(html_content)
+    return extractor.get_text()
+
+
+# Dile göre temizleme kuralları:
+#   edit_links: "[değiştir | kaynağı değiştir]" gibi köşeli parantezli düzenleme bağlantıları
+#   edit_words: "(düzenle)" gibi parantezli düzenleme bağlantıları
+#   file_prefixes: dosya/medya ad alanı önekleri
+#   skipped_sections: içeriğe katılmayacak bölüm başlıklarında aranan sözcükler (küçük harf)
+CLEANUP_RULES = {
+    "tr": {
+        "edit_links": [["değiştir", "kaynağı değiştir"]],
+        "edit_words": ["düzenle"],
+        "file_prefixes": ["Dosya", "Resim"],
+        "skipped_sections": ["kaynakça", "referans", "dipnot", "dış bağlantı", "ayrıca bakınız"]
+    },
+    "en": {
+        "edit_links": [["edit", "edit source"]],
+        "edit_words": ["edit"],
+        "file_prefixes": ["File", "Image"],
+        "skipped_sections": ["references", "notes", "external links", "see also", "further reading", "bibliography"]
+    },
+    "de": {
+        "edit_links": [["Bearbeiten", "Quelltext bearbeiten"]],
+        "edit_words": ["bearbeiten"],
+        "file_prefixes": ["Datei", "Bild"],
+        "skipped_sections": ["einzelnachweise", "anmerkungen", "literatur", "weblinks", "siehe auch", "quellen"]
+    },
+    "fr": {
+        "edit_links": [["modifier", "modifier le code"]],
+        "edit_words": ["modifier"],
+        "file_prefixes": ["Fichier", "Image"],
+        "skipped_sections": ["références", "notes", "bibliographie", "liens externes", "voir aussi", "articles connexes"]
+    },
+    "es": {
+        "edit_links": [["editar", "editar código"]],
+        "edit_words": ["editar"],
+        "file_prefixes": ["Archivo", "Imagen"],
+        "skipped_sections": ["referencias", "notas", "bibliografía", "enlaces externos", "véase también"]
+    }
+}
+# Her dilde geçerli kurallar: kanonik ad alanları ve İngilizce düzenleme bağlantıları
+# (çeviri eksik vikilerde arayüz metinleri İngilizce kalabilir)
+COMMON_CLEANUP_RULES = {
+    "edit_links": [["edit", "edit source"]],
+    "edit_words": ["edit"],
+    "file_prefixes": ["File", "Image", "Media"],
+    "skipped_sections": []
+}
+# \n{3,} yerine düz önekli yazım: re, sabit önek "\n\n\n" ile hızlı arama yapar
+EXTRA_NEWLINES_RE = re.compile(r'\n\n\n+')
+_content_cleaners = {}
+
+
+class WikiContentCleaner:
+    """
+    Dile özgü kural tablosundan derlenen içerik temizleyici.
+    Düzenleme bağlantıları, CSS kuralları, dosya/medya başvuruları ve kaynak
+    numaraları tek bir derlenmiş ifadede birleştirilir; metin üzerinden yalnızca
+    iki geçiş yapılır (kuralların silinmesi ve fazla boş satırların sadeleştirilmesi).
+    """
+    def __init__(self, language="tr"):
+        """
+        :param language: Dil kodu (tabloda yoksa yalnızca ortak kurallar kullanılır)
+        """
+        self.language = language
+        rules = CLEANUP_RULES.get(language, {})
+        
+        def merged(key):
+            # Dilin kuralları önce, ortak kurallar sonra; tekrarlar atılır
+            values = []
+            for value in rules.get(key, []) + COMMON_CLEANUP_RULES[key]:
+                if value not in values:
+                    values.append(value)
+            return values
+        
+        self.skipped_sections = [word.lower() for word in merged("skipped_sections")]
+        alternatives = [
+            # [değiştir | kaynağı değiştir]
+            r'\[\s*' + r'\s*\|\s*'.join(
+                r'\s+'.join(re.escape(word) for word in part.split()) for part in link
+            ) + r'\s*\]'
+            for link in merged("edit_links")
+        ]
+        # (düzenle) / (Düzenle)
+        alternatives.append(r'\(\s*(?:' + "|".join(
+            f"[{word[0].upper()}{word[0].lower()}]{re.escape(word[1:])}" for word in merged("edit_words")
+        ) + r')\s*\)')
+        # CSS sınıf tanımları
+        alternatives.append(r'\.mw-parser-output\s+\.[^{]+\{[^}]+\}')
+        # Dosya ve medya başvuruları (her önek ayrı seçenek: tüm seçeneklerin düz bir
+        # karakterle başlaması re'nin ilk karakter ön süzgecini etkinleştirir)
+        alternatives.extend(re.escape(prefix) + r':[^\]]+\]' for prefix in merged("file_prefixes"))
+        # Kaynak numaraları
+        alternatives.append(r'\[\d+\]')
+        self.pattern = re.compile("|".join(alternatives))
+
+    def clean(self, content):
+        """
+        Wikipedia içeriğinden gereksiz metinleri temizler
+        :param content: Düz metin içerik
+        :return: Temizlenmiş içerik
+        """
+        content = self.pattern.sub("", content)
+        return EXTRA_NEWLINES_RE.sub("\n\n", content)
+
+    def is_skipped_section(self, section_title):
+        """
+        Referans, Kaynakça gibi içeriğe katılmayacak bölümleri belirler
+        :param section_title: Bölüm başlığı
+        :return: Bölüm atlanacaksa True
+        """
+        section_title = section_title.lower()
+        return any(skip_word in section_title for skip_word in self.skipped_sections)
+
+
+def get_content_cleaner(language="tr"):
+    """
+    Dil için derlenmiş temizleyiciyi döndürür (dil başına bir kez derlenir)
+    """
+    cleaner = _content_cleaners.get(language)
+    if cleaner is None:
+        cleaner = WikiContentCleaner(language)
+        _content_cleaners[language] = cleaner
+    return cleaner
+
+
+def clean_wiki_content(content, language="tr"):
+    """
+    Wikipedia içeriğini dilin kural tablosuna göre temizler
+    :param content: Düz metin içerik
+    :param language: Dil kodu
+    :return: Temizlenmiş içerik
+    """
+    return get_content_cleaner(language).clean(content)
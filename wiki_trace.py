@@ -0,0 +1,302 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+# İzlemeyi başlatan istek başlığı (değer: 1) ve yanıtta döndürülen izleme kimliği başlığı
+TRACE_REQUEST_HEADER = "x-wiki-trace"
+TRACE_ID_HEADER = "X-Wiki-Trace-Id"
+# "0" ise izleme başlığı yok sayılır
+TRACE_ENABLED = os.environ.get("WIKI_TRACE_ENABLED", "1") != "0"
+# Tamamlanan izlerin OTLP/JSON satırları olarak ekleneceği dosya (boş ise dosyaya yazılmaz)
+TRACE_FILE = os.environ.get("WIKI_TRACE_FILE", "")
+# Bellekte tutulan iz sayısı ve süresi (GET /traces/{trace_id})
+TRACE_STORE_MAX_ENTRIES = 200
+TRACE_STORE_TTL = 3600
+# Tek bir izdeki en fazla span (fazlası sayılır ama kaydedilmez)
+TRACE_MAX_SPANS = 2000
+# OTLP servis adı
+TRACE_SERVICE_NAME = "kapadokya-wiki-api"
+
+# OTLP span türleri
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# Etkin iz ve span: (Trace, span sözlüğü); izlenmeyen isteklerde None
+current_span = contextvars.ContextVar("current_span", default=None)
+
+logger = logging.getLogger(__name__)
+
+_trace_file_lock = threading.Lock()
+
+
+class Trace:
+    """
+    Tek bir HTTP isteğinin span ağacı. Span'ler düz bir listede, üst span
+    kimlikleriyle tutulur; iş parçacıklarından eşzamanlı eklenebilir.
+    """
+    def __init__(self, name, attributes=None):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self.dropped = 0
+        self.finished = False
+        self.lock = threading.Lock()
+        self.root = self.start_span(name, None, attributes, SPAN_KIND_SERVER)
+
+    def start_span(self, name, parent_id, attributes=None, kind=SPAN_KIND_INTERNAL):
+        """
+        :return: Yeni span sözlüğü (sınır aşıldıysa izde yer almayan bir span)
+        """
+        span = {
+            "span_id": secrets.token_hex(8),
+            "parent_id": parent_id,
+            "name": name,
+            "kind": kind,
+            "start": time.time_ns(),
+            "end": None,
+            "attributes": dict(attributes or {}),
+            "events": [],
+            "error": None
+        }
+        with self.lock:
+            if len(self.spans) < TRACE_MAX_SPANS:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+        return span
+
+    def _snapshot(self):
+        with self.lock:
+            spans = [
+                dict(span, attributes=dict(span["attributes"]), events=list(span["events"])) for span in self.spans
+            ]
+            return spans, self.dropped
+
+    def to_tree(self):
+        """
+        İzi iç içe ağaç olarak döndürür; süreler kök span başlangıcına göre milisaniyedir.
+        Kardeş span'ler başlangıç zamanına göre sıralanır, böylece ardışık (seri) çağrı
+        zincirleri ile paralel çağrılar ayırt edilebilir.
+        """
+        spans, dropped = self._snapshot()
+        now = time.time_ns()
+        origin = self.root["start"]
+        nodes = {}
+        for span in spans:
+            end = span["end"] if span["end"] is not None else now
+            node = {
+                "name": span["name"],
+                "span_id": span["span_id"],
+                "start_ms": round((span["start"] - origin) / 1e6, 3),
+                "duration_ms": round((end - span["start"]) / 1e6, 3),
+                "attributes": span["attributes"],
+                "children": []
+            }
+            if span["end"] is None:
+                node["open"] = True
+            if span["error"]:
+                node["error"] = span["error"]
+            if span["events"]:
+                node["events"] = [
+                    {"name": name, "at_ms": round((at - origin) / 1e6, 3), "attributes": attributes}
+                    for name, at, attributes in span["events"]
+                ]
+            nodes[span["span_id"]] = node
+        for span in spans:
+            parent = nodes.get(span["parent_id"])
+            if parent is not None:
+                parent["children"].append(nodes[span["span_id"]])
+        for node in nodes.values():
+            node["children"].sort(key=lambda child: child["start_ms"])
+        upstream = {}
+        for span in spans:
+            if span["kind"] == SPAN_KIND_CLIENT:
+                service = span["attributes"].get("wiki.upstream", "other")
+                upstream[service] = upstream.get(service, 0) + 1
+        return {
+            "trace_id": self.trace_id,
+            "finished": self.finished,
+            "span_count": len(spans),
+            "dropped_spans": dropped,
+            "upstream_calls": upstream,
+            "root": nodes[self.root["span_id"]]
+        }
+
+    def to_otlp(self, service_name=TRACE_SERVICE_NAME):
+        """
+        İzi OpenTelemetry OTLP/JSON (ExportTraceServiceRequest) biçiminde döndürür
+        """
+        spans, _ = self._snapshot()
+        now = time.time_ns()
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                "traceId": self.trace_id,
+                "spanId": span["span_id"],
+                "name": span["name"],
+                "kind": span["kind"],
+                "startTimeUnixNano": str(span["start"]),
+                "endTimeUnixNano": str(span["end"] if span["end"] is not None else now),
+                "attributes": otlp_attributes(span["attributes"]),
+                "events": [
+                    {"name": name, "timeUnixNano": str(at), "attributes": otlp_attributes(attributes)}
+                    for name, at, attributes in span["events"]
+                ],
+                "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1}
+            }
+            if span["parent_id"]:
+                otlp_span["parentSpanId"] = span["parent_id"]
+            otlp_spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": otlp_attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "wiki_trace"}, "spans": otlp_spans}]
+            }]
+        }
+
+
+def otlp_attributes(attributes):
+    """
+    Sözlüğü OTLP öznitelik listesine çevirir
+    """
+    converted = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        converted.append({"key": key, "value": typed})
+    return converted
+
+
+@contextmanager
+def trace_span(name, attributes=None, kind=SPAN_KIND_INTERNAL):
+    """
+    Etkin izde (varsa) etkin span'in altında yeni bir span açar. İzlenmeyen
+    isteklerde yalnızca bağlam değişkeni okunur ve None verilir.
+    :param name: Span adı
+    :param attributes: Öznitelikler
+    :param kind: OTLP span türü
+    :return: Span sözlüğü veya None
+    """
+    active = current_span.get()
+    if active is None:
+        yield None
+        return
+    trace, parent = active
+    span = trace.start_span(name, parent["span_id"], attributes, kind)
+    token = current_span.set((trace, span))
+    try:
+        yield span
+    except BaseException as e:
+        span["error"] = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        span["end"] = time.time_ns()
+        current_span.reset(token)
+
+
+def set_span_attributes(span, attributes):
+    """
+    trace_span ile açılan span'e öznitelik ekler (span None ise bir şey yapmaz)
+    """
+    if span is not None:
+        span["attributes"].update(attributes)
+
+
+def add_span_event(name, attributes=None):
+    """
+    Etkin span'e (varsa) olay ekler; örn. önbellek isabeti/ıskalaması
+    """
+    active = current_span.get()
+    if active is not None:
+        trace, span = active
+        with trace.lock:
+            span["events"].append((name, time.time_ns(), dict(attributes or {})))
+
+
+def append_trace_file(trace, path=TRACE_FILE):
+    """
+    Tamamlanan izi OTLP/JSON satırı olarak dosyaya ekler
+    """
+    line = json.dumps(trace.to_otlp(), ensure_ascii=False)
+    with _trace_file_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class TraceMiddleware:
+    """
+    ASGI ara katmanı: X-Wiki-Trace başlığı taşıyan isteklerde span ağacı kaydeder.
+    İz kimliği yanıtta X-Wiki-Trace-Id başlığıyla döner; iz, uygulamanın
+    trace_store önbelleğinden (GET /traces/{trace_id}) alınabilir ve
+    WIKI_TRACE_FILE ayarlıysa OTLP/JSON olarak dosyaya eklenir. Yanıttan sonra
+    çalışan arka plan görevleri de aynı ize eklenir.
+    """
+    def __init__(self, app, enabled=TRACE_ENABLED, trace_file=TRACE_FILE):
+        """
+        :param app: Sarılan ASGI uygulaması
+        :param enabled: False ise izleme başlığı yok sayılır
+        :param trace_file: İzlerin ekleneceği dosya (boş ise yazılmaz)
+        """
+        self.app = app
+        self.enabled = enabled
+        self.trace_file = trace_file
+
+    def requested(self, scope):
+        for name, value in scope.get("headers", ()):
+            if name == TRACE_REQUEST_HEADER.encode("latin-1"):
+                return value.strip() not in (b"", b"0", b"false")
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or not self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+        trace = Trace(f"{scope['method']} {scope['path']}", {
+            "http.method": scope["method"],
+            "url.path": scope["path"],
+            "url.query": scope.get("query_string", b"").decode("latin-1")
+        })
+        store = getattr(getattr(scope.get("app"), "state", None), "trace_store", None)
+        if store is not None:
+            store.put(trace.trace_id, trace)
+        token = current_span.set((trace, trace.root))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                trace.root["attributes"]["http.status_code"] = message["status"]
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (TRACE_ID_HEADER.lower().encode("latin-1"), trace.trace_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            trace.root["error"] = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                trace.root["name"] = f"{scope['method']} {route}"
+                trace.root["attributes"]["http.route"] = route
+            trace.root["end"] = time.time_ns()
+            trace.finished = True
+            if self.trace_file:
+                try:
+                    await asyncio.to_thread(append_trace_file, trace, self.trace_file)
+                except OSError:
+                    logger.exception("İz dosyaya yazılamadı (%s)", self.trace_file)
@@ -1,35 +1,412 @@
-from fastapi import FastAPI, Query, Path, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, Query, Path, HTTPException, Request, Response, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
+from requests.adapters import HTTPAdapter
 import requests
+import asyncio
+import contextvars
+import hashlib
 import json
+import logging
 import urllib.parse
 import re
 import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import uuid
 
-# OpenAI entegrasyonu
-import google.generativeai as genai
+from wiki_cache import PageContentCache, TTLCache, ImageDiskCache, ReportStore
+from wiki_index import LocalSearchIndex
+from wiki_keywords import KeywordIndex
+from wiki_metrics import (
+    METRICS_CONTENT_TYPE, MetricsMiddleware, MetricsRegistry, RequestTally, count_upstream_call, current_tally
+)
+from wiki_similarity import (
+    SIMILARITY_METHODS, compute_signature, minhash_similarity, signature_from_bytes, signature_to_bytes,
+    similarity_matrix
+)
+from wiki_text import html_to_text, clean_wiki_content, get_content_cleaner
+from wiki_trace import (
+    SPAN_KIND_CLIENT, TRACE_STORE_MAX_ENTRIES, TRACE_STORE_TTL, TraceMiddleware, add_span_event, set_span_attributes,
+    trace_span
+)
+
+# Wikipedia'ya giden bağlantı havuzu ayarları (her dilin kendi oturumu vardır).
+# Oturum başına host havuzları: {dil}.wikipedia.org ve upload.wikimedia.org (küçük resimler);
+# host başına bağlantı sayısı iş parçacığı havuzunun (40) üzerinde tutulur
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 50
+# Geçerli Wikipedia dil kodu biçimi (örn: tr, en, simple, zh-min-nan, be-x-old)
+LANGUAGE_CODE_RE = re.compile(r'[a-z]{2,12}(?:-[a-z]{1,12}){0,2}')
+WIKIPEDIA_HOST_SUFFIX = ".wikipedia.org"
+# En fazla kaç dil için ayrı oturum tutulacağı (aşılırsa en uzun süre kullanılmayan dilin oturumu kapatılır)
+SERVICE_REGISTRY_MAX_LANGUAGES = 32
+# Açılışta bağlantıları önceden açılacak diller (virgülle ayrılmış, boşsa kapalı) ve dil başına bağlantı sayısı
+PREWARM_LANGUAGES = [
+    language.strip() for language in os.environ.get("WIKI_PREWARM_LANGUAGES", "tr").split(",") if language.strip()
+]
+PREWARM_CONNECTIONS = 4
+HTTP_USER_AGENT = "KapadokyaWikiAPI/1.0 (https://github.com/Merttnkt/kapadokya_hackathon_webapi)"
+
+# Filtreli aramalarda tek istekte alınacak en fazla sonuç ve taranacak en fazla sayfa
+SEARCH_MAX_BATCH = 50
+SEARCH_MAX_REFILL_PAGES = 5
+# Arama kaynakları: remote (Wikipedia), local (yerel FTS5 dizini), auto (önce yerel dizin;
+# limit kadar sonuç bulunamazsa Wikipedia sonuçlarıyla birleştirilir)
+SEARCH_SOURCES = ("remote", "local", "auto")
+# İçerik analizinde döndürülecek anahtar kelime sayısı
+ANALYZE_KEYWORD_COUNT = 10
+# Benzerlik matrisinde tek istekte karşılaştırılabilecek en fazla sayfa
+SIMILARITY_MAX_PAGES = 50
+# Toplu sayfa uç noktası: MediaWiki sorgusu başına sayfa, istek başına en fazla sayfa,
+# seçilebilen alanlar ve aynı anda alınacak en fazla tam içerik
+PAGE_BATCH_SIZE = 50
+PAGE_BATCH_MAX_IDS = 500
+PAGE_BATCH_FIELDS = ("info", "categories", "extract", "content")
+PAGE_BATCH_CONTENT_CONCURRENCY = 8
+# Arama raporlarında sayfa başına listelenecek resim sayısı
+REPORT_IMAGES_PER_PAGE = 5
+
+# Resim bilgisi sorgularında tek istekte çözülecek en fazla dosya (MediaWiki sınırı)
+IMAGE_BATCH_SIZE = 50
+# mime_types="photo" kısaltmasının karşılığı: simge, bayrak ve harita gibi SVG'ler hariç
+PHOTO_MIME_TYPES = ["image/jpeg", "image/png", "image/webp", "image/tiff"]
+# Başlık -> sayfa ID çözümlemesinde tek istekteki en fazla başlık ve çözümleme önbelleği ayarları
+TITLE_BATCH_SIZE = 50
+TITLE_CACHE_MAX_ENTRIES = 50000
+TITLE_CACHE_TTL = 24 * 3600
+# Küçük resim vekili: istenen genişlik bu basamaklardan bir üstekine yuvarlanır
+# (önbellekte aynı resmin çok sayıda farklı boyutu birikmesin diye)
+THUMBNAIL_WIDTHS = [120, 240, 320, 480, 640, 800, 1024, 1280, 1920]
+THUMBNAIL_DEFAULT_WIDTH = 640
+THUMBNAIL_CACHE_CONTROL = "public, max-age=86400"
+THUMBNAIL_ALLOWED_HOSTS = {"upload.wikimedia.org"}
+# Rapor indirme: içerik türü, önbellek süresi, eşit tercihte kodlama önceliği ve
+# hazırlanan rapor için önerilen yeniden deneme süresi (sn)
+REPORT_MEDIA_TYPE = "text/plain; charset=utf-8"
+REPORT_CACHE_CONTROL = "private, max-age=3600"
+REPORT_ENCODING_PREFERENCE = ("zstd", "gzip")
+REPORT_RETRY_AFTER = 2
+
+# Parse çıktısındaki bölüm başlıkları ve kimlikleri (eski ve yeni başlık biçimleri)
+SECTION_HEADING_RE = re.compile(r'<h([2-6])\b[^>]*>(.*?)</h\1\s*>', re.DOTALL | re.IGNORECASE)
+HEADING_ID_RE = re.compile(r'\bid="([^"]+)"')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+
+# Gemini ayarları: ilk model başarısız olursa ikincisi denenir
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")  # YOUR API KEY
+GEMINI_MODELS = ["models/gemini-pro", "models/gemini-2.5-flash-preview-04-17"]
+# Ertelenmiş rehber özeti işçileri ve işlerin saklanma ayarları
+SUMMARY_WORKERS = 4
+SUMMARY_MAX_JOBS = 1000
+SUMMARY_JOB_TTL = 3600
+# Rehber özeti önbelleği ayarları
+SUMMARY_CACHE_MAX_ENTRIES = 2000
+SUMMARY_CACHE_TTL = 7 * 24 * 3600
+# Konu araştırması taraması: eşzamanlı işlenen sayfa sayısı, derinliğe göre sayfa
+# başına izlenecek bağlantı sayısı, sayfa başına bakılan bağlantı, toplam sayfa ve süre sınırı (sn)
+CRAWL_MAX_CONCURRENCY = 8
+CRAWL_FAN_OUT = {1: 3, 2: 2}
+CRAWL_LINKS_PER_PAGE = 10
+CRAWL_MAX_PAGES = 60
+CRAWL_DEADLINE = 20.0
+
+logger = logging.getLogger(__name__)
+
+_gemini_models = {}
+_gemini_lock = threading.Lock()
+
+# Dış servis çağrılarının metrikleri (/metrics)
+metrics = MetricsRegistry()
+upstream_requests = metrics.counter(
+    "wiki_upstream_requests_total", "Wikipedia'ya yapılan istekler",
+    ("host", "api", "action", "target", "status")
+)
+upstream_latency = metrics.histogram(
+    "wiki_upstream_request_duration_seconds", "Wikipedia istek süresi (yanıt gövdesi dahil, sn)",
+    ("host", "api", "action", "target")
+)
+upstream_bytes = metrics.counter(
+    "wiki_upstream_response_bytes_total", "Wikipedia yanıtlarının toplam boyutu (bayt)",
+    ("host", "api", "action", "target")
+)
+upstream_in_flight = metrics.gauge("wiki_upstream_requests_in_flight", "Devam eden Wikipedia istekleri", ("host",))
+gemini_requests = metrics.counter("wiki_gemini_requests_total", "Gemini çağrıları", ("model", "status"))
+gemini_latency = metrics.histogram("wiki_gemini_request_duration_seconds", "Gemini çağrı süresi (sn)", ("model",))
+# host etiketinde ayrı tutulacak en fazla host; fazlası ve tanınmayan hostlar "other" olarak sayılır
+METRICS_MAX_HOSTS = 64
+_metric_hosts = set()
+_metric_hosts_lock = threading.Lock()
+
+
+def get_gemini_model(name):
+    """
+    Gemini yapılandırmasını ve model nesnesini ilk kullanımda bir kez oluşturur,
+    sonraki çağrılarda aynı nesneyi döndürür. google.generativeai büyük bir
+    bağımlılık ağacı yüklediğinden modül de ilk kullanımda içe aktarılır.
+    :param name: Model adı
+    :return: GenerativeModel nesnesi
+    """
+    with _gemini_lock:
+        model = _gemini_models.get(name)
+        if model is None:
+            import google.generativeai as genai
+            if not _gemini_models:
+                genai.configure(api_key=GEMINI_API_KEY)
+            model = genai.GenerativeModel(name)
+            _gemini_models[name] = model
+        return model
+
+
+def summary_cache_key(title, summary, categories, language, model):
+    """
+    Rehber özeti önbelleği için özet girdisinden anahtar (SHA-256) üretir
+    """
+    payload = json.dumps([title, summary, list(categories or []), language, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def metric_host(host):
+    """
+    Host'u metrik etiketine çevirir. Yalnızca küçük resim hostları ve geçerli dil
+    kodlu {dil}.wikipedia.org hostları, METRICS_MAX_HOSTS sınırına kadar kendi
+    adıyla etiketlenir; böylece etiket sayısı istekteki dil koduyla büyümez.
+    :return: Host veya "other"
+    """
+    if host in _metric_hosts:
+        return host
+    if host not in THUMBNAIL_ALLOWED_HOSTS and not (
+        host.endswith(WIKIPEDIA_HOST_SUFFIX) and LANGUAGE_CODE_RE.fullmatch(host[:-len(WIKIPEDIA_HOST_SUFFIX)])
+    ):
+        return "other"
+    with _metric_hosts_lock:
+        if host in _metric_hosts or len(_metric_hosts) < METRICS_MAX_HOSTS:
+            _metric_hosts.add(host)
+            return host
+    return "other"
+
+
+def upstream_operation(url, params=None):
+    """
+    Giden isteği metrik etiketlerine ayırır
+    :return: (host, api, action, target); örn. action API'sinde action=query ve
+             target=generator=search,prop=info|pageimages
+    """
+    parsed = urllib.parse.urlsplit(url)
+    host = metric_host(parsed.hostname or "")
+    if isinstance(params, dict) and "action" in params:
+        target = ",".join(
+            f"{name}={params[name]}" for name in ("generator", "list", "meta", "prop") if name in params
+        )
+        return host, "action", str(params["action"]), target
+    if "/api/rest_v1/" in parsed.path:
+        # /api/rest_v1/page/mobile-sections/<başlık> -> page/mobile-sections
+        return host, "rest", "/".join(parsed.path.split("/api/rest_v1/", 1)[1].split("/")[:2]), ""
+    if parsed.hostname in THUMBNAIL_ALLOWED_HOSTS:
+        return host, "upload", "thumbnail", ""
+    return host, "other", "", ""
+
+
+class MeteredSession(requests.Session):
+    """
+    Her isteğin sayısını, durum kodunu, süresini ve yanıt boyutunu metriklere
+    işleyen HTTP oturumu. Çağrı, etkin HTTP isteğinin çağrı sayacına ve
+    (istek izleniyorsa) span ağacına da eklenir.
+    """
+    def request(self, method, url, *args, **kwargs):
+        host, api, action, target = upstream_operation(url, kwargs.get("params"))
+        count_upstream_call("wikipedia")
+        span_attributes = {
+            "wiki.upstream": "wikipedia",
+            "http.method": method,
+            "server.address": host,
+            "wiki.api": api,
+            "wiki.action": action,
+            "wiki.target": target
+        }
+        with trace_span(f"wikipedia {action} {target}".rstrip(), span_attributes, SPAN_KIND_CLIENT) as span:
+            upstream_in_flight.inc(host)
+            start = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except Exception as e:
+                upstream_requests.inc(host, api, action, target, type(e).__name__)
+                raise
+            finally:
+                upstream_in_flight.dec(host)
+                upstream_latency.observe(time.perf_counter() - start, host, api, action, target)
+            upstream_requests.inc(host, api, action, target, response.status_code)
+            if kwargs.get("stream"):
+                size = int(response.headers.get("Content-Length") or 0)
+            else:
+                size = len(response.content)
+            upstream_bytes.inc(host, api, action, target, amount=size)
+            set_span_attributes(span, {"http.status_code": response.status_code, "http.response.body.size": size})
+        return response
+
+
+def generate_with_metrics(model_name, prompt):
+    """
+    Gemini ile içerik üretir; çağrı sayısını, durumunu ve süresini metriklere işler
+    :return: Gemini yanıtı
+    """
+    count_upstream_call("gemini")
+    span_attributes = {"wiki.upstream": "gemini", "gen_ai.request.model": model_name}
+    with trace_span("gemini generate_content", span_attributes, SPAN_KIND_CLIENT):
+        start = time.perf_counter()
+        try:
+            response = get_gemini_model(model_name).generate_content(prompt)
+        except Exception as e:
+            gemini_requests.inc(model_name, type(e).__name__)
+            raise
+        finally:
+            gemini_latency.observe(time.perf_counter() - start, model_name)
+        gemini_requests.inc(model_name, "ok")
+    return response
+
+
+def create_http_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE):
+    """
+    Bağlantıları yeniden kullanan (keep-alive), havuzlanan ve metrik toplayan bir HTTP oturumu oluşturur
+    :param pool_connections: Önbelleğe alınacak host havuzu sayısı
+    :param pool_maxsize: Host başına en fazla açık bağlantı sayısı
+    :return: MeteredSession (requests.Session) nesnesi
+    """
+    session = MeteredSession()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": HTTP_USER_AGENT})
+    return session
+
+
+def http_pool_stats(session):
+    """
+    Oturumun bağlantı havuzlarının host başına sayaçlarını döndürür
+    :return: host -> opened (açılan bağlantı), requests, idle (boştaki bağlantı), reuse_ratio
+    """
+    stats = {}
+    try:
+        pools = session.get_adapter("https://").poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            stats[pool.host] = {
+                "opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": idle,
+                "reuse_ratio": 1 - pool.num_connections / pool.num_requests if pool.num_requests else 0.0
+            }
+    except (AttributeError, KeyError):
+        pass
+    return stats
+
+
+def warm_keyword_index(keyword_index, content_cache):
+    """
+    Kalıcı içerik önbelleğindeki sayfaları anahtar kelime dizinine ekler
+    """
+    try:
+        for language, page_id, content in content_cache.iter_contents("page"):
+            keyword_index.add_document(language, page_id, content)
+    except Exception:
+        logger.exception("Anahtar kelime dizini doldurulamadı")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Uygulama ömrü boyunca dil başına servis kaydını (HTTP oturumları) ve önbellekleri yönetir
+    """
+    app.state.content_cache = PageContentCache()
+    app.state.summary_cache = TTLCache(max_entries=SUMMARY_CACHE_MAX_ENTRIES, ttl=SUMMARY_CACHE_TTL)
+    app.state.summary_jobs = SummaryJobManager()
+    app.state.image_cache = ImageDiskCache()
+    app.state.title_cache = TTLCache(max_entries=TITLE_CACHE_MAX_ENTRIES, ttl=TITLE_CACHE_TTL)
+    app.state.search_index = LocalSearchIndex()
+    app.state.keyword_index = KeywordIndex()
+    app.state.report_store = ReportStore()
+    app.state.trace_store = TTLCache(max_entries=TRACE_STORE_MAX_ENTRIES, ttl=TRACE_STORE_TTL)
+    app.state.wiki_services = WikiServiceRegistry(
+        content_cache=app.state.content_cache,
+        summary_cache=app.state.summary_cache,
+        image_cache=app.state.image_cache,
+        title_cache=app.state.title_cache,
+        search_index=app.state.search_index,
+        keyword_index=app.state.keyword_index,
+        report_store=app.state.report_store
+    )
+    # Yapılandırılan dillerin bağlantıları (TLS el sıkışmaları) ilk istekten önce açılır
+    if PREWARM_LANGUAGES:
+        threading.Thread(target=app.state.wiki_services.prewarm, args=(PREWARM_LANGUAGES,), daemon=True).start()
+    # IDF istatistikleri önceki çalışmalardan kalan önbellekteki sayfalarla arka planda doldurulur
+    threading.Thread(
+        target=warm_keyword_index,
+        args=(app.state.keyword_index, app.state.content_cache),
+        daemon=True
+    ).start()
+    try:
+        yield
+    finally:
+        app.state.summary_jobs.shutdown()
+        app.state.wiki_services.close()
+        app.state.content_cache.close()
+        app.state.search_index.close()
+
 
 app = FastAPI(
     title="Wikipedia API",
     description="Wikipedia'dan içerik çekmek için geliştirilmiş bir API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+app.add_middleware(MetricsMiddleware, registry=metrics)
+app.add_middleware(TraceMiddleware)
 
 class WikipediaService:
-    def __init__(self, language="tr"):
+    def __init__(self, language="tr", session=None, content_cache=None, summary_cache=None, image_cache=None,
+                 title_cache=None, search_index=None, keyword_index=None, report_store=None):
         """
         Wikipedia API istemcisi
         :param language: Dil kodu (örn: tr, en, de, fr)
+        :param session: Paylaşılan HTTP oturumu (None ise yeni bir oturum açılır)
+        :param content_cache: Paylaşılan sayfa içeriği önbelleği (PageContentCache, None ise önbellek kullanılmaz)
+        :param summary_cache: Paylaşılan rehber özeti önbelleği (TTLCache, None ise önbellek kullanılmaz)
+        :param image_cache: Paylaşılan küçük resim disk önbelleği (ImageDiskCache, None ise önbellek kullanılmaz)
+        :param title_cache: Paylaşılan başlık -> sayfa ID önbelleği (TTLCache, None ise önbellek kullanılmaz)
+        :param search_index: Getirilen sayfaların eklendiği yerel tam metin dizini (LocalSearchIndex, None ise kullanılmaz)
+        :param keyword_index: Paylaşılan TF-IDF anahtar kelime dizini (KeywordIndex, None ise istek başına oluşturulur)
+        :param report_store: Arama raporlarının yazıldığı depo (ReportStore, None ise raporlar çalışma klasörüne yazılır)
         """
         self.language = language
         self.base_url = f"https://{language}.wikipedia.org/w/api.php"
         self.wiki_url = f"https://{language}.wikipedia.org/wiki/"
+        self.session = session if session is not None else create_http_session()
+        self.content_cache = content_cache
+        self.summary_cache = summary_cache
+        self.image_cache = image_cache
+        self.title_cache = title_cache
+        self.search_index = search_index
+        self.keyword_index = keyword_index
+        self.report_store = report_store
 
     def guide_style_summary(self, title, summary, categories=None, language="tr"):
+        """
+        Wikipedia özetinden Gemini ile mobil uygulama için rehber tarzı bir tanıtım metni üretir
+        :param title: Sayfa başlığı
+        :param summary: İçerik özeti
+        :param categories: Sayfa kategorileri
+        :param language: Dil kodu
+        :return: Rehber özeti (hata durumunda hata mesajı)
+        """
         prompt = f"""
         Aşağıda Wikipedia'dan alınan bilgilerle, {title} adlı bölgeyi kısaca tanıtan, sade ve bilgilendirici bir metin hazırla:
         Başlık: {title}
@@ -44,154 +421,537 @@ class WikipediaService:
             "\nMetin minimum 5 maximum 8 cümle uzunluğunda olsun."
             "\nTarafsız, anlaşılır ve doğrudan bilgi veren bir dil kullan."
         )
-        try:
-            genai.configure(api_key="") #YOUR API KEY  
+        def generate():
             try:
-                model = genai.GenerativeModel("models/gemini-pro")
-                response = model.generate_content(prompt)
+                response = generate_with_metrics(GEMINI_MODELS[0], prompt)
             except Exception:
-                model = genai.GenerativeModel("models/gemini-2.5-flash-preview-04-17")
-                response = model.generate_content(prompt)
+                response = generate_with_metrics(GEMINI_MODELS[1], prompt)
             return response.text.strip()
+        
+        try:
+            if self.summary_cache is None:
+                return generate()
+            # Aynı girdiyle üretilmiş özet önbellekten verilir, eşzamanlı aynı
+            # istekler tek bir Gemini çağrısında birleştirilir
+            key = summary_cache_key(title, summary, categories, language, GEMINI_MODELS[0])
+            return self.summary_cache.get_or_compute(key, generate)
         except Exception as e:
             return f"AI rehber özeti üretilemedi: {e}"
     
-    def search(self, query, limit=5, offset=0, categories=None, min_words=300, sort_by="relevance", enrich=True):
+    def _api_get(self, params):
+        """
+        MediaWiki API'sine istek atar ve JSON yanıtını döndürür
+        :param params: Sorgu parametreleri
+        :return: JSON yanıtı (sözlük)
+        """
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=10)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise Exception(f"Wikipedia API isteği başarısız oldu: {e}")
+
+    def _query_search_pages(self, params):
+        """
+        Arama ve sayfa özelliklerini birlikte isteyen sorguyu, özelliklerin devam
+        (continue) değerlerini izleyerek tamamlar. Arama ofseti devam ettirilmez,
+        yalnızca mevcut sonuç sayfasının eksik kalan özellikleri alınır.
+        :param params: list=search (ve isteğe bağlı generator=search) içeren sorgu parametreleri
+        :return: (sıralı arama sonuçları, pageid -> birleştirilmiş sayfa verisi, sonraki arama ofseti)
+        """
+        hits = None
+        next_offset = None
+        pages = {}
+        request_params = dict(params)
+        while True:
+            data = self._api_get(request_params)
+            query_data = data.get("query", {})
+            if hits is None:
+                hits = query_data.get("search", [])
+                next_offset = data.get("continue", {}).get("sroffset")
+            self._merge_query_pages(pages, query_data)
+            # Ofset dışındaki devam değerleri, özelliklerin henüz tamamlanmadığını gösterir
+            prop_continue = {
+                key: value for key, value in data.get("continue", {}).items()
+                if key not in ("sroffset", "gsroffset")
+            }
+            if not any(key != "continue" for key in prop_continue):
+                break
+            request_params = dict(params)
+            request_params.update(prop_continue)
+        return hits or [], pages, next_offset
+
+    def _query_pages(self, params):
+        """
+        Sayfa özelliklerini isteyen sorguyu devam (continue) değerlerini izleyerek tamamlar
+        :param params: prop= içeren sorgu parametreleri
+        :return: pageid (str) -> birleştirilmiş sayfa verisi
+        """
+        pages = {}
+        request_params = dict(params)
+        while True:
+            data = self._api_get(request_params)
+            self._merge_query_pages(pages, data.get("query", {}))
+            if "continue" not in data:
+                break
+            request_params = dict(params)
+            request_params.update(data["continue"])
+        return pages
+
+    def _merge_query_pages(self, pages, query_data):
+        # Devam yanıtlarındaki liste alanları (categories vb.) eklenir, diğerleri ilk değerini korur
+        for page_id, page_data in query_data.get("pages", {}).items():
+            merged = pages.setdefault(page_id, {})
+            for key, value in page_data.items():
+                if isinstance(value, list):
+                    merged.setdefault(key, []).extend(value)
+                else:
+                    merged.setdefault(key, value)
+
+    def build_category_query(self, query, categories=None, category_match="exact"):
+        """
+        Kategori kısıtlarını CirrusSearch sorgusuna ekler.
+        exact modunda kategoriler incategory: terimiyle arama motoruna gönderilir
+        (birden fazla kategori | ile VEYA'lanır). substring modu arama motorunda
+        desteklenmediği için sorguya eklenmez, sonuçlar sonradan süzülür.
+        :param query: Arama sorgusu
+        :param categories: Kategori listesi
+        :param category_match: Eşleşme modu (exact, substring)
+        :return: Arama motoruna gönderilecek sorgu
+        """
+        if not categories or category_match != "exact":
+            return query
+        names = [
+            cat.replace("Kategori:", "").replace("Category:", "").replace('"', "").strip()
+            for cat in categories
+        ]
+        names = [name for name in names if name]
+        if not names:
+            return query
+        return f'{query} incategory:"{"|".join(names)}"'
+
+    def category_matches(self, page_categories, categories, category_match="exact"):
+        """
+        Sayfa kategorilerinin istenen kategorilerden biriyle eşleşip eşleşmediğini kontrol eder
+        :param page_categories: Sayfanın kategori listesi
+        :param categories: İstenen kategoriler listesi
+        :param category_match: Eşleşme modu (exact: tam ad, substring: ad içinde geçmesi)
+        :return: Eşleşme varsa True
+        """
+        page_categories = [c.lower() for c in page_categories]
+        for cat in categories:
+            cat = cat.replace("Kategori:", "").replace("Category:", "").lower()
+            if category_match == "substring":
+                if any(cat in c for c in page_categories):
+                    return True
+            elif cat in page_categories:
+                return True
+        return False
+
+    def _enrich_result(self, result, page_data, categories, category_match, batched, ai_summaries=True):
+        """
+        Tek bir arama sonucunu içerik özeti, kategoriler ve AI rehber özetiyle zenginleştirir
+        :param result: list=search sonucu (wordcount içerir)
+        :param page_data: Toplu sorgudan gelen sayfa verisi (per_page modunda boş)
+        :param categories: Filtrelenecek kategoriler listesi
+        :param category_match: Kategori eşleşme modu (exact, substring)
+        :param batched: Toplu sorgu verisi kullanılsın mı
+        :param ai_summaries: AI rehber özeti üretilsin mi (False ise özet sonradan üretilir)
+        :return: Zenginleştirilmiş sonuç, filtreye takılırsa None
+        """
+        word_count = result.get("wordcount", 0)
+        if batched:
+            categories_list = [cat["title"].replace("Kategori:", "").replace("Category:", "")
+                               for cat in page_data.get("categories", [])]
+        else:
+            categories_list = self.get_page_categories(result["pageid"])
+        # Kategori filtresi kontrolü (zenginleştirmede alınan kategorilerle)
+        if categories and not self.category_matches(categories_list, categories, category_match):
+            return None
+        full_content = not batched
+        if batched:
+            content = page_data.get("extract", "")
+            # Giriş metni kısaysa ve sayfada daha fazla metin varsa tam içeriği alalım
+            if len(content) <= 500 and word_count > len(content.split()):
+                content = self.get_page_content(result["pageid"])
+                full_content = True
+        else:
+            content = self.get_page_content(result["pageid"])
+        # Giriş metni kısmi belge olarak dizinlenir; sözcük sayısı list=search wordcount'tan alınır
+        self._index_page(
+            result["pageid"], title=result["title"], content=content, categories=categories_list,
+            revid=page_data.get("lastrevid"), word_count=None if full_content else word_count or None
+        )
+        enriched_result = {
+            "pageid": result["pageid"],
+            "title": result["title"],
+            "snippet": result.get("snippet", ""),
+            "word_count": word_count,
+            "content_summary": content[:500] + "..." if len(content) > 500 else content,
+            "categories": categories_list
+        }
+        # --- AI rehber özeti ekle ---
+        if ai_summaries:
+            enriched_result["ai_guide_summary"] = self.guide_style_summary(
+                result["title"],
+                enriched_result["content_summary"],
+                enriched_result["categories"],
+                language=self.language
+            )
+        return enriched_result
+
+    def search(self, query, limit=5, offset=0, categories=None, min_words=300, sort_by="relevance", enrich=True, enrich_mode="batch", category_match="exact", ai_summaries=True):
+        """
+        Wikipedia'da arama yapar (parametreler için bkz. iter_search)
+        :return: Arama sonuçları listesi
+        """
+        return list(self.iter_search(
+            query, limit=limit, offset=offset, categories=categories, min_words=min_words,
+            sort_by=sort_by, enrich=enrich, enrich_mode=enrich_mode,
+            category_match=category_match, ai_summaries=ai_summaries
+        ))
+    
+    def iter_search(self, query, limit=5, offset=0, categories=None, min_words=300, sort_by="relevance", enrich=True, enrich_mode="batch", category_match="exact", ai_summaries=True):
         """
-        Wikipedia'da arama yapar
+        Wikipedia'da arama yapar, her sonucu hazır olur olmaz döndürür (generator).
+        Kelime sayısı filtresi arama dizinindeki wordcount değeriyle, zenginleştirmeden
+        önce uygulanır; elenen sonuçların yerine sonraki arama sayfalarından sonuç alınır.
         :param query: Arama sorgusu
         :param limit: Sonuç sayısı sınırı
         :param offset: Başlangıç indeksi
         :param categories: Filtrelenecek kategoriler listesi
+        :param category_match: Kategori eşleşme modu (exact: arama motorunda incategory:, substring: ad içinde geçmesi)
         :param min_words: Minimum kelime sayısı
         :param sort_by: Sıralama kriteri (relevance, date)
-        :return: Arama sonuçları listesi
+        :param enrich_mode: Zenginleştirme yöntemi (batch: toplu sorgu, per_page: sonuç başına ayrı istekler)
+        :param ai_summaries: Zenginleştirilen sonuçlara AI rehber özeti eklensin mi
+        :return: Arama sonuçlarını sırayla üreten generator
         """
+        batched = enrich and enrich_mode == "batch"
+        search_query = self.build_category_query(query, categories, category_match)
         params = {
             "action": "query",
             "format": "json",
             "list": "search",
-            "srsearch": query,
-            "srlimit": limit,
-            "sroffset": offset,
+            "srsearch": search_query,
+            "srprop": "wordcount|snippet",
             "utf8": 1
         }
+        if batched:
+            # Aynı sonuç sayfasının özellikleri tek seferde
+            params.update({
+                "generator": "search",
+                "gsrsearch": search_query,
+                "prop": "extracts|categories|info",
+                "exintro": 1,
+                "explaintext": 1,
+                "exlimit": "max",
+                "cllimit": "max",
+                "inprop": "url"
+            })
         # Sıralama kriterini ekle
         if sort_by == "date":
             params["srsort"] = "create_timestamp_desc"
-        try:
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-        except Exception as e:
-            raise Exception(f"Wikipedia API isteği başarısız oldu: {e}")
+            if batched:
+                params["gsrsort"] = "create_timestamp_desc"
+        
+        # Filtre varsa elenecek sonuçları telafi etmek için daha büyük sayfalar isteyelim
+        filtered = enrich and (min_words > 0 or bool(categories))
+        batch_size = min(SEARCH_MAX_BATCH, limit * 2) if filtered else limit
+        
+        found = 0
+        scan_offset = offset
+        for _ in range(SEARCH_MAX_REFILL_PAGES):
+            params["srlimit"] = batch_size
+            params["sroffset"] = scan_offset
+            if batched:
+                params["gsrlimit"] = batch_size
+                params["gsroffset"] = scan_offset
+            hits, pages, next_offset = self._query_search_pages(params)
+            self.remember_titles(hits)
+            
+            for result in hits:
+                if found >= limit:
+                    break
+                if not enrich:
+                    found += 1
+                    yield {
+                        "pageid": result["pageid"],
+                        "title": result["title"],
+                        "snippet": result.get("snippet", "")
+                    }
+                    continue
+                # İçerik kelime sayısı kontrolü (içerik indirilmeden)
+                if result.get("wordcount", 0) < min_words:
+                    continue
+                try:
+                    enriched_result = self._enrich_result(
+                        result, pages.get(str(result["pageid"]), {}), categories, category_match, batched,
+                        ai_summaries
+                    )
+                except Exception:
+                    continue  # Hata olursa bu sonucu atla
+                if enriched_result is not None:
+                    found += 1
+                    yield enriched_result
+            
+            if found >= limit or not hits or next_offset is None:
+                break
+            scan_offset = next_offset
+    
+    def local_search(self, query, limit=5, offset=0, categories=None, min_words=0, category_match="exact", ai_summaries=True):
+        """
+        Yerel tam metin dizininde (BM25) arama yapar; Wikipedia'ya istek atılmaz
+        (AI rehber özeti önbellekte yoksa yalnızca Gemini çağrılır).
+        Sonuçlar zenginleştirilmiş uzak arama sonuçlarıyla aynı alanları taşır.
+        :return: Arama sonuçları listesi (source: local)
+        """
+        if self.search_index is None:
+            return []
+        filtered = min_words > 0 or bool(categories)
+        # Filtre varsa elenecek sonuçları telafi etmek için daha fazla aday alalım
+        candidates = self.search_index.search(
+            self.language, query, limit=min(SEARCH_MAX_BATCH, limit * 2) if filtered else limit, offset=offset
+        )
         results = []
-        if "query" in data and "search" in data["query"]:
-            for result in data["query"]["search"]:
-                enriched_result = {
-                    "pageid": result["pageid"],
-                    "title": result["title"],
-                    "snippet": result.get("snippet", "")
-                }
-                if enrich:
-                    try:
-                        content = self.get_page_content(result["pageid"])
-                        word_count = len(content.split())
-                        # İçerik kelime sayısı kontrolü
-                        if word_count < min_words:
-                            continue
-                        categories_list = self.get_page_categories(result["pageid"])
-                        # Kategori filtresi kontrolü
-                        if categories:
-                            # Kullanıcıdan gelen kategorilerle sayfa kategorilerinin kesişimi var mı?
-                            if not any(cat.lower() in [c.lower() for c in categories_list] for cat in categories):
-                                continue
-                        enriched_result["word_count"] = word_count
-                        enriched_result["content_summary"] = content[:500] + "..." if len(content) > 500 else content
-                        enriched_result["categories"] = categories_list
-                        # --- AI rehber özeti ekle ---
-                        enriched_result["ai_guide_summary"] = self.guide_style_summary(
-                            result["title"],
-                            enriched_result["content_summary"],
-                            enriched_result["categories"],
-                            language=self.language
-                        )
-                        results.append(enriched_result)
-                    except Exception:
-                        continue  # Hata olursa bu sonucu atla
-                else:
-                    results.append(enriched_result)
-
+        for candidate in candidates:
+            if len(results) >= limit:
+                break
+            if candidate["word_count"] < min_words:
+                continue
+            if categories and not self.category_matches(candidate["categories"], categories, category_match):
+                continue
+            content = candidate["content"]
+            result = {
+                "pageid": candidate["pageid"],
+                "title": candidate["title"],
+                "snippet": candidate["snippet"],
+                "word_count": candidate["word_count"],
+                "content_summary": content[:500] + "..." if len(content) > 500 else content,
+                "categories": candidate["categories"],
+                "score": candidate["score"],
+                "source": "local"
+            }
+            if ai_summaries:
+                result["ai_guide_summary"] = self.guide_style_summary(
+                    result["title"], result["content_summary"], result["categories"], language=self.language
+                )
+            results.append(result)
+        return results
+    
+    def hybrid_search(self, query, limit=5, offset=0, source="auto", **search_kwargs):
+        """
+        Arama kaynağına göre yerel dizinden, Wikipedia'dan veya ikisinden birden sonuç verir.
+        auto modunda yerel dizin limit kadar sonuç bulamazsa Wikipedia araması yapılır;
+        yerel sonuçlar önde olmak üzere iki liste tekrarsız birleştirilir.
+        :param source: Arama kaynağı (remote, local, auto)
+        :param search_kwargs: search() ile aynı filtre ve zenginleştirme parametreleri
+        :return: Arama sonuçları listesi (her sonuçta source alanı bulunur)
+        """
+        if source == "remote":
+            results = self.search(query, limit=limit, offset=offset, **search_kwargs)
+            for result in results:
+                result["source"] = "remote"
+            return results
+        
+        local_kwargs = {
+            key: search_kwargs[key]
+            for key in ("categories", "min_words", "category_match", "ai_summaries")
+            if key in search_kwargs
+        }
+        results = self.local_search(query, limit=limit, offset=offset, **local_kwargs)
+        if source == "local" or len(results) >= limit:
+            return results
+        
+        seen = {result["pageid"] for result in results}
+        for result in self.search(query, limit=limit, offset=offset, **search_kwargs):
+            if len(results) >= limit:
+                break
+            if result["pageid"] in seen:
+                continue
+            result["source"] = "remote"
+            results.append(result)
         return results
     
+    def get_latest_revision(self, page_id):
+        """
+        Sayfanın son revizyon numarasını alır (önbellek doğrulaması için)
+        :param page_id: Wikipedia sayfa ID'si
+        :return: Revizyon numarası, alınamazsa None
+        """
+        params = {
+            "action": "query",
+            "format": "json",
+            "prop": "info",
+            "pageids": page_id
+        }
+        
+        try:
+            response = self.session.get(self.base_url, params=params)
+            data = response.json()
+            return data["query"]["pages"][str(page_id)].get("lastrevid")
+        except Exception:
+            return None
+    
+    def _get_cached_content(self, kind, page_id=None, title=None):
+        """
+        İçeriği önbellekten verir; kontrol süresi dolmuşsa revizyonu doğrular
+        :return: Önbellekteki içerik, yoksa veya eskimişse None
+        """
+        if self.content_cache is None:
+            return None
+        entry = self.content_cache.lookup(self.language, kind, page_id=page_id, title=title)
+        if entry is None:
+            add_span_event("cache.content", {"kind": kind, "page_id": page_id or 0, "result": "miss"})
+            return None
+        if self.content_cache.is_fresh(entry):
+            add_span_event("cache.content", {"kind": kind, "page_id": entry["page_id"], "result": "hit"})
+            return entry["content"]
+        # Sayfa değişmiş mi, prop=info lastrevid ile ucuzca kontrol edelim
+        if self.get_latest_revision(entry["page_id"]) == entry["revid"]:
+            self.content_cache.mark_checked(self.language, kind, entry)
+            add_span_event("cache.content", {"kind": kind, "page_id": entry["page_id"], "result": "revalidated"})
+            return entry["content"]
+        self.content_cache.mark_stale()
+        add_span_event("cache.content", {"kind": kind, "page_id": entry["page_id"], "result": "stale"})
+        return None
+    
+    def _store_content(self, kind, page_id, revid, title, content):
+        """
+        Revizyonu bilinen içeriği önbelleğe yazar
+        """
+        if self.content_cache is not None and content and page_id and revid:
+            self.content_cache.put(self.language, kind, page_id, revid, title, content)
+        if page_id:
+            self._index_page(page_id, title=title, content=content, revid=revid)
+        if self.keyword_index is not None and content and page_id:
+            self.keyword_index.add_document(self.language, page_id, content)
+    
+    def _index_page(self, page_id, title=None, content=None, categories=None, revid=None, word_count=None):
+        """
+        Getirilen sayfa bilgisini yerel tam metin dizinine ekler.
+        Dizin yardımcı olduğundan hatalar isteği bozmaz.
+        :param word_count: Sayfanın tamamının sözcük sayısı; content yalnızca giriş metniyse verilmelidir
+        """
+        if self.search_index is None:
+            return
+        try:
+            self.search_index.add_page(
+                self.language, page_id, title=title or None, content=content or None,
+                categories=categories, revid=revid, word_count=word_count
+            )
+        except Exception:
+            logger.exception("Yerel dizin güncellenemedi (%s)", page_id)
+    
     def get_page_content(self, page_id):
         """
         Sayfa ID'sine göre tam içerik alır
         :param page_id: Wikipedia sayfa ID'si
         :return: Sayfa içeriği
         """
-        # İlk olarak, standart içeriği almaya çalışalım
+        cached = self._get_cached_content("page", page_id=page_id)
+        if cached is not None:
+            return cached
+        return self._fetch_page_content(page_id)
+    
+    def _fetch_page_content(self, page_id):
+        # Önbelleğe bakmadan tam içeriği alır ve önbelleğe yazar
+        # İlk olarak, standart içeriği (başlık ve revizyonla birlikte) almaya çalışalım
         params = {
             "action": "query",
             "format": "json",
-            "prop": "extracts",
+            "prop": "extracts|info",
             "pageids": page_id,
             "explaintext": 1,
             "exintro": 0    # 0: tam içerik, 1: sadece giriş bölümü
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         content = ""
+        page_title = ""
+        revid = None
         if "query" in data and "pages" in data["query"]:
             page_data = data["query"]["pages"].get(str(page_id))
-            if page_data and "extract" in page_data:
-                content = page_data["extract"]
+            if page_data:
+                content = page_data.get("extract", "")
+                page_title = page_data.get("title", "")
+                revid = page_data.get("lastrevid")
         
-        # Eğer içerik kısaysa veya yoksa, bölümleri ayrı ayrı almayı deneyelim
+        # Eğer içerik kısaysa veya yoksa, sayfanın tamamını ayrıştırarak alalım
         if not content or len(content) < 1000:
-            # Önce sayfa başlığını alalım
-            params = {
-                "action": "query",
-                "format": "json",
-                "prop": "info",
-                "pageids": page_id,
-                "inprop": "url|displaytitle"
-            }
-            
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
-            
-            page_title = ""
-            if "query" in data and "pages" in data["query"]:
-                page_data = data["query"]["pages"].get(str(page_id))
-                if page_data and "title" in page_data:
-                    page_title = page_data["title"]
-            
             if page_title:
-                # Şimdi sayfa bölümlerini alalım
                 content = self.get_full_content_by_title(page_title)
         
+        self._store_content("page", page_id, revid, page_title, content)
         return content
     
     def get_full_content_by_title(self, title):
         """
-        Başlığa göre tam içerik alır ve bölümleri birleştirir
+        Başlığa göre tam içerik alır ve bölümleri birleştirir.
+        Sayfa tek bir parse isteğiyle alınır, bölümlere yerel olarak ayrılır.
         :param title: Sayfa başlığı
         :return: Tam sayfa içeriği
         """
-        # Önce bölüm yapısını alalım
+        cached = self._get_cached_content("full", title=title)
+        if cached is not None:
+            return cached
+        
+        full_content = f"# {title}\n\n"
+        page_id = None
+        revid = None
+        
         params = {
             "action": "parse",
             "format": "json",
             "page": title,
-            "prop": "sections"
+            "prop": "text|sections",
+            "disableeditsection": 1,
+            "disabletoc": 1,
+            "formatversion": 2
         }
         
-        response = requests.get(self.base_url, params=params)
-        data = response.json()
+        response = self.session.get(self.base_url, params=params)
+        try:
+            data = response.json()
+            if "parse" in data and "text" in data["parse"]:
+                page_id = data["parse"].get("pageid")
+                revid = data["parse"].get("revid")
+                lead_html, sections = self.split_sections(
+                    data["parse"]["text"], data["parse"].get("sections", [])
+                )
+                # Giriş bölümü
+                full_content += self.html_to_text(lead_html) + "\n\n"
+                
+                for section_title, section_html in sections:
+                    # Referans, Kaynakça gibi bölümleri atlayalım
+                    if self.is_skipped_section(section_title):
+                        continue
+                    
+                    section_content = self.html_to_text(section_html)
+                    if section_content.strip():  # Boş bölümleri atlayalım
+                        full_content += f"## {section_title}\n\n{section_content}\n\n"
+        except Exception as e:
+            full_content += f"Bölümler alınamadı: {str(e)}\n\n"
+        
+        # Alternatif yöntem: Mobil API kullanarak düz metin almak
+        if len(full_content) < 1000:
+            full_content += self.get_mobile_content(title)
+        
+        # Son temizleme
+        full_content = self.clean_wiki_content(full_content)
         
+        self._store_content("full", page_id, revid, title, full_content)
+        return full_content
+    
+    def get_full_content_per_section(self, title):
+        """
+        Başlığa göre tam içerik alır, her bölümü ayrı bir parse isteğiyle çeker.
+        Eski yöntemdir; get_full_content_by_title ile karşılaştırma (benchmark.py) için tutulur.
+        :param title: Sayfa başlığı
+        :return: Tam sayfa içeriği
+        """
         full_content = f"# {title}\n\n"
         
         # Ana içeriği alalım (giriş bölümü)
@@ -204,14 +964,11 @@ class WikipediaService:
             "formatversion": 2
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         try:
             data = response.json()
             if "parse" in data and "text" in data["parse"]:
-                # HTML içeriğini düz metne çevirme girişimi
-                content = data["parse"]["text"]
-                # HTML etiketlerini kaldırma girişimi
-                content = self.html_to_text(content)
+                content = self.html_to_text(data["parse"]["text"])
                 full_content += content + "\n\n"
         except Exception as e:
             full_content += f"Giriş bölümü alınamadı: {str(e)}\n\n"
@@ -224,7 +981,7 @@ class WikipediaService:
             "prop": "sections"
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         try:
             data = response.json()
             if "parse" in data and "sections" in data["parse"]:
@@ -233,7 +990,7 @@ class WikipediaService:
                     section_title = section.get("line", "")
                     
                     # Referans, Kaynakça gibi bölümleri atlayalım
-                    if any(skip_word in section_title.lower() for skip_word in ["kaynakça", "referans", "dipnot", "dış bağlantı", "ayrıca bakınız"]):
+                    if self.is_skipped_section(section_title):
                         continue
                     
                     # Her bölümü ayrı ayrı alalım
@@ -246,13 +1003,11 @@ class WikipediaService:
                         "formatversion": 2
                     }
                     
-                    section_response = requests.get(self.base_url, params=params)
+                    section_response = self.session.get(self.base_url, params=params)
                     try:
                         section_data = section_response.json()
                         if "parse" in section_data and "text" in section_data["parse"]:
-                            section_content = section_data["parse"]["text"]
-                            # HTML etiketlerini kaldırma girişimi
-                            section_content = self.html_to_text(section_content)
+                            section_content = self.html_to_text(section_data["parse"]["text"])
                             
                             if section_content.strip():  # Boş bölümleri atlayalım
                                 full_content += f"## {section_title}\n\n{section_content}\n\n"
@@ -263,92 +1018,99 @@ class WikipediaService:
         
         # Alternatif yöntem: Mobil API kullanarak düz metin almak
         if len(full_content) < 1000:
-            try:
-                mobile_url = f"https://{self.language}.wikipedia.org/api/rest_v1/page/mobile-sections/{urllib.parse.quote(title)}"
-                response = requests.get(mobile_url)
-                data = response.json()
-                
-                # Giriş bölümü
-                if "lead" in data and "sections" in data["lead"]:
-                    for section in data["lead"]["sections"]:
-                        if "text" in section:
-                            section_text = self.html_to_text(section["text"])
-                            full_content += section_text + "\n\n"
-                
-                # Diğer bölümler
-                if "remaining" in data and "sections" in data["remaining"]:
-                    for section in data["remaining"]["sections"]:
-                        # Referans, Kaynakça gibi bölümleri atlayalım
-                        if "line" in section and any(skip_word in section["line"].lower() for skip_word in ["kaynakça", "referans", "dipnot", "dış bağlantı", "ayrıca bakınız"]):
-                            continue
-                            
-                        if "line" in section:
-                            full_content += f"## {section['line']}\n\n"
-                        if "text" in section:
-                            section_text = self.html_to_text(section["text"])
-                            if section_text.strip():  # Boş bölümleri atlayalım
-                                full_content += section_text + "\n\n"
-            except Exception as e:
-                full_content += f"Mobil API üzerinden içerik alınamadı: {str(e)}\n\n"
+            full_content += self.get_mobile_content(title)
         
         # Son temizleme
         full_content = self.clean_wiki_content(full_content)
                 
         return full_content
     
-    def html_to_text(self, html_content):
+    def get_mobile_content(self, title):
         """
-        HTML içeriğini basit düz metne dönüştürür
+        Mobil API (mobile-sections) üzerinden sayfanın düz metnini alır
+        :param title: Sayfa başlığı
+        :return: Bölüm başlıklarıyla birleştirilmiş metin
         """
-        # CSS içeriklerini temizle
-        html_content = re.sub(r'<style[^>]*>.*?</style>', ' ', html_content, flags=re.DOTALL)
-        
-        # CSS sınıf tanımlamalarını temizle
-        html_content = re.sub(r'\.mw-parser-output\s+\.[^{]+\{[^}]+\}', ' ', html_content)
-        
-        # HTML etiketlerini kaldır
-        text = re.sub(r'<[^>]+>', ' ', html_content)
-        
-        # Fazla boşlukları temizle
-        text = re.sub(r'\s+', ' ', text)
+        content = ""
+        try:
+            mobile_url = f"https://{self.language}.wikipedia.org/api/rest_v1/page/mobile-sections/{urllib.parse.quote(title)}"
+            response = self.session.get(mobile_url)
+            data = response.json()
+            
+            # Giriş bölümü
+            if "lead" in data and "sections" in data["lead"]:
+                for section in data["lead"]["sections"]:
+                    if "text" in section:
+                        section_text = self.html_to_text(section["text"])
+                        content += section_text + "\n\n"
+            
+            # Diğer bölümler
+            if "remaining" in data and "sections" in data["remaining"]:
+                for section in data["remaining"]["sections"]:
+                    # Referans, Kaynakça gibi bölümleri atlayalım
+                    if "line" in section and self.is_skipped_section(section["line"]):
+                        continue
+                        
+                    if "line" in section:
+                        content += f"## {section['line']}\n\n"
+                    if "text" in section:
+                        section_text = self.html_to_text(section["text"])
+                        if section_text.strip():  # Boş bölümleri atlayalım
+                            content += section_text + "\n\n"
+        except Exception as e:
+            content += f"Mobil API üzerinden içerik alınamadı: {str(e)}\n\n"
+        return content
+    
+    def is_skipped_section(self, section_title):
+        """
+        Referans, Kaynakça gibi içeriğe katılmayacak bölümleri belirler
+        :param section_title: Bölüm başlığı
+        :return: Bölüm atlanacaksa True
+        """
+        return get_content_cleaner(self.language).is_skipped_section(section_title)
+    
+    def split_sections(self, html_content, sections=None):
+        """
+        Tüm sayfanın HTML çıktısını başlık etiketlerinden (h2-h6) bölümlere ayırır
+        :param html_content: action=parse ile alınan sayfa HTML'i
+        :param sections: action=parse prop=sections listesi (başlık adları için)
+        :return: (giriş bölümü HTML'i, [(bölüm başlığı, bölüm HTML'i), ...])
+        """
+        # Bölüm adlarını başlık kimliklerinden (anchor) eşleştirelim
+        lines_by_anchor = {
+            section.get("anchor"): section.get("line", "")
+            for section in (sections or []) if section.get("anchor")
+        }
         
-        # HTML karakter kodlarını çöz
-        text = text.replace('&nbsp;', ' ')
-        text = text.replace('&lt;', '<')
-        text = text.replace('&gt;', '>')
-        text = text.replace('&amp;', '&')
-        text = text.replace('&quot;', '"')
-        text = text.replace('&apos;', "'")
+        headings = list(SECTION_HEADING_RE.finditer(html_content))
+        if not headings:
+            return html_content, []
         
-        return text.strip()
+        lead_html = html_content[:headings[0].start()]
+        result = []
+        for i, heading in enumerate(headings):
+            end = headings[i + 1].start() if i + 1 < len(headings) else len(html_content)
+            body_html = html_content[heading.end():end]
+            
+            anchor_match = HEADING_ID_RE.search(heading.group(0))
+            anchor = anchor_match.group(1) if anchor_match else None
+            section_title = lines_by_anchor.get(anchor) or heading.group(2)
+            # Başlıktaki HTML işaretlerini (örn. <i>) boşluk bırakmadan kaldıralım
+            section_title = self.html_to_text(HTML_TAG_RE.sub("", section_title))
+            result.append((section_title, body_html))
+        return lead_html, result
+    
+    def html_to_text(self, html_content):
+        """
+        HTML içeriğini düz metne dönüştürür (bkz. wiki_text.HTMLTextExtractor)
+        """
+        return html_to_text(html_content)
     
     def clean_wiki_content(self, content):
         """
-        Wikipedia içeriğinden gereksiz metinleri temizler
+        Wikipedia içeriğinden gereksiz metinleri dilin kural tablosuna göre temizler
         """
-        # [değiştir | kaynağı değiştir] tarzı metinleri temizle
-        content = re.sub(r'\[\s*değiştir\s*\|\s*kaynağı\s*değiştir\s*\]', '', content)
-        content = re.sub(r'\[\s*edit\s*\|\s*edit source\s*\]', '', content)
-        
-        # İçerik düzenleme bağlantılarını temizle
-        content = re.sub(r'\(\s*[Dd]üzenle\s*\)', '', content)
-        content = re.sub(r'\(\s*[Ee]dit\s*\)', '', content)
-        
-        # CSS sınıf tanımlarını temizle
-        content = re.sub(r'\.mw-parser-output\s+\.[^{]+\{[^}]+\}', '', content)
-        
-        # Dosya ve medya referanslarını temizle
-        content = re.sub(r'Dosya:[^\]]+\]', '', content)
-        content = re.sub(r'File:[^\]]+\]', '', content)
-        content = re.sub(r'Media:[^\]]+\]', '', content)
-        
-        # Sayfa referanslarını temizle
-        content = re.sub(r'\[\d+\]', '', content)
-        
-        # Fazla boş satırları temizle
-        content = re.sub(r'\n{3,}', '\n\n', content)
-        
-        return content
+        return clean_wiki_content(content, self.language)
     
     def get_page_images(self, page_id):
         """
@@ -363,7 +1125,7 @@ class WikipediaService:
             "pageids": page_id
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         if "query" in data and "pages" in data["query"]:
@@ -378,25 +1140,145 @@ class WikipediaService:
         :param image_title: Resim başlığı (File:örnek.jpg gibi)
         :return: Resim URL'si
         """
-        # Dosya başlığından "File:" önekini kaldır
-        image_name = image_title.replace("File:", "").replace("Dosya:", "")
-        
+        info = self.get_image_infos([image_title]).get(image_title)
+        return info["url"] if info else None
+    
+    def _image_info_from_page(self, page_data, thumb_width=None):
+        # imageinfo yanıtındaki dosya sayfasını sonuç sözlüğüne çevirir
+        if not page_data.get("imageinfo"):
+            return None
+        image_info = page_data["imageinfo"][0]
+        if "url" not in image_info:
+            return None
+        info = {
+            "title": page_data["title"],
+            "url": image_info["url"],
+            "mime": image_info.get("mime"),
+            "width": image_info.get("width"),
+            "height": image_info.get("height"),
+            "description_url": image_info.get("descriptionurl")
+        }
+        if thumb_width:
+            info["thumb_url"] = image_info.get("thumburl", image_info["url"])
+            info["thumb_width"] = image_info.get("thumbwidth")
+            info["thumb_height"] = image_info.get("thumbheight")
+        return info
+    
+    def _image_info_params(self, thumb_width=None):
         params = {
             "action": "query",
             "format": "json",
             "prop": "imageinfo",
-            "titles": image_title,
-            "iiprop": "url"
+            "iiprop": "url|mime|size"
         }
+        if thumb_width:
+            params["iiurlwidth"] = thumb_width
+        return params
+    
+    def get_image_infos(self, image_titles, thumb_width=None, mime_types=None):
+        """
+        Birden fazla resmin URL, MIME ve boyut bilgisini IMAGE_BATCH_SIZE'lık
+        toplu prop=imageinfo sorgularıyla alır
+        :param image_titles: Resim başlıkları listesi
+        :param thumb_width: İstenirse küçük resim genişliği (piksel)
+        :param mime_types: Yalnızca bu MIME türlerindeki dosyalar döndürülür
+        :return: Başlık -> resim bilgisi sözlüğü (bulunamayan ya da süzülen dosyalar yer almaz)
+        """
+        infos = {}
+        titles = list(dict.fromkeys(image_titles))
+        for start in range(0, len(titles), IMAGE_BATCH_SIZE):
+            batch = titles[start:start + IMAGE_BATCH_SIZE]
+            params = self._image_info_params(thumb_width)
+            params["titles"] = "|".join(batch)
+            data = self._api_get(params)
+            query_data = data.get("query", {})
+            # İstek başlığı ile yanıt başlığı farklı olabilir (örn. "Dosya:" -> "File:")
+            requested = {title: title for title in batch}
+            for item in query_data.get("normalized", []):
+                requested[item["to"]] = item["from"]
+            for page_data in query_data.get("pages", {}).values():
+                info = self._image_info_from_page(page_data, thumb_width)
+                if info is None or (mime_types and info["mime"] not in mime_types):
+                    continue
+                infos[requested.get(page_data["title"], page_data["title"])] = info
+        return infos
+    
+    def get_page_image_infos(self, page_id, limit=None, thumb_width=None, mime_types=None):
+        """
+        Sayfadaki resimleri ve URL'lerini generator=images ile tek sorguda alır
+        (gerekirse devam değerleri izlenir); resim başına ayrı istek yapılmaz.
+        MIME süzmesi yanıt üzerinde yapıldığından süzülen dosyalar ek istek gerektirmez.
+        :param page_id: Wikipedia sayfa ID'si
+        :param limit: En fazla resim sayısı (None ise tümü)
+        :param thumb_width: İstenirse küçük resim genişliği (piksel)
+        :param mime_types: Yalnızca bu MIME türlerindeki dosyalar döndürülür
+        :return: Başlığa göre sıralı resim bilgisi listesi
+        """
+        params = self._image_info_params(thumb_width)
+        params.update({
+            "generator": "images",
+            "pageids": page_id,
+            # Süzme yoksa yalnızca gereken kadar dosya istenir
+            "gimlimit": min(limit, IMAGE_BATCH_SIZE) if limit and not mime_types else IMAGE_BATCH_SIZE
+        })
         
-        response = requests.get(self.base_url, params=params)
-        data = response.json()
+        images = {}
+        request_params = dict(params)
+        while True:
+            data = self._api_get(request_params)
+            for page_data in data.get("query", {}).get("pages", {}).values():
+                info = self._image_info_from_page(page_data, thumb_width)
+                if info is None or (mime_types and info["mime"] not in mime_types):
+                    continue
+                images.setdefault(info["title"], info)
+            if "continue" not in data or (limit and len(images) >= limit):
+                break
+            request_params = dict(params)
+            request_params.update(data["continue"])
         
-        if "query" in data and "pages" in data["query"]:
-            for page_id, page_data in data["query"]["pages"].items():
-                if "imageinfo" in page_data and len(page_data["imageinfo"]) > 0:
-                    return page_data["imageinfo"][0]["url"]
-        return None
+        result = [images[title] for title in sorted(images)]
+        return result[:limit] if limit else result
+    
+    def fetch_thumbnail(self, image_title, width):
+        """
+        Resmin istenen genişlikteki küçük resmini upload.wikimedia.org'dan indirir
+        :param image_title: Resim başlığı (File:örnek.jpg gibi)
+        :param width: Küçük resim genişliği (piksel)
+        :return: (içerik baytları, içerik türü), resim bulunamazsa None
+        """
+        info = self.get_image_infos([image_title], thumb_width=width).get(image_title)
+        if info is None:
+            return None
+        thumb_url = info.get("thumb_url") or info["url"]
+        if urllib.parse.urlparse(thumb_url).hostname not in THUMBNAIL_ALLOWED_HOSTS:
+            raise Exception(f"Beklenmeyen resim adresi: {thumb_url}")
+        response = self.session.get(thumb_url, timeout=20)
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", info.get("mime") or "application/octet-stream")
+        return response.content, content_type
+    
+    def get_thumbnail(self, image_title, width):
+        """
+        Küçük resmi disk önbelleğinden verir; yoksa bir kez indirip önbelleğe yazar.
+        Aynı resim için eşzamanlı istekler tek indirmede birleştirilir.
+        :param image_title: Resim başlığı
+        :param width: THUMBNAIL_WIDTHS basamağına yuvarlanmış genişlik
+        :return: (önbellek girdisi (path, content_type, etag, size), içerik baytları), resim bulunamazsa None
+        """
+        if self.image_cache is None:
+            raise Exception("Küçük resim önbelleği yapılandırılmamış")
+        key = self.image_cache.make_key(self.language, image_title, width)
+        try:
+            return self.image_cache.read_or_fetch(key, lambda: self._fetch_thumbnail_or_raise(image_title, width))
+        except LookupError:
+            return None
+    
+    def _fetch_thumbnail_or_raise(self, image_title, width):
+        # Bulunamayan resim önbelleğe yazılmasın diye hata olarak iletilir
+        result = self.fetch_thumbnail(image_title, width)
+        if result is None:
+            raise LookupError(image_title)
+        return result
     
     def get_page_categories(self, page_id):
         """
@@ -412,7 +1294,7 @@ class WikipediaService:
             "cllimit": 50
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
         categories = []
@@ -421,8 +1303,198 @@ class WikipediaService:
             if page_data and "categories" in page_data:
                 categories = [cat["title"].replace("Kategori:", "").replace("Category:", "") 
                              for cat in page_data["categories"]]
+                self._index_page(page_id, title=page_data.get("title"), categories=categories)
         return categories
     
+    def get_page_info(self, page_id):
+        """
+        Sayfa ID'sine göre başlık ve URL bilgisini alır
+        :param page_id: Wikipedia sayfa ID'si
+        :return: title ve url alanlarını içeren sözlük
+        """
+        params = {
+            "action": "query",
+            "format": "json",
+            "prop": "info",
+            "pageids": page_id,
+            "inprop": "url|displaytitle"
+        }
+        
+        response = self.session.get(self.base_url, params=params)
+        data = response.json()
+        
+        info = {"title": "", "url": ""}
+        if "query" in data and "pages" in data["query"]:
+            page_data = data["query"]["pages"].get(str(page_id))
+            if page_data:
+                info["title"] = page_data.get("title", "")
+                info["url"] = page_data.get("fullurl", "")
+        return info
+    
+    def get_pages_batch(self, page_ids, fields=("info", "categories", "extract")):
+        """
+        En fazla PAGE_BATCH_SIZE sayfanın bilgi, kategori ve giriş metnini tek
+        prop=info|categories|extracts sorgusuyla (devam değerleri izlenerek) alır.
+        Tam içerik (content) toplu alınamadığından burada alınmaz.
+        :param page_ids: Sayfa ID'leri
+        :param fields: İstenen alanlar (info, categories, extract)
+        :return: page_id -> sayfa sözlüğü (bulunamayan sayfalarda error alanı bulunur)
+        """
+        props = ["info"]
+        params = {
+            "action": "query",
+            "format": "json",
+            "pageids": "|".join(str(page_id) for page_id in page_ids),
+            "inprop": "url"
+        }
+        if "categories" in fields:
+            props.append("categories")
+            params["cllimit"] = "max"
+        if "extract" in fields:
+            props.append("extracts")
+            params.update({"exintro": 1, "explaintext": 1, "exlimit": "max"})
+        params["prop"] = "|".join(props)
+        
+        pages = self._query_pages(params)
+        results = {}
+        for page_id in page_ids:
+            page_data = pages.get(str(page_id))
+            if not page_data or "missing" in page_data or "invalid" in page_data:
+                results[page_id] = {"page_id": page_id, "error": "Sayfa bulunamadı"}
+                continue
+            result = {"page_id": page_id, "title": page_data.get("title", "")}
+            if "info" in fields:
+                result["url"] = page_data.get("fullurl", "")
+                result["revid"] = page_data.get("lastrevid")
+                result["length"] = page_data.get("length")
+            if "categories" in fields:
+                result["categories"] = [cat["title"].replace("Kategori:", "").replace("Category:", "")
+                                        for cat in page_data.get("categories", [])]
+                self._index_page(page_id, title=result["title"], categories=result["categories"])
+            if "extract" in fields:
+                result["extract"] = page_data.get("extract", "")
+            results[page_id] = result
+        self.remember_titles(
+            {"pageid": page_id, "title": result["title"]}
+            for page_id, result in results.items() if "error" not in result
+        )
+        return results
+    
+    def get_page_links(self, page_id, limit=10):
+        """
+        Sayfadan verilen ana ad alanındaki sayfalara giden bağlantıları alır
+        :param page_id: Wikipedia sayfa ID'si
+        :param limit: Bağlantı sayısı sınırı
+        :return: Bağlantılı sayfa başlıkları listesi
+        """
+        params = {
+            "action": "query",
+            "format": "json",
+            "prop": "links",
+            "pageids": page_id,
+            "plnamespace": 0,
+            "pllimit": limit
+        }
+        
+        response = self.session.get(self.base_url, params=params)
+        data = response.json()
+        
+        titles = []
+        if "query" in data and "pages" in data["query"]:
+            page_data = data["query"]["pages"].get(str(page_id))
+            if page_data and "links" in page_data:
+                titles = [link["title"] for link in page_data["links"]]
+        return titles
+    
+    def get_category_members(self, category, limit=10):
+        """
+        Kategoriye ait sayfaları alır
+        :param category: Kategori adı (önek olmadan)
+        :param limit: Sonuç sayısı sınırı
+        :return: pageid ve title alanlarını içeren sözlük listesi
+        """
+        params = {
+            "action": "query",
+            "format": "json",
+            "list": "categorymembers",
+            "cmtitle": f"Kategori:{category}",
+            "cmlimit": limit,
+            "cmtype": "page"
+        }
+        
+        response = self.session.get(self.base_url, params=params)
+        data = response.json()
+        
+        if "query" in data and "categorymembers" in data["query"]:
+            members = data["query"]["categorymembers"]
+            self.remember_titles(members)
+            return members
+        return []
+    
+    def remember_titles(self, pages):
+        """
+        Başka sorgulardan (arama, kategori üyeleri) öğrenilen başlık -> sayfa ID
+        eşleşmelerini çözümleme önbelleğine ekler
+        :param pages: title ve pageid alanlarını içeren sözlük listesi
+        """
+        if self.title_cache is None:
+            return
+        for page in pages:
+            if page.get("pageid") and page.get("title"):
+                self.title_cache.put(
+                    (self.language, page["title"]),
+                    {"pageid": page["pageid"], "title": page["title"]}
+                )
+    
+    def resolve_titles(self, titles):
+        """
+        Sayfa başlıklarını sayfa ID'lerine çözer. Önbellekte olmayan başlıklar
+        TITLE_BATCH_SIZE'lık titles= sorgularıyla sorulur; yazım normalleştirmeleri
+        ve yönlendirmeler izlenir. Bulunamayan başlıklar da önbelleğe alınır.
+        :param titles: Sayfa başlıkları
+        :return: İstenen başlık -> {"pageid", "title" (yönlendirme sonrası asıl başlık)} sözlüğü
+                 (bulunamayan başlıklar yer almaz)
+        """
+        resolved = {}
+        pending = []
+        unique_titles = list(dict.fromkeys(titles))
+        for title in unique_titles:
+            cached = self.title_cache.get((self.language, title)) if self.title_cache is not None else None
+            if cached is None:
+                pending.append(title)
+            elif cached["pageid"]:
+                resolved[title] = cached
+        add_span_event("cache.titles", {"hits": len(unique_titles) - len(pending), "misses": len(pending)})
+        
+        for start in range(0, len(pending), TITLE_BATCH_SIZE):
+            batch = pending[start:start + TITLE_BATCH_SIZE]
+            data = self._api_get({
+                "action": "query",
+                "format": "json",
+                "titles": "|".join(batch),
+                "redirects": 1
+            })
+            query_data = data.get("query", {})
+            normalized = {item["from"]: item["to"] for item in query_data.get("normalized", [])}
+            redirects = {item["from"]: item["to"] for item in query_data.get("redirects", [])}
+            pages_by_title = {
+                page_data["title"]: page_data for page_data in query_data.get("pages", {}).values()
+                if "title" in page_data
+            }
+            for title in batch:
+                target = normalized.get(title, title)
+                target = redirects.get(target, target)
+                page_data = pages_by_title.get(target)
+                if page_data is None or "missing" in page_data or "invalid" in page_data or "pageid" not in page_data:
+                    # Bulunamayan başlık: tekrar sorulmasın diye boş kayıt saklanır
+                    entry = {"pageid": 0, "title": None}
+                else:
+                    entry = {"pageid": page_data["pageid"], "title": page_data["title"]}
+                    resolved[title] = entry
+                if self.title_cache is not None:
+                    self.title_cache.put((self.language, title), entry)
+        return resolved
+    
     def get_page_url(self, title):
         """
         Sayfa başlığından URL oluşturur
@@ -433,80 +1505,216 @@ class WikipediaService:
         encoded_title = urllib.parse.quote(title.replace(" ", "_"))
         return f"{self.wiki_url}{encoded_title}"
 
+    def report_file_name(self, search_term, prefix=""):
+        """
+        Arama terimi için zaman damgalı rapor dosyası adı oluşturur
+        :param search_term: Arama terimi
+        :param prefix: Dosya adı öneki (örn: advanced_)
+        :return: Dosya adı
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_search_term = re.sub(r'[^\w\s-]', '', search_term).strip().replace(' ', '_')
+        if not safe_search_term:
+            safe_search_term = "wiki_search"
+        return f"{prefix}{safe_search_term}_{timestamp}.txt"
+    
+    def get_pages_image_infos(self, page_ids, limit=REPORT_IMAGES_PER_PAGE, thumb_width=None):
+        """
+        Birden fazla sayfanın resimlerini toplu prop=images sorgularıyla (PAGE_BATCH_SIZE
+        sayfa başına bir istek) ve resim bilgilerini toplu imageinfo sorgularıyla alır
+        :param page_ids: Sayfa ID'leri
+        :param limit: Sayfa başına en fazla resim (başlığa göre ilk resimler)
+        :param thumb_width: İstenirse küçük resim genişliği (piksel)
+        :return: page_id -> resim bilgisi listesi
+        """
+        page_titles = {}
+        for start in range(0, len(page_ids), PAGE_BATCH_SIZE):
+            batch = page_ids[start:start + PAGE_BATCH_SIZE]
+            pages = self._query_pages({
+                "action": "query",
+                "format": "json",
+                "prop": "images",
+                "pageids": "|".join(str(page_id) for page_id in batch),
+                "imlimit": "max"
+            })
+            for page_id in batch:
+                images = pages.get(str(page_id), {}).get("images", [])
+                page_titles[page_id] = sorted(image["title"] for image in images)[:limit]
+        infos = self.get_image_infos(
+            [title for titles in page_titles.values() for title in titles], thumb_width=thumb_width
+        )
+        return {
+            page_id: [infos[title] for title in titles if title in infos]
+            for page_id, titles in page_titles.items()
+        }
+    
+    def materialize_results(self, results):
+        """
+        Rapor kayıtlarını zenginleştirilmiş arama sonuçlarından oluşturur; sonuçlarda
+        bulunan kategoriler yeniden istenmez. Eksik kategoriler ve resimler toplu
+        sorgularla alınır. Tam içerikler önce içerik önbelleğinden alınır (zenginleştirmede
+        alınmış içerikler dahil): taze girdiler istek yapılmadan kullanılır, kontrol süresi
+        dolmuş girdilerin revizyonları kategorilerle aynı toplu prop=info sorgusunda
+        doğrulanır. Tam içerik (TextExtracts, exintro=0) istek başına tek sayfa
+        döndürdüğünden toplu alınamaz; yalnızca önbellekte olmayan ya da değişmiş sayfalar
+        PAGE_BATCH_CONTENT_CONCURRENCY eşzamanlılıkla tek tek alınır.
+        :param results: Arama sonuçları (en az pageid ve title alanları)
+        :return: title, pageid, url, categories, content ve images alanlarını içeren kayıt listesi
+        """
+        records = [
+            {
+                "title": result["title"],
+                "pageid": result["pageid"],
+                "url": self.get_page_url(result["title"]),
+                "categories": result.get("categories")
+            }
+            for result in results
+        ]
+        page_ids = list(dict.fromkeys(record["pageid"] for record in records))
+        contents = {}
+        unchecked = {}  # page_id -> kontrol süresi dolmuş önbellek girdisi
+        if self.content_cache is not None:
+            for page_id in page_ids:
+                entry = self.content_cache.lookup(self.language, "page", page_id=page_id)
+                if entry is None:
+                    continue
+                if self.content_cache.is_fresh(entry):
+                    contents[page_id] = entry["content"]
+                else:
+                    unchecked[page_id] = entry
+        cache_hits = len(contents)
+        missing_categories = list(dict.fromkeys(
+            record["pageid"] for record in records if record["categories"] is None
+        ))
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(PAGE_BATCH_CONTENT_CONCURRENCY, len(page_ids)))) as executor:
+            # Her görev isteğin bağlamının (metrik sayacı, iz) kendi kopyasında çalışır
+            content_futures = {
+                page_id: executor.submit(contextvars.copy_context().run, self._fetch_page_content, page_id)
+                for page_id in page_ids if page_id not in contents and page_id not in unchecked
+            }
+            # Önbellekte olmayan içerikler alınırken eksik kategoriler ve önbellekteki
+            # girdilerin güncel revizyonları toplu sorgularla istenir
+            batch_ids = list(dict.fromkeys(missing_categories + list(unchecked)))
+            fields = ("info", "categories") if missing_categories else ("info",)
+            pages = {}
+            for start in range(0, len(batch_ids), PAGE_BATCH_SIZE):
+                pages.update(self.get_pages_batch(batch_ids[start:start + PAGE_BATCH_SIZE], fields=fields))
+            for page_id, entry in unchecked.items():
+                if pages.get(page_id, {}).get("revid") == entry["revid"]:
+                    self.content_cache.mark_checked(self.language, "page", entry)
+                    contents[page_id] = entry["content"]
+                else:
+                    self.content_cache.mark_stale()
+                    content_futures[page_id] = executor.submit(
+                        contextvars.copy_context().run, self._fetch_page_content, page_id
+                    )
+            images = self.get_pages_image_infos(page_ids)
+            add_span_event("cache.content.batch", {
+                "hits": cache_hits,
+                "revalidated": len(contents) - cache_hits,
+                "fetched": len(content_futures)
+            })
+            contents.update((page_id, future.result()) for page_id, future in content_futures.items())
+        categories = {page_id: page.get("categories", []) for page_id, page in pages.items()}
+        for record in records:
+            if record["categories"] is None:
+                record["categories"] = categories.get(record["pageid"], [])
+            record["content"] = contents[record["pageid"]]
+            record["images"] = images.get(record["pageid"], [])
+        return records
+    
+    def report_output_name(self, output_file):
+        """
+        Rapor deposu kullanılıyorsa çıktı adını depodaki düz dosya adına indirger
+        :return: Raporun döndürülecek (ve /download ile indirilecek) adı
+        """
+        if self.report_store is None:
+            return output_file
+        name = os.path.basename(output_file.replace("\\", "/")).lstrip(".")
+        return name if self.report_store.is_valid_name(name) else "wiki_search.txt"
+    
     def save_results_to_file(self, search_term, results, output_file=None):
         """
-        Arama sonuçlarını ve içeriği dosyaya kaydeder
+        Arama sonuçlarını ve içeriği dosyaya kaydeder. Rapor zenginleştirilmiş
+        sonuçlardan oluşturulur (bkz. materialize_results); dosya önce geçici adla
+        yazılır, tamamlanınca asıl adına taşınır. Rapor deposu varsa dosya depoya
+        yazılır ve sıkıştırılmış kopyalarıyla yayınlanır.
         :param search_term: Arama terimi
         :param results: Arama sonuçları
         :param output_file: Çıktı dosyası adı (None ise otomatik oluşturulur)
         :return: Kaydedilen dosya adı
         """
         if output_file is None:
-            # Dosya adını otomatik oluştur
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_search_term = re.sub(r'[^\w\s-]', '', search_term).strip().replace(' ', '_')
-            if not safe_search_term:
-                safe_search_term = "wiki_search"
-            output_file = f"{safe_search_term}_{timestamp}.txt"
+            output_file = self.report_file_name(search_term)
+        output_file = self.report_output_name(output_file)
+        path = self.report_store.path(output_file) if self.report_store is not None else output_file
         
         # Dosya dizinini kontrol et, yoksa oluştur
-        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
+        os.makedirs(os.path.dirname(path) if os.path.dirname(path) else '.', exist_ok=True)
         
-        with open(output_file, "w", encoding="utf-8") as file:
+        records = self.materialize_results(results) if results else []
+        # Aynı ada eşzamanlı yazan raporlar birbirinin geçici dosyasını bozmasın diye benzersiz ad
+        temp_fd, temp_file = tempfile.mkstemp(
+            dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".part"
+        )
+        try:
+            self._write_report_file(temp_fd, search_term, records)
+            os.replace(temp_file, path)
+        except BaseException:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
+        if self.report_store is not None:
+            self.report_store.publish(output_file)
+        
+        return output_file
+
+    def _write_report_file(self, fd, search_term, records):
+        # Rapor kayıtlarını açık dosya tanıtıcısına düz metin olarak yazar
+        with open(fd, "w", encoding="utf-8") as file:
             file.write(f"ARAMA TERİMİ: {search_term}\n")
             file.write("=" * 50 + "\n\n")
             
-            if not results:
+            if not records:
                 file.write("Sonuç bulunamadı.\n")
-                return output_file
-            
-            file.write(f"{len(results)} SONUÇ BULUNDU:\n\n")
+            else:
+                file.write(f"{len(records)} SONUÇ BULUNDU:\n\n")
             
-            for i, result in enumerate(results):
+            for i, record in enumerate(records):
                 file.write(f"SONUÇ {i+1}:\n")
-                file.write(f"Başlık: {result['title']}\n")
-                file.write(f"Sayfa ID: {result['pageid']}\n")
+                file.write(f"Başlık: {record['title']}\n")
+                file.write(f"Sayfa ID: {record['pageid']}\n")
+                file.write(f"Sayfa URL: {record['url']}\n\n")
                 
-                # Sayfa URL'si ekle
-                page_url = self.get_page_url(result['title'])
-                file.write(f"Sayfa URL: {page_url}\n\n")
-                
-                # Kategorileri al
-                categories = self.get_page_categories(result['pageid'])
-                if categories:
+                if record["categories"]:
                     file.write("KATEGORİLER:\n")
-                    file.write(", ".join(categories[:10]))  # İlk 10 kategori
+                    file.write(", ".join(record["categories"][:10]))  # İlk 10 kategori
                     file.write("\n\n")
                 
-                # İçeriği al (genişletilmiş)
-                content = self.get_page_content(result['pageid'])
-                if content:
+                if record["content"]:
                     file.write("İÇERİK:\n")
-                    file.write(content)
+                    file.write(record["content"])
                     file.write("\n\n")
                 else:
                     file.write("İçerik bulunamadı.\n\n")
                 
-                # Resimleri al
-                images = self.get_page_images(result['pageid'])
-                if images:
+                if record["images"]:
                     file.write("RESİMLER:\n")
-                    for j, img in enumerate(images[:5]):  # İlk 5 resmi kaydet
-                        img_url = self.get_image_url(img)
-                        file.write(f"{j+1}. {img}\n")
-                        if img_url:
-                            file.write(f"   URL: {img_url}\n")
+                    for j, img in enumerate(record["images"]):
+                        file.write(f"{j+1}. {img['title']}\n")
+                        file.write(f"   URL: {img['url']}\n")
                     file.write("\n")
                 
                 file.write("-" * 50 + "\n\n")
-        
-        return output_file
 
     def analyze_content(self, page_id, analyze_type="summary"):
         """
         Sayfa içeriğini analiz eder
         :param page_id: Wikipedia sayfa ID'si
-        :param analyze_type: Analiz tipi (summary, keywords, sentiment)
+        :param analyze_type: Analiz tipi (summary, keywords, sections, all)
         :return: Analiz sonucu
         """
         content = self.get_page_content(page_id)
@@ -526,16 +1734,11 @@ class WikipediaService:
         
         # Anahtar kelimeler
         if analyze_type == "keywords" or analyze_type == "all":
-            # Basit bir anahtar kelime çıkarma yöntemi
-            words = re.findall(r'\b[a-zA-ZğüşıöçĞÜŞİÖÇ]{4,}\b', content.lower())
-            word_count = {}
-            for word in words:
-                if word not in ["için", "olarak", "kadar", "sonra", "önce", "daha", "diğer"]:
-                    word_count[word] = word_count.get(word, 0) + 1
-            
-            # En çok geçen 10 kelimeyi al
-            keywords = sorted(word_count.items(), key=lambda x: x[1], reverse=True)[:10]
-            result["keywords"] = {k: v for k, v in keywords}
+            # Önbellekteki tüm sayfalar üzerinden TF-IDF; sözlük skora göre sıralıdır
+            keyword_index = self.keyword_index if self.keyword_index is not None else KeywordIndex()
+            keywords = keyword_index.keywords(self.language, page_id, content, top_n=ANALYZE_KEYWORD_COUNT)
+            result["keywords"] = {word: count for word, count, _ in keywords}
+            result["keyword_scores"] = {word: score for word, _, score in keywords}
         
         # Bölüm başlıkları
         if analyze_type == "sections" or analyze_type == "all":
@@ -551,41 +1754,29 @@ class WikipediaService:
         :param page_id_2: İkinci sayfa ID'si
         :return: Karşılaştırma sonucu
         """
-        # İlk sayfa bilgilerini al
+        # İki sayfanın bilgileri ve kategorileri tek istekte alınır
         params = {
             "action": "query",
             "format": "json",
             "prop": "info|categories",
-            "pageids": page_id_1,
+            "pageids": f"{page_id_1}|{page_id_2}",
             "inprop": "url|displaytitle",
-            "cllimit": 50
+            "cllimit": "max"
         }
         
-        response = requests.get(self.base_url, params=params)
+        response = self.session.get(self.base_url, params=params)
         data = response.json()
         
-        page1_info = {}
-        if "query" in data and "pages" in data["query"]:
-            page_data = data["query"]["pages"].get(str(page_id_1))
+        pages = data.get("query", {}).get("pages", {})
+        page1_info = {"title": "", "url": "", "categories": []}
+        page2_info = {"title": "", "url": "", "categories": []}
+        for page_id, page_info in ((page_id_1, page1_info), (page_id_2, page2_info)):
+            page_data = pages.get(str(page_id))
             if page_data:
-                page1_info["title"] = page_data.get("title", "")
-                page1_info["url"] = page_data.get("fullurl", "")
-                page1_info["categories"] = [cat["title"].replace("Kategori:", "").replace("Category:", "") 
-                                          for cat in page_data.get("categories", [])]
-        
-        # İkinci sayfa bilgilerini al
-        params["pageids"] = page_id_2
-        response = requests.get(self.base_url, params=params)
-        data = response.json()
-        
-        page2_info = {}
-        if "query" in data and "pages" in data["query"]:
-            page_data = data["query"]["pages"].get(str(page_id_2))
-            if page_data:
-                page2_info["title"] = page_data.get("title", "")
-                page2_info["url"] = page_data.get("fullurl", "")
-                page2_info["categories"] = [cat["title"].replace("Kategori:", "").replace("Category:", "") 
-                                          for cat in page_data.get("categories", [])]
+                page_info["title"] = page_data.get("title", "")
+                page_info["url"] = page_data.get("fullurl", "")
+                page_info["categories"] = [cat["title"].replace("Kategori:", "").replace("Category:", "") 
+                                           for cat in page_data.get("categories", [])]
         
         # İçerikleri al
         page1_info["content"] = self.get_page_content(page_id_1)
@@ -601,6 +1792,13 @@ class WikipediaService:
         common_words = words1 & words2
         similarity = len(common_words) / max(len(words1), len(words2)) if max(len(words1), len(words2)) > 0 else 0
         
+        # Revizyon başına saklanan imzalarla (durdurma sözcükleri hariç) Jaccard tahmini
+        signature_1 = self.get_page_signature(page_id_1)
+        signature_2 = self.get_page_signature(page_id_2)
+        signature_similarity = (
+            round(minhash_similarity(signature_1, signature_2), 4) if signature_1 and signature_2 else 0.0
+        )
+        
         return {
             "page1": {
                 "title": page1_info["title"],
@@ -614,8 +1812,745 @@ class WikipediaService:
             },
             "common_categories": common_categories,
             "similarity": similarity,
+            "signature_similarity": signature_similarity,
             "common_word_count": len(common_words)
         }
+    
+    def get_page_signature(self, page_id):
+        """
+        Sayfanın MinHash/SimHash benzerlik imzasını döndürür. İmza sayfa revizyonu
+        başına bir kez hesaplanır ve önbellekteki içeriğin yanında saklanır.
+        :param page_id: Wikipedia sayfa ID'si
+        :return: İmza sözlüğü, içerik bulunamazsa None
+        """
+        content = self.get_page_content(page_id)
+        if not content:
+            return None
+        revid = None
+        if self.content_cache is not None:
+            entry = self.content_cache.lookup(self.language, "page", page_id=page_id)
+            if entry is not None and entry["content"] == content:
+                revid = entry["revid"]
+        if revid is not None:
+            data = self.content_cache.get_signature(self.language, page_id, revid)
+            if data is not None:
+                return signature_from_bytes(data)
+        signature = compute_signature(content, self.language)
+        if revid is not None:
+            self.content_cache.put_signature(self.language, page_id, revid, signature_to_bytes(signature))
+        return signature
+
+
+class AsyncWikipediaService:
+    """
+    WikipediaService'in asenkron sürümü.
+    Engelleyici HTTP çağrıları iş parçacığı havuzunda çalıştırılır, böylece
+    olay döngüsü (event loop) yavaş bir Wikipedia yanıtı yüzünden durmaz.
+    Tüm örnekler uygulama ömrü boyunca açık kalan ortak HTTP oturumunu kullanır.
+    """
+    def __init__(self, language="tr", session=None, content_cache=None, summary_cache=None, image_cache=None,
+                 title_cache=None, search_index=None, keyword_index=None, report_store=None):
+        """
+        :param language: Dil kodu (örn: tr, en, de, fr)
+        :param session: Paylaşılan HTTP oturumu
+        :param content_cache: Paylaşılan sayfa içeriği önbelleği
+        :param summary_cache: Paylaşılan rehber özeti önbelleği
+        :param image_cache: Paylaşılan küçük resim disk önbelleği
+        :param title_cache: Paylaşılan başlık -> sayfa ID önbelleği
+        :param search_index: Paylaşılan yerel tam metin dizini
+        :param keyword_index: Paylaşılan TF-IDF anahtar kelime dizini
+        :param report_store: Paylaşılan arama raporu deposu
+        """
+        self.service = WikipediaService(
+            language=language,
+            session=session,
+            content_cache=content_cache,
+            summary_cache=summary_cache,
+            image_cache=image_cache,
+            title_cache=title_cache,
+            search_index=search_index,
+            keyword_index=keyword_index,
+            report_store=report_store
+        )
+        self.language = language
+        self.base_url = self.service.base_url
+        self.wiki_url = self.service.wiki_url
+
+    async def _run(self, func, *args, **kwargs):
+        # İstek izleniyorsa servis metodu bir span olur; iş parçacığındaki HTTP çağrıları altına eklenir
+        with trace_span(f"service.{func.__name__}", {"wiki.language": self.language}):
+            return await run_in_threadpool(func, *args, **kwargs)
+
+    async def search(self, *args, **kwargs):
+        return await self._run(self.service.search, *args, **kwargs)
+
+    async def hybrid_search(self, *args, **kwargs):
+        return await self._run(self.service.hybrid_search, *args, **kwargs)
+
+    async def iter_search(self, *args, **kwargs):
+        """
+        Arama sonuçlarını hazır oldukça döndüren asenkron generator
+        """
+        async for result in iterate_in_threadpool(self.service.iter_search(*args, **kwargs)):
+            yield result
+
+    async def get_page_content(self, page_id):
+        return await self._run(self.service.get_page_content, page_id)
+
+    async def get_full_content_by_title(self, title):
+        return await self._run(self.service.get_full_content_by_title, title)
+
+    async def get_page_categories(self, page_id):
+        return await self._run(self.service.get_page_categories, page_id)
+
+    async def get_page_images(self, page_id):
+        return await self._run(self.service.get_page_images, page_id)
+
+    async def get_image_url(self, image_title):
+        return await self._run(self.service.get_image_url, image_title)
+
+    async def get_image_infos(self, image_titles, thumb_width=None, mime_types=None):
+        return await self._run(self.service.get_image_infos, image_titles, thumb_width, mime_types)
+
+    async def get_page_image_infos(self, page_id, limit=None, thumb_width=None, mime_types=None):
+        return await self._run(self.service.get_page_image_infos, page_id, limit, thumb_width, mime_types)
+
+    async def get_thumbnail(self, image_title, width):
+        return await self._run(self.service.get_thumbnail, image_title, width)
+
+    async def get_page_info(self, page_id):
+        return await self._run(self.service.get_page_info, page_id)
+
+    async def get_pages_batch(self, page_ids, fields=("info", "categories", "extract")):
+        """
+        Sayfaları PAGE_BATCH_SIZE'lık toplu sorgularla eşzamanlı olarak alır.
+        Başarısız olan sorgu ya da içerik yalnızca ilgili sayfaların sonucunda hata olarak döner.
+        :param page_ids: Sayfa ID'leri (tekrarlar bir kez alınır)
+        :param fields: İstenen alanlar (bkz. PAGE_BATCH_FIELDS)
+        :return: İstek sırasıyla sayfa sözlükleri listesi
+        """
+        page_ids = list(dict.fromkeys(page_ids))
+        chunks = [page_ids[start:start + PAGE_BATCH_SIZE] for start in range(0, len(page_ids), PAGE_BATCH_SIZE)]
+        responses = await asyncio.gather(
+            *(self._run(self.service.get_pages_batch, chunk, fields) for chunk in chunks),
+            return_exceptions=True
+        )
+        results = {}
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                for page_id in chunk:
+                    results[page_id] = {"page_id": page_id, "error": str(response)}
+            else:
+                results.update(response)
+        
+        if "content" in fields:
+            # Tam içerik sayfa başına alınır (önbellekten ya da tek istekle); eşzamanlılık sınırlanır
+            semaphore = asyncio.Semaphore(PAGE_BATCH_CONTENT_CONCURRENCY)
+            
+            async def fetch_content(page_id):
+                async with semaphore:
+                    return await self.get_page_content(page_id)
+            
+            found = [page_id for page_id in page_ids if "error" not in results[page_id]]
+            contents = await asyncio.gather(*(fetch_content(page_id) for page_id in found), return_exceptions=True)
+            for page_id, content in zip(found, contents):
+                if isinstance(content, Exception):
+                    results[page_id]["error"] = f"İçerik alınamadı: {str(content)}"
+                    continue
+                results[page_id]["content"] = content
+                results[page_id]["word_count"] = len(content.split()) if content else 0
+        return [results[page_id] for page_id in page_ids]
+
+    async def get_page_links(self, page_id, limit=10):
+        return await self._run(self.service.get_page_links, page_id, limit)
+
+    async def get_category_members(self, category, limit=10):
+        return await self._run(self.service.get_category_members, category, limit)
+
+    async def resolve_titles(self, titles):
+        return await self._run(self.service.resolve_titles, titles)
+
+    async def save_results_to_file(self, search_term, results, output_file=None):
+        return await self._run(self.service.save_results_to_file, search_term, results, output_file)
+
+    def report_file_name(self, search_term, prefix=""):
+        return self.service.report_file_name(search_term, prefix)
+
+    def schedule_report(self, background_tasks, search_term, results, output_file=None):
+        """
+        Raporu yanıt gönderildikten sonra yazılmak üzere arka plan görevine ekler
+        :param background_tasks: FastAPI BackgroundTasks nesnesi
+        :return: Raporun yazılacağı dosya adı
+        """
+        if output_file is None:
+            output_file = self.report_file_name(search_term)
+        output_file = self.service.report_output_name(output_file)
+        if self.service.report_store is not None:
+            self.service.report_store.reserve(output_file)
+        background_tasks.add_task(self._write_report, search_term, list(results), output_file)
+        return output_file
+
+    async def _write_report(self, search_term, results, output_file):
+        # Arka planda çalışır; hata yanıtı etkilemez, yalnızca günlüğe yazılır
+        try:
+            await self.save_results_to_file(search_term, results, output_file)
+        except Exception:
+            if self.service.report_store is not None:
+                self.service.report_store.discard(output_file)
+            logger.exception("Rapor yazılamadı (%s)", output_file)
+
+    async def analyze_content(self, page_id, analyze_type="summary"):
+        return await self._run(self.service.analyze_content, page_id, analyze_type)
+
+    async def compare_pages(self, page_id_1, page_id_2):
+        return await self._run(self.service.compare_pages, page_id_1, page_id_2)
+
+    async def get_page_signature(self, page_id):
+        return await self._run(self.service.get_page_signature, page_id)
+
+    async def get_similarity(self, page_ids, method="minhash", top_k=None):
+        """
+        Sayfaların imzalarını eşzamanlı olarak alır ve benzerliklerini hesaplar
+        :param page_ids: Sayfa ID'leri
+        :param method: minhash veya simhash
+        :param top_k: Verilirse matris yerine her sayfa için en benzer top_k sayfa döndürülür
+        :return: page_ids, missing ve matrix (veya top_similar) alanlarını içeren sözlük
+        """
+        page_ids = list(dict.fromkeys(page_ids))
+        signatures = await asyncio.gather(*(self.get_page_signature(page_id) for page_id in page_ids))
+        found = [(page_id, signature) for page_id, signature in zip(page_ids, signatures) if signature]
+        matrix = similarity_matrix([signature for _, signature in found], method)
+        result = {
+            "method": method,
+            "page_ids": [page_id for page_id, _ in found],
+            "missing": [page_id for page_id, signature in zip(page_ids, signatures) if not signature]
+        }
+        if top_k is None:
+            result["matrix"] = matrix
+            return result
+        result["top_similar"] = {
+            str(page_id): [
+                {"page_id": found[j][0], "similarity": value}
+                for j, value in sorted(
+                    ((j, value) for j, value in enumerate(row) if j != i),
+                    key=lambda item: item[1], reverse=True
+                )[:top_k]
+            ]
+            for i, (page_id, row) in enumerate(zip(result["page_ids"], matrix))
+        }
+        return result
+
+    def get_page_url(self, title):
+        return self.service.get_page_url(title)
+
+    async def get_page_bundle(self, page_id, content=True, categories=True, info=True):
+        """
+        Bir sayfanın birbirinden bağımsız parçalarını (içerik, kategoriler, bilgi)
+        eşzamanlı olarak alır
+        :param page_id: Wikipedia sayfa ID'si
+        :return: content, categories ve info alanlarını içeren sözlük
+        """
+        names = []
+        tasks = []
+        if content:
+            names.append("content")
+            tasks.append(self.get_page_content(page_id))
+        if categories:
+            names.append("categories")
+            tasks.append(self.get_page_categories(page_id))
+        if info:
+            names.append("info")
+            tasks.append(self.get_page_info(page_id))
+        values = await asyncio.gather(*tasks)
+        return dict(zip(names, values))
+
+
+class SummaryJobManager:
+    """
+    AI rehber özetlerini arama yanıtından sonra, sınırlı sayıda arka plan
+    işçisiyle üretir. Her arama için bir iş (job) oluşturulur; biten özetler
+    iş ID'si ile sorgulanır. Süresi dolan işler hem yeni iş eklenirken hem de
+    sorgulanırken temizlenir.
+    """
+    def __init__(self, max_workers=SUMMARY_WORKERS, max_jobs=SUMMARY_MAX_JOBS, job_ttl=SUMMARY_JOB_TTL):
+        """
+        :param max_workers: Aynı anda çalışan en fazla özet üretimi
+        :param max_jobs: Bellekte tutulacak en fazla iş sayısı
+        :param job_ttl: İşlerin saklanma süresi (sn)
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-summary")
+        self.max_jobs = max_jobs
+        self.job_ttl = job_ttl
+        self.jobs = OrderedDict()  # job_id -> iş
+        self.lock = threading.Lock()
+
+    def submit(self, service, results):
+        """
+        Sonuçların AI rehber özetlerini arka planda üretmek için iş oluşturur
+        :param service: Özetleri üretecek WikipediaService
+        :param results: Zenginleştirilmiş arama sonuçları (aynı sayfa birden fazla geçerse bir kez üretilir)
+        :return: İş ID'si
+        """
+        job_id = uuid.uuid4().hex
+        unique_results = OrderedDict()
+        for result in results:
+            unique_results.setdefault(result["pageid"], result)
+        job = {
+            "created_at": time.time(),
+            "items": OrderedDict(
+                (page_id, {
+                    "pageid": page_id,
+                    "title": result["title"],
+                    "status": "pending",
+                    "ai_guide_summary": None
+                })
+                for page_id, result in unique_results.items()
+            )
+        }
+        with self.lock:
+            self._expire()
+            self.jobs[job_id] = job
+        for result in unique_results.values():
+            self.executor.submit(self._generate, job, service, result)
+        return job_id
+
+    def get(self, job_id, page_ids=None):
+        """
+        İşin durumunu ve biten özetleri döndürür
+        :param job_id: İş ID'si
+        :param page_ids: Yalnızca bu sayfaların sonuçları (None ise tümü)
+        :return: İş durumu sözlüğü, iş yoksa None
+        """
+        with self.lock:
+            self._expire()
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            items = [
+                dict(item) for page_id, item in job["items"].items()
+                if page_ids is None or page_id in page_ids
+            ]
+        pending = sum(1 for item in items if item["status"] == "pending")
+        return {
+            "job_id": job_id,
+            "status": "pending" if pending else "done",
+            "pending_count": pending,
+            "results": items
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _generate(self, job, service, result):
+        # Hata durumunda öğe "pending" kalmasın, "error" olarak işaretlenir
+        try:
+            summary = service.guide_style_summary(
+                result["title"],
+                result["content_summary"],
+                result["categories"],
+                language=service.language
+            )
+        except Exception as e:
+            logger.exception("AI rehber özeti üretilemedi (%s)", result["pageid"])
+            with self.lock:
+                item = job["items"][result["pageid"]]
+                item["status"] = "error"
+                item["error"] = f"AI rehber özeti üretilemedi: {e}"
+            return
+        with self.lock:
+            item = job["items"][result["pageid"]]
+            item["ai_guide_summary"] = summary
+            item["status"] = "done"
+
+    def _expire(self):
+        # Kilit altında çağrılır: süresi dolan ve sınırı aşan eski işleri siler
+        now = time.time()
+        while self.jobs:
+            job_id, job = next(iter(self.jobs.items()))
+            if len(self.jobs) < self.max_jobs and now - job["created_at"] < self.job_ttl:
+                break
+            del self.jobs[job_id]
+
+
+class TopicCrawler:
+    """
+    Konu araştırması için eşzamanlı, tekrarsız genişlik öncelikli (BFS) tarayıcı.
+    Sayfalar sınırlı sayıda işçiyle paralel işlenir; ziyaret edilen sayfalar
+    sayfa ID'sine göre tutulur, her derinlikte sayfa başına izlenecek bağlantı
+    sayısı (fan-out) ve taramanın toplam süresi sınırlıdır. Derinlik başına
+    sayfa, Wikipedia isteği ve süre istatistikleri toplanır.
+    """
+    def __init__(self, wiki_service, depth, max_concurrency=CRAWL_MAX_CONCURRENCY, fan_out=None,
+                 max_pages=CRAWL_MAX_PAGES, deadline=CRAWL_DEADLINE):
+        """
+        :param wiki_service: AsyncWikipediaService
+        :param depth: Tarama derinliği (1: yalnızca ana sayfalar)
+        :param max_concurrency: Aynı anda işlenen en fazla sayfa
+        :param fan_out: Derinlik -> sayfa başına izlenecek bağlantı sayısı (None ise CRAWL_FAN_OUT)
+        :param max_pages: Ziyaret edilecek en fazla sayfa
+        :param deadline: Taramanın süre sınırı (sn); dolunca yeni sayfa işlenmez
+        """
+        self.depth = depth
+        self.max_concurrency = max_concurrency
+        self.fan_out = fan_out if fan_out is not None else CRAWL_FAN_OUT
+        self.max_pages = max_pages
+        self.deadline = deadline
+        self.visited = set()
+        self.wiki_service = wiki_service
+        # Derinlik başına çağrı sayacı: oturum düzeyinde (MeteredSession) sayılan çağrılar,
+        # sayfa ziyaretleri sırasında etkin olan derinlik sayacına ve isteğin sayacına eklenir
+        self.tallies = {
+            level: RequestTally(parent=current_tally.get()) for level in range(1, depth + 1)
+        }
+        self.started_at = None
+        self.depth_stats = {
+            level: {"pages": 0, "started_at": None, "finished_at": None}
+            for level in range(1, depth + 1)
+        }
+        self.skipped = 0
+        self.errors = 0
+        self.failed_pages = []  # ziyaret edilemeyen sayfalar (başlık, derinlik, hata)
+        self.truncated = False
+
+    def remaining(self):
+        """
+        :return: Süre sınırına kalan süre (sn)
+        """
+        return self.deadline - (time.monotonic() - self.started_at)
+
+    async def crawl(self, roots):
+        """
+        Ana arama sonuçlarından başlayarak taramayı yürütür; her sayfa işlendikçe döndürülür
+        :param roots: Ana arama sonuçları (liste veya asenkron iterator)
+        :return: (tür: main_page | related_topic, sayfa sözlüğü, arama sonucu, sıra) üreten asenkron generator
+        """
+        self.started_at = time.monotonic()
+        work = asyncio.Queue()
+        done = asyncio.Queue()
+        
+        async def worker():
+            while True:
+                node = await work.get()
+                try:
+                    if self.remaining() <= 0:
+                        self.truncated = True
+                        self.skipped += 1
+                        continue
+                    span_attributes = {
+                        "wiki.page_id": node["result"]["pageid"],
+                        "crawl.depth": node["level"],
+                        "crawl.parent": node["parent"] or ""
+                    }
+                    tally_token = current_tally.set(self.tallies[node["level"]])
+                    try:
+                        with trace_span(f"crawl.visit {node['title']}", span_attributes):
+                            item = await asyncio.wait_for(self._visit(node, work), timeout=self.remaining())
+                    except asyncio.TimeoutError:
+                        self.truncated = True
+                        self.skipped += 1
+                        continue
+                    except Exception as e:
+                        logger.warning(
+                            "Tarama ziyareti başarısız (%s, derinlik %s)", node["title"], node["level"], exc_info=True
+                        )
+                        self.errors += 1
+                        self.failed_pages.append({"title": node["title"], "depth": node["level"], "error": str(e)})
+                        continue
+                    finally:
+                        current_tally.reset(tally_token)
+                    await done.put(item)
+                finally:
+                    work.task_done()
+        
+        async def produce():
+            try:
+                index = 0
+                if hasattr(roots, "__aiter__"):
+                    async for result in roots:
+                        self._enqueue(work, result, 1, (index,))
+                        index += 1
+                else:
+                    for result in roots:
+                        self._enqueue(work, result, 1, (index,))
+                        index += 1
+                await work.join()
+            finally:
+                await done.put(None)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await done.get()
+                if item is None:
+                    break
+                yield item
+            await producer
+        finally:
+            producer.cancel()
+            for task in workers:
+                task.cancel()
+
+    def get_stats(self):
+        """
+        :return: Toplam ve derinlik başına sayfa, istek ve süre istatistikleri
+        """
+        depths = {}
+        for level, stats in self.depth_stats.items():
+            seconds = 0.0
+            if stats["started_at"] is not None and stats["finished_at"] is not None:
+                seconds = stats["finished_at"] - stats["started_at"]
+            depths[str(level)] = {
+                "pages": stats["pages"],
+                "upstream_calls": self.tallies[level].count("wikipedia"),
+                "seconds": round(seconds, 3)
+            }
+        return {
+            "pages": sum(stats["pages"] for stats in self.depth_stats.values()),
+            "visited": len(self.visited),
+            "upstream_calls": sum(tally.count("wikipedia") for tally in self.tallies.values()),
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "failed_pages": self.failed_pages,
+            "truncated": self.truncated,
+            "seconds": round(time.monotonic() - self.started_at, 3) if self.started_at else 0.0,
+            "depths": depths
+        }
+
+    def _enqueue(self, work, result, level, order, title=None, parent=None, root=None):
+        # Sayfa daha önce görülmediyse ve sınır dolmadıysa kuyruğa ekler
+        if result["pageid"] in self.visited:
+            return False
+        if len(self.visited) >= self.max_pages:
+            self.truncated = True
+            return False
+        self.visited.add(result["pageid"])
+        work.put_nowait({
+            "result": result,
+            "level": level,
+            "order": order,
+            "title": title or result["title"],
+            "parent": parent,
+            "root": root or result["title"]
+        })
+        return True
+
+    async def _visit(self, node, work):
+        # Sayfanın içeriğini (ana sayfada kategorilerini) ve gerekiyorsa bağlantılarını alır,
+        # bağlantılardan fan-out kadar yeni sayfayı kuyruğa ekler
+        level = node["level"]
+        service = self.wiki_service
+        stats = self.depth_stats[level]
+        if stats["started_at"] is None:
+            stats["started_at"] = time.monotonic()
+        result = node["result"]
+        page_id = result["pageid"]
+        
+        tasks = [service.get_page_content(page_id)]
+        if level == 1:
+            tasks.append(service.get_page_categories(page_id))
+        follow_links = level < self.depth
+        if follow_links:
+            tasks.append(service.get_page_links(page_id, CRAWL_LINKS_PER_PAGE))
+        values = await asyncio.gather(*tasks)
+        content = values[0]
+        summary = content.split("\n\n")[0] if content else ""
+        
+        if level == 1:
+            kind = "main_page"
+            page = {
+                "title": node["title"],
+                "page_id": page_id,
+                "url": service.get_page_url(node["title"]),
+                "categories": values[1][:5],  # İlk 5 kategori
+                "summary": summary
+            }
+        else:
+            kind = "related_topic"
+            page = {
+                "title": node["title"],
+                "page_id": page_id,
+                "url": service.get_page_url(node["title"]),
+                "summary": summary,
+                "main_topic": node["root"],
+                "parent_topic": node["parent"],
+                "depth": level
+            }
+        
+        if follow_links:
+            await self._expand(node, values[-1], work)
+        
+        stats["pages"] += 1
+        stats["finished_at"] = time.monotonic()
+        return kind, page, result, node["order"]
+
+    async def _expand(self, node, link_titles, work):
+        # Bağlantı başlıklarını tek toplu sorguyla sayfa ID'lerine çözer, bağlantı
+        # sırasına göre ziyaret edilmemiş ilk fan-out kadar sayfayı bir sonraki derinliğe ekler
+        level = node["level"]
+        fan_out = self.fan_out.get(level, 0)
+        if not fan_out or not link_titles:
+            return
+        resolved = await self.wiki_service.resolve_titles(link_titles)
+        added = 0
+        for title in link_titles:
+            if added >= fan_out:
+                break
+            page = resolved.get(title)
+            if page and self._enqueue(
+                work, {"pageid": page["pageid"], "title": page["title"]}, level + 1,
+                node["order"] + (added,), title=title, parent=node["title"], root=node["root"]
+            ):
+                added += 1
+
+
+def is_valid_language(language):
+    """
+    :return: Dil kodu Wikipedia alt alan adı biçimindeyse True
+    """
+    return isinstance(language, str) and LANGUAGE_CODE_RE.fullmatch(language) is not None
+
+
+class WikiServiceRegistry:
+    """
+    Süreç genelinde dil başına tek, uzun ömürlü AsyncWikipediaService tutar.
+    Her dilin keep-alive bağlantı havuzlu kendi HTTP oturumu vardır; önbellekler
+    ve dizinler tüm diller arasında paylaşılır. Dil kodu kayda eklenmeden önce
+    doğrulanır; SERVICE_REGISTRY_MAX_LANGUAGES aşılırsa en uzun süre kullanılmayan
+    dilin servisi kayıttan çıkarılır ve oturumu kapatılır (LRU).
+    """
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                 max_languages=SERVICE_REGISTRY_MAX_LANGUAGES, **shared):
+        """
+        :param pool_connections: Oturum başına host havuzu sayısı
+        :param pool_maxsize: Host başına en fazla açık bağlantı
+        :param max_languages: Ayrı oturum tutulacak en fazla dil
+        :param shared: Tüm servislere verilecek önbellekler (content_cache, summary_cache, ...)
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_languages = max_languages
+        self.shared = shared
+        self.services = OrderedDict()  # dil -> AsyncWikipediaService (en az yakın zamanda kullanılan başta)
+        self.lock = threading.Lock()
+        self.stats = {
+            "created": 0,
+            "evictions": 0,
+            "prewarmed_connections": 0,
+            "prewarm_errors": 0
+        }
+
+    def get(self, language):
+        """
+        :param language: Dil kodu (LANGUAGE_CODE_RE biçiminde)
+        :return: Dilin paylaşılan servisi (ilk istekte oluşturulur)
+        """
+        if not is_valid_language(language):
+            raise ValueError(f"Geçersiz dil kodu: {language!r}")
+        with self.lock:
+            service = self.services.get(language)
+            if service is not None:
+                self.services.move_to_end(language)
+                return service
+            if len(self.services) >= self.max_languages:
+                # Kapatılan oturumu kullanmakta olan istekler tamamlanır; bağlantıları havuza dönmeden kapanır
+                _, evicted = self.services.popitem(last=False)
+                evicted.service.session.close()
+                self.stats["evictions"] += 1
+            service = AsyncWikipediaService(
+                language=language,
+                session=create_http_session(self.pool_connections, self.pool_maxsize),
+                **self.shared
+            )
+            self.services[language] = service
+            self.stats["created"] += 1
+            return service
+
+    def prewarm(self, languages, connections=PREWARM_CONNECTIONS):
+        """
+        Dillerin bağlantı havuzlarını eşzamanlı hafif isteklerle (meta=siteinfo) doldurur;
+        böylece ilk istekler TLS el sıkışması beklemez. Hatalar açılışı engellemez.
+        :param languages: Dil kodları
+        :param connections: Dil başına açılacak bağlantı sayısı
+        """
+        params = {"action": "query", "format": "json", "meta": "siteinfo"}
+        
+        def open_connection(service):
+            service.session.get(service.base_url, params=params, timeout=10).close()
+        
+        services = []
+        for language in languages:
+            if is_valid_language(language):
+                services.append(self.get(language).service)
+            else:
+                logger.warning("Geçersiz dil kodu önceden açılmadı: %r", language)
+        with ThreadPoolExecutor(max_workers=max(1, len(services) * connections)) as executor:
+            futures = [executor.submit(open_connection, service) for service in services for _ in range(connections)]
+            for future in futures:
+                try:
+                    future.result()
+                    key = "prewarmed_connections"
+                except Exception:
+                    logger.exception("Bağlantı önceden açılamadı")
+                    key = "prewarm_errors"
+                with self.lock:
+                    self.stats[key] += 1
+
+    def get_stats(self):
+        """
+        :return: Kayıt sayaçları ve dil başına bağlantı havuzu istatistikleri
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            services = dict(self.services)
+        stats["languages"] = {
+            language: http_pool_stats(service.service.session) for language, service in services.items()
+        }
+        return stats
+
+    def close(self):
+        with self.lock:
+            for service in self.services.values():
+                service.service.session.close()
+
+
+def get_wiki_service(language="tr"):
+    """
+    Dilin kayıttaki paylaşılan (bağlantı havuzlu, önbellekli) servisini döndürür.
+    Uygulama ömrü başlamadıysa (kayıt yoksa) önbelleksiz geçici bir servis oluşturulur.
+    Geçersiz dil kodunda 400 döner.
+    """
+    if not is_valid_language(language):
+        raise HTTPException(status_code=400, detail="Geçersiz dil kodu")
+    registry = getattr(app.state, "wiki_services", None)
+    if registry is None:
+        return AsyncWikipediaService(language=language)
+    return registry.get(language)
+
+
+# Akış (streaming) yanıt biçimleri
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+
+def format_stream_frame(frame_type, data, stream_format):
+    """
+    Akış yanıtı için tek bir çerçeve (frame) oluşturur
+    :param frame_type: Çerçeve türü (result, main_page, related_topic, summary)
+    :param data: Çerçeve verisi
+    :param stream_format: ndjson (satır başına JSON) veya sse (Server-Sent Events)
+    :return: Gönderilecek metin
+    """
+    if stream_format == "sse":
+        return f"event: {frame_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return json.dumps({"type": frame_type, "data": data}, ensure_ascii=False) + "\n"
+
+
+def check_stream_format(stream_format):
+    if stream_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Geçersiz akış biçimi (ndjson, sse)")
 
 
 # ----- FastAPI Modelleri -----
@@ -626,8 +2561,12 @@ class SearchParams(BaseModel):
     limit: int = Field(10, ge=1, le=50, description="Sonuç sayısı sınırı")
     offset: int = Field(0, ge=0, description="Başlangıç indeksi")
     categories: Optional[List[str]] = Field(None, description="Filtrelenecek kategoriler")
+    category_match: str = Field("exact", description="Kategori eşleşme modu (exact, substring)")
     min_words: int = Field(0, ge=0, description="Minimum kelime sayısı")
     sort_by: str = Field("relevance", description="Sıralama kriteri (relevance, date)")
+    enrich_mode: str = Field("batch", description="Zenginleştirme yöntemi (batch, per_page)")
+    ai_summary_mode: str = Field("sync", description="AI rehber özeti modu (sync: yanıtla birlikte, deferred: arka planda)")
+    source: str = Field("remote", description="Arama kaynağı (remote: Wikipedia, local: yerel dizin, auto: yerel dizin yetersizse Wikipedia ile birleştirilir)")
     output_file: Optional[str] = Field(None, description="Çıktı dosya adı (belirtilmezse otomatik oluşturulur)")
 
 class AnalyzeParams(BaseModel):
@@ -638,11 +2577,23 @@ class CompareParams(BaseModel):
     page_id_1: int = Field(..., description="İlk sayfa ID'si")
     page_id_2: int = Field(..., description="İkinci sayfa ID'si")
 
+class PageBatchParams(BaseModel):
+    page_ids: List[int] = Field(..., description="Sayfa ID'leri")
+    language: str = Field("tr", description="Dil kodu (örn: tr, en, de)")
+    fields: List[str] = Field(["info", "categories", "extract"], description="İstenen alanlar (info, categories, extract, content)")
+
+class SimilarityParams(BaseModel):
+    page_ids: List[int] = Field(..., description="Karşılaştırılacak sayfa ID'leri")
+    language: str = Field("tr", description="Dil kodu (örn: tr, en, de)")
+    method: str = Field("minhash", description="Benzerlik yöntemi (minhash, simhash)")
+    top_k: Optional[int] = Field(None, ge=1, description="Verilirse her sayfa için en benzer top_k sayfa döndürülür")
+
 class SearchResponse(BaseModel):
     search_term: str
     results_count: int
     results: List[Dict[str, Any]]
     output_file: Optional[str] = None
+    summary_job_id: Optional[str] = None
 
 # ----- FastAPI Endpoint'leri -----
 
@@ -651,32 +2602,123 @@ async def root():
     return {"message": "Wikipedia API'ye hoş geldiniz!"}
 
 @app.post("/search", response_model=SearchResponse)
-async def search_wikipedia(params: SearchParams):
+async def search_wikipedia(params: SearchParams, background_tasks: BackgroundTasks):
     """
     Wikipedia'da arama yapar ve sonuçları döndürür.
-    İsteğe bağlı olarak sonuçları dosyaya kaydeder.
-    """
-    wiki_service = WikipediaService(language=params.language)
-    results = wiki_service.search(
-        query=params.query,
-        limit=params.limit,
-        offset=params.offset,
-        categories=params.categories,
-        min_words=params.min_words,
-        sort_by=params.sort_by
-    )
+    Sonuçlar yanıt gönderildikten sonra arka planda output_file dosyasına kaydedilir.
+    ai_summary_mode=deferred ise AI rehber özetleri beklenmez; sonuçlar "pending"
+    olarak döner ve özetler /summaries/{job_id} üzerinden alınır.
+    source=local/auto ise daha önce getirilen sayfalardan oluşan yerel dizin kullanılır.
+    """
+    if params.source not in SEARCH_SOURCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Geçersiz arama kaynağı: {params.source} ({', '.join(SEARCH_SOURCES)})"
+        )
+    wiki_service = get_wiki_service(language=params.language)
+    deferred = params.ai_summary_mode == "deferred"
+    search_kwargs = {
+        "query": params.query,
+        "limit": params.limit,
+        "offset": params.offset,
+        "categories": params.categories,
+        "category_match": params.category_match,
+        "min_words": params.min_words,
+        "sort_by": params.sort_by,
+        "enrich_mode": params.enrich_mode,
+        "ai_summaries": not deferred
+    }
+    if params.source == "remote":
+        results = await wiki_service.search(**search_kwargs)
+    else:
+        results = await wiki_service.hybrid_search(source=params.source, **search_kwargs)
+    
+    summary_job_id = None
+    if deferred and results:
+        summary_job_id = app.state.summary_jobs.submit(wiki_service.service, results)
+        for result in results:
+            result["ai_guide_summary"] = None
+            result["ai_guide_summary_status"] = "pending"
     
     output_file = None
     if results:
-        output_file = wiki_service.save_results_to_file(params.query, results, params.output_file)
+        output_file = wiki_service.schedule_report(background_tasks, params.query, results, params.output_file)
     
     return {
         "search_term": params.query,
         "results_count": len(results),
         "results": results,
-        "output_file": output_file
+        "output_file": output_file,
+        "summary_job_id": summary_job_id
     }
 
+@app.post("/search/stream")
+async def search_wikipedia_stream(
+    params: SearchParams,
+    background_tasks: BackgroundTasks,
+    stream_format: str = Query("ndjson", alias="format", description="Akış biçimi (ndjson, sse)")
+):
+    """
+    /search ile aynı aramayı yapar, her zenginleştirilmiş sonucu hazır olur olmaz
+    gönderir. Son çerçeve (summary) sonuç sayısını ve dosya adını içerir.
+    """
+    check_stream_format(stream_format)
+    wiki_service = get_wiki_service(language=params.language)
+    deferred = params.ai_summary_mode == "deferred"
+    
+    async def frames():
+        results = []
+        async for result in wiki_service.iter_search(
+            query=params.query,
+            limit=params.limit,
+            offset=params.offset,
+            categories=params.categories,
+            category_match=params.category_match,
+            min_words=params.min_words,
+            sort_by=params.sort_by,
+            enrich_mode=params.enrich_mode,
+            ai_summaries=not deferred
+        ):
+            if deferred:
+                result["ai_guide_summary"] = None
+                result["ai_guide_summary_status"] = "pending"
+            results.append(result)
+            yield format_stream_frame("result", result, stream_format)
+        
+        summary_job_id = None
+        if deferred and results:
+            summary_job_id = app.state.summary_jobs.submit(wiki_service.service, results)
+        output_file = None
+        if results:
+            output_file = wiki_service.schedule_report(background_tasks, params.query, results, params.output_file)
+        yield format_stream_frame("summary", {
+            "search_term": params.query,
+            "results_count": len(results),
+            "output_file": output_file,
+            "summary_job_id": summary_job_id
+        }, stream_format)
+    
+    return StreamingResponse(frames(), media_type=STREAM_MEDIA_TYPES[stream_format])
+
+@app.get("/summaries/{job_id}", response_model=Dict[str, Any])
+async def get_summaries(
+    job_id: str,
+    page_ids: Optional[str] = Query(None, description="Virgülle ayrılmış sayfa ID'leri (belirtilmezse tümü)")
+):
+    """
+    Ertelenmiş AI rehber özetlerini iş ID'sine göre döndürür (tek sonuç veya toplu)
+    """
+    selected = None
+    if page_ids:
+        try:
+            selected = {int(page_id) for page_id in page_ids.split(",") if page_id.strip()}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Geçersiz sayfa ID'si")
+    job = app.state.summary_jobs.get(job_id, selected)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Özet işi bulunamadı")
+    return job
+
 @app.get("/page/{page_id}", response_model=Dict[str, Any])
 async def get_page(
     page_id: int = Path(..., description="Wikipedia sayfa ID'si")
@@ -684,51 +2726,54 @@ async def get_page(
     """
     Wikipedia sayfasının tam içeriğini döndürür
     """
-    wiki_service = WikipediaService()
-    content = wiki_service.get_page_content(page_id)
-    categories = wiki_service.get_page_categories(page_id)
+    wiki_service = get_wiki_service()
+    # İçerik, kategoriler ve sayfa bilgisi birbirinden bağımsız, eşzamanlı alalım
+    bundle = await wiki_service.get_page_bundle(page_id)
+    content = bundle["content"]
+    categories = bundle["categories"]
     
     if not content:
         raise HTTPException(status_code=404, detail="Sayfa bulunamadı")
     
-    # Sayfa başlığını almak için
-    params = {
-        "action": "query",
-        "format": "json",
-        "prop": "info",
-        "pageids": page_id,
-        "inprop": "url|displaytitle"
-    }
-    
-    response = requests.get(wiki_service.base_url, params=params)
-    data = response.json()
-    
-    title = ""
-    url = ""
-    if "query" in data and "pages" in data["query"]:
-        page_data = data["query"]["pages"].get(str(page_id))
-        if page_data:
-            title = page_data.get("title", "")
-            url = page_data.get("fullurl", "")
-    
     return {
         "page_id": page_id,
-        "title": title,
-        "url": url,
+        "title": bundle["info"]["title"],
+        "url": bundle["info"]["url"],
         "categories": categories,
         "content": content,
         "word_count": len(content.split()) if content else 0
     }
 
+@app.post("/pages/batch", response_model=Dict[str, Any])
+async def get_pages_batch(params: PageBatchParams):
+    """
+    Birden fazla sayfanın seçilen alanlarını döndürür. Bilgi, kategori ve giriş metni
+    50 sayfalık toplu sorgularla eşzamanlı alınır; bulunamayan ya da alınamayan
+    sayfalar sonuçta error alanıyla yer alır.
+    """
+    invalid = [field for field in params.fields if field not in PAGE_BATCH_FIELDS]
+    if invalid or not params.fields:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Geçersiz alan: {', '.join(invalid)} (info, categories, extract, content)"
+        )
+    if not 1 <= len(params.page_ids) <= PAGE_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"1 ile {PAGE_BATCH_MAX_IDS} arasında sayfa ID'si gerekli")
+    wiki_service = get_wiki_service(params.language)
+    pages = await wiki_service.get_pages_batch(params.page_ids, params.fields)
+    return {
+        "requested": len(pages),
+        "found": sum(1 for page in pages if "error" not in page),
+        "pages": pages
+    }
+
 @app.post("/analyze", response_model=Dict[str, Any])
 async def analyze_page(params: AnalyzeParams):
     """
     Wikipedia sayfasının içeriğini analiz eder
     """
-wiki_service = WikipediaService()
-
-def analyze_content(params):
-    result = wiki_service.analyze_content(params.page_id, params.analyze_type)
+    wiki_service = get_wiki_service()
+    result = await wiki_service.analyze_content(params.page_id, params.analyze_type)
     
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
@@ -740,49 +2785,346 @@ async def compare_pages(params: CompareParams):
     """
     İki Wikipedia sayfasını karşılaştırır
     """
-    wiki_service = WikipediaService()
-    result = wiki_service.compare_pages(params.page_id_1, params.page_id_2)
+    wiki_service = get_wiki_service()
+    result = await wiki_service.compare_pages(params.page_id_1, params.page_id_2)
     
     return result
 
+@app.post("/similarity", response_model=Dict[str, Any])
+async def page_similarity(params: SimilarityParams):
+    """
+    Sayfaların revizyon başına saklanan MinHash/SimHash imzalarından N×N benzerlik
+    matrisini (veya top_k verilirse her sayfaya en benzer sayfaları) döndürür
+    """
+    if params.method not in SIMILARITY_METHODS:
+        raise HTTPException(status_code=400, detail="Geçersiz benzerlik yöntemi (minhash, simhash)")
+    if not 2 <= len(set(params.page_ids)) <= SIMILARITY_MAX_PAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Karşılaştırma için 2 ile {SIMILARITY_MAX_PAGES} arasında farklı sayfa ID'si gerekli"
+        )
+    wiki_service = get_wiki_service(params.language)
+    return await wiki_service.get_similarity(params.page_ids, params.method, params.top_k)
+
 @app.get("/download/{filename}")
-async def download_file(filename: str):
+async def download_file(filename: str, request: Request):
     """
-    Belirtilen dosyayı indirme endpoint'i
+    Rapor deposundaki bir raporu indirme endpoint'i.
+    Accept-Encoding'e göre önceden sıkıştırılmış zstd/gzip kopyası gönderilir;
+    ETag/If-None-Match ve bayt aralığı (Range) istekleri desteklenir.
+    Rapor henüz yazılıyorsa 202 döner.
     """
-    if not os.path.exists(filename):
+    report_store = app.state.report_store
+    if not report_store.is_valid_name(filename):
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    entry = report_store.get(filename)
+    if entry is None:
+        if report_store.is_pending(filename):
+            return JSONResponse(
+                status_code=202,
+                content={"detail": "Rapor hazırlanıyor"},
+                headers={"Retry-After": str(REPORT_RETRY_AFTER)}
+            )
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
-    return FileResponse(path=filename, filename=filename, media_type="text/plain")
+    headers = {
+        "Cache-Control": REPORT_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{urllib.parse.quote(filename)}"
+    }
+    # Aralık istekleri sıkıştırılmamış gösterim üzerinden yanıtlanır
+    encoding = None
+    if not request.headers.get("range"):
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), entry["encodings"])
+    if encoding is None:
+        return conditional_file_response(
+            request, entry["path"], entry["size"], entry["etag"], REPORT_MEDIA_TYPE, headers
+        )
+    headers["Content-Encoding"] = encoding
+    return conditional_file_response(
+        request,
+        report_store.variant_path(entry, encoding),
+        entry["encodings"][encoding],
+        # Her kodlamanın gövdesi farklı olduğundan ETag'i de farklıdır
+        entry["etag"][:-1] + f'-{encoding}"',
+        REPORT_MEDIA_TYPE,
+        headers
+    )
 
 @app.get("/categories/{page_id}", response_model=List[str])
 async def get_categories(page_id: int):
     """
     Belirtilen sayfanın kategorilerini döndürür
     """
-    wiki_service = WikipediaService()
-    categories = wiki_service.get_page_categories(page_id)
+    wiki_service = get_wiki_service()
+    categories = await wiki_service.get_page_categories(page_id)
     
     return categories
 
-@app.get("/images/{page_id}", response_model=List[Dict[str, str]])
-async def get_images(page_id: int):
+@app.get("/images/{page_id}", response_model=List[Dict[str, Any]])
+async def get_images(
+    page_id: int,
+    language: str = Query("tr", description="Dil kodu"),
+    thumb_width: Optional[int] = Query(None, ge=16, le=4096, description="Küçük resim genişliği (piksel)"),
+    mime_types: Optional[str] = Query(None, description="Virgülle ayrılmış MIME türleri veya 'photo'"),
+    limit: Optional[int] = Query(None, ge=1, description="En fazla resim sayısı")
+):
     """
-    Belirtilen sayfanın resimlerini döndürür
+    Belirtilen sayfanın resimlerini döndürür.
+    Resimler ve URL'leri toplu sorgularla alınır; MIME süzmesi ve küçük resim
+    boyutlandırması Wikipedia tarafında yapılır. Her resim için yerel küçük resim
+    vekilinin adresi (proxy_url) de döndürülür.
     """
-    wiki_service = WikipediaService()
-    images = wiki_service.get_page_images(page_id)
+    wiki_service = get_wiki_service(language=language)
+    mime_filter = None
+    if mime_types:
+        mime_filter = []
+        for mime_type in mime_types.split(","):
+            mime_type = mime_type.strip()
+            if mime_type == "photo":
+                mime_filter.extend(PHOTO_MIME_TYPES)
+            elif mime_type:
+                mime_filter.append(mime_type)
     
-    image_data = []
-    for img in images:
-        url = wiki_service.get_image_url(img)
-        if url:
-            image_data.append({
-                "title": img,
-                "url": url
-            })
+    images = await wiki_service.get_page_image_infos(page_id, limit, thumb_width, mime_filter)
+    proxy_width = thumbnail_width(thumb_width or THUMBNAIL_DEFAULT_WIDTH)
+    for image in images:
+        image["proxy_url"] = (
+            f"/thumbnail?title={urllib.parse.quote(image['title'])}"
+            f"&width={proxy_width}&language={language}"
+        )
+    return images
+
+
+def thumbnail_width(width):
+    """
+    İstenen genişliği THUMBNAIL_WIDTHS içindeki ilk büyük ya da eşit basamağa yuvarlar
+    """
+    for step in THUMBNAIL_WIDTHS:
+        if width <= step:
+            return step
+    return THUMBNAIL_WIDTHS[-1]
+
+
+def parse_byte_range(range_header, size):
+    """
+    Tek aralıklı "bytes=baş-son" Range başlığını çözer
+    :param range_header: Range başlığı
+    :param size: Dosya boyutu
+    :return: (başlangıç, bitiş) dahil aralık; başlık desteklenmiyorsa (çoklu aralık vb.) None
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None
+    start, _, end = ranges.strip().partition("-")
+    try:
+        if start:
+            start = int(start)
+            end = int(end) if end else size - 1
+        else:
+            # Son N bayt
+            start = max(size - int(end), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="İstenen aralık dosya boyutunun dışında",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+
+def choose_encoding(accept_encoding, available):
+    """
+    Accept-Encoding başlığına (q değerleriyle) göre mevcut kodlamalardan birini seçer;
+    eşit tercihte zstd gzip'e üstün tutulur
+    :param accept_encoding: Accept-Encoding başlığı
+    :param available: Mevcut kodlamalar (zstd, gzip)
+    :return: Seçilen kodlama, sıkıştırmasız gönderilecekse None
+    """
+    preferences = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        preferences[name] = quality
+    best = None
+    best_quality = 0.0
+    for encoding in REPORT_ENCODING_PREFERENCE:
+        if encoding not in available:
+            continue
+        quality = preferences.get(encoding, preferences.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def conditional_file_response(request, path, size, etag, media_type, headers=None, content=None):
+    """
+    Dosyayı ETag/If-None-Match (304) ve tek aralıklı Range/If-Range (206) desteğiyle gönderir
+    :param request: İstek
+    :param path: Dosya yolu (content verilmişse kullanılmaz)
+    :param size: Dosya boyutu (bayt)
+    :param etag: Dosyanın ETag değeri (tırnaklı)
+    :param media_type: İçerik türü
+    :param headers: Yanıta eklenecek diğer başlıklar
+    :param content: Dosya yerine gönderilecek, önceden okunmuş içerik baytları
+    :return: Yanıt
+    """
+    headers = dict(headers or {})
+    headers["ETag"] = etag
+    headers["Accept-Ranges"] = "bytes"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    ]):
+        return Response(status_code=304, headers=headers)
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = parse_byte_range(range_header, size)
+        if byte_range is not None:
+            start, end = byte_range
+            if content is not None:
+                body = content[start:end + 1]
+            else:
+                with open(path, "rb") as f:
+                    f.seek(start)
+                    body = f.read(end - start + 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            return Response(content=body, status_code=206, media_type=media_type, headers=headers)
+    
+    if content is not None:
+        return Response(content=content, media_type=media_type, headers=headers)
+    return FileResponse(path=path, media_type=media_type, headers=headers)
+
+
+@app.get("/thumbnail")
+async def get_thumbnail(
+    request: Request,
+    title: str = Query(..., description="Resim başlığı (File:örnek.jpg gibi)"),
+    width: int = Query(THUMBNAIL_DEFAULT_WIDTH, ge=16, le=4096, description="Küçük resim genişliği (piksel)"),
+    language: str = Query("tr", description="Dil kodu")
+):
+    """
+    Küçük resim vekili.
+    Resim istenen genişlikte bir kez indirilir ve boyut sınırlı disk önbelleğinde
+    saklanır; ETag, Cache-Control ve bayt aralığı (Range) istekleri desteklenir.
+    """
+    wiki_service = get_wiki_service(language=language)
+    try:
+        thumbnail = await wiki_service.get_thumbnail(title, thumbnail_width(width))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Küçük resim alınamadı: {str(e)}")
+    if thumbnail is None:
+        raise HTTPException(status_code=404, detail="Resim bulunamadı")
     
-    return image_data
+    # Dosya yolu yerine okunmuş içerik gönderilir: girdi yanıt sürerken önbellekten çıkarılabilir
+    entry, content = thumbnail
+    return conditional_file_response(
+        request, entry["path"], entry["size"], entry["etag"], entry["content_type"],
+        {"Cache-Control": THUMBNAIL_CACHE_CONTROL}, content=content
+    )
+
+@app.get("/pool/stats", response_model=Dict[str, Any])
+async def pool_stats():
+    """
+    Dil başına servis kaydının ve HTTP bağlantı havuzlarının istatistiklerini döndürür
+    (açılan bağlantı, istek, boştaki bağlantı ve yeniden kullanım oranı)
+    """
+    return app.state.wiki_services.get_stats()
+
+@app.get("/cache/stats", response_model=Dict[str, Any])
+async def cache_stats():
+    """
+    Sayfa içeriği, rehber özeti, küçük resim ve başlık çözümleme önbelleklerinin
+    isabet/ıskalama/çıkarma sayaçlarını döndürür
+    """
+    return {
+        "content": app.state.content_cache.get_stats(),
+        "summary": app.state.summary_cache.get_stats(),
+        "images": app.state.image_cache.get_stats(),
+        "titles": app.state.title_cache.get_stats(),
+        "search_index": app.state.search_index.get_stats(),
+        "keywords": app.state.keyword_index.get_stats(),
+        "reports": app.state.report_store.get_stats()
+    }
+
+def collect_cache_metrics():
+    """
+    Önbellek ve bağlantı havuzu sayaçlarını /metrics çıktısı için toplar
+    :return: MetricsRegistry.render için (ad, tür, açıklama, etiket adları, değerler) listesi
+    """
+    caches = {
+        "content": app.state.content_cache.get_stats(),
+        "summary": app.state.summary_cache.get_stats(),
+        "images": app.state.image_cache.get_stats(),
+        "titles": app.state.title_cache.get_stats(),
+        "keywords": app.state.keyword_index.get_stats()
+    }
+    # Anahtar kelime dizininde ıskalama, skorların yeniden hesaplanmasıdır
+    caches["keywords"]["misses"] = caches["keywords"]["recomputed"]
+    hits = [((name,), stats["hits"]) for name, stats in caches.items()]
+    misses = [((name,), stats["misses"]) for name, stats in caches.items()]
+    ratios = [
+        ((name,), stats["hits"] / (stats["hits"] + stats["misses"]) if stats["hits"] + stats["misses"] else 0.0)
+        for name, stats in caches.items()
+    ]
+    evictions = [((name,), stats["evictions"]) for name, stats in caches.items()]
+    pools = app.state.wiki_services.get_stats()
+    pool_hosts = [
+        ((language, host), host_stats)
+        for language, hosts in pools["languages"].items()
+        for host, host_stats in hosts.items()
+    ]
+    return [
+        ("wiki_cache_hits_total", "counter", "Önbellek isabetleri", ("cache",), hits),
+        ("wiki_cache_misses_total", "counter", "Önbellek ıskalamaları", ("cache",), misses),
+        ("wiki_cache_hit_ratio", "gauge", "Önbellek isabet oranı", ("cache",), ratios),
+        ("wiki_cache_evictions_total", "counter", "Önbellekten çıkarılan girdiler", ("cache",), evictions),
+        ("wiki_http_pool_connections_opened", "gauge", "Havuzda açılan bağlantılar", ("language", "host"),
+         [(labels, stats["opened"]) for labels, stats in pool_hosts]),
+        ("wiki_http_pool_connections_idle", "gauge", "Havuzda boştaki bağlantılar", ("language", "host"),
+         [(labels, stats["idle"]) for labels, stats in pool_hosts]),
+        ("wiki_http_pool_requests", "gauge", "Havuz üzerinden yapılan istekler", ("language", "host"),
+         [(labels, stats["requests"]) for labels, stats in pool_hosts])
+    ]
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Dış servis çağrıları (Wikipedia, Gemini), uç nokta gecikmeleri, devam eden
+    istekler, önbellek isabet oranları ve bağlantı havuzu metriklerini
+    Prometheus metin biçiminde döndürür
+    """
+    return Response(content=metrics.render(collect_cache_metrics()), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/traces/{trace_id}", response_model=Dict[str, Any])
+async def get_trace(
+    trace_id: str = Path(..., description="X-Wiki-Trace-Id yanıt başlığındaki izleme kimliği"),
+    format: str = Query("tree", description="tree: iç içe span ağacı, otlp: OpenTelemetry OTLP/JSON")
+):
+    """
+    X-Wiki-Trace: 1 başlığıyla yapılan bir isteğin span ağacını döndürür
+    (uç nokta -> servis metodu -> her Wikipedia/Gemini çağrısı, süreler ve önbellek olaylarıyla)
+    """
+    if format not in ("tree", "otlp"):
+        raise HTTPException(status_code=400, detail="Geçersiz biçim. Kullanılabilir biçimler: tree, otlp")
+    trace = app.state.trace_store.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="İz bulunamadı veya süresi doldu")
+    return trace.to_otlp() if format == "otlp" else trace.to_tree()
 
 @app.get("/related/{page_id}", response_model=List[Dict[str, Any]])
 async def get_related_pages(
@@ -790,72 +3132,55 @@ async def get_related_pages(
     limit: int = Query(5, ge=1, le=20)
 ):
     """
-    Belirtilen sayfayla ilgili diğer sayfaları döndürür
+    Belirtilen sayfayla ilgili diğer sayfaları döndürür.
+    Önce sayfanın ilk kategorisindeki sayfalar alınır; sınır dolmazsa kalan yer
+    sayfanın bağlantılarından (başlıklar toplu olarak sayfa ID'lerine çözülerek) doldurulur.
     """
-    wiki_service = WikipediaService()
+    wiki_service = get_wiki_service()
     
-    # Önce sayfa kategorilerini alalım
-    categories = wiki_service.get_page_categories(page_id)
+    categories = await wiki_service.get_page_categories(page_id)
     
-    if not categories:
-        return []
-    
-    # Sayfa başlığını alalım
-    params = {
-        "action": "query",
-        "format": "json",
-        "prop": "info",
-        "pageids": page_id,
-        "inprop": "url|displaytitle"
-    }
-    
-    response = requests.get(wiki_service.base_url, params=params)
-    data = response.json()
-    
-    title = ""
-    if "query" in data and "pages" in data["query"]:
-        page_data = data["query"]["pages"].get(str(page_id))
-        if page_data:
-            title = page_data.get("title", "")
-    
-    # İlgili sayfaları bulmak için kategori tabanlı bir sorgu oluşturalım
-    # En ilgili kategoriden bir tane seçelim
+    related_pages = []
+    seen = {page_id}
     if categories:
-        main_category = categories[0]
-        
-        # Kategoriye ait sayfaları alalım
-        params = {
-            "action": "query",
-            "format": "json",
-            "list": "categorymembers",
-            "cmtitle": f"Kategori:{main_category}",
-            "cmlimit": limit + 1,  # Kendisi de listede olabilir
-            "cmtype": "page"
-        }
-        
-        response = requests.get(wiki_service.base_url, params=params)
-        data = response.json()
-        
-        related_pages = []
-        if "query" in data and "categorymembers" in data["query"]:
-            for member in data["query"]["categorymembers"]:
-                # Kendisini hariç tutalım
-                if member["pageid"] != page_id:
-                    related_pages.append({
-                        "title": member["title"],
-                        "page_id": member["pageid"],
-                        "url": wiki_service.get_page_url(member["title"])
-                    })
-                    
-                    if len(related_pages) >= limit:
-                        break
-        
-        return related_pages
+        # İlgili sayfaları bulmak için en ilgili kategoriden bir tane seçelim
+        # (sayfanın kendisi de listede olabilir)
+        members = await wiki_service.get_category_members(categories[0], limit + 1)
+        for member in members:
+            if member["pageid"] in seen:
+                continue
+            seen.add(member["pageid"])
+            related_pages.append({
+                "title": member["title"],
+                "page_id": member["pageid"],
+                "url": wiki_service.get_page_url(member["title"]),
+                "source": "category"
+            })
+            if len(related_pages) >= limit:
+                return related_pages
     
-    return []
+    links = await wiki_service.get_page_links(page_id, CRAWL_LINKS_PER_PAGE)
+    if links:
+        resolved = await wiki_service.resolve_titles(links)
+        for title in links:
+            page = resolved.get(title)
+            if page is None or page["pageid"] in seen:
+                continue
+            seen.add(page["pageid"])
+            related_pages.append({
+                "title": page["title"],
+                "page_id": page["pageid"],
+                "url": wiki_service.get_page_url(page["title"]),
+                "source": "links"
+            })
+            if len(related_pages) >= limit:
+                break
+    
+    return related_pages
 
 @app.get("/advanced-search", response_model=Dict[str, Any])
 async def advanced_search(
+    background_tasks: BackgroundTasks,
     query: str = Query(..., description="Arama sorgusu"),
     language: str = Query("tr", description="Dil kodu"),
     exact_phrase: Optional[str] = Query(None, description="Tam olarak bu cümle"),
@@ -863,13 +3188,14 @@ async def advanced_search(
     date_start: Optional[str] = Query(None, description="Başlangıç tarihi (YYYY-MM-DD)"),
     date_end: Optional[str] = Query(None, description="Bitiş tarihi (YYYY-MM-DD)"),
     category: Optional[str] = Query(None, description="Kategori"),
+    category_match: str = Query("substring", description="Kategori eşleşme modu (exact, substring)"),
     min_words: int = Query(0, ge=0, description="Minimum kelime sayısı"),
     limit: int = Query(10, ge=1, le=50, description="Sonuç sınırı")
 ):
     """
     Gelişmiş arama seçenekleri sunar
     """
-    wiki_service = WikipediaService(language=language)
+    wiki_service = get_wiki_service(language=language)
     
     # Gelişmiş sorgu oluştur
     advanced_query = query
@@ -892,42 +3218,33 @@ async def advanced_search(
         if date_range != "/":
             advanced_query += f" {date_range}"
     
-    # Temel aramayı yap
-    results = wiki_service.search(
+    # Temel aramayı yap, kategori filtresi (eğer belirtilmişse) arama içinde
+    # zenginleştirmede alınan kategorilerle uygulanır
+    results = await wiki_service.search(
         query=advanced_query,
         limit=limit,
-        min_words=min_words
+        min_words=min_words,
+        categories=[category] if category else None,
+        category_match=category_match
     )
     
-    # Kategori filtresi uygula (eğer belirtilmişse)
-    if category and results:
-        filtered_results = []
-        for result in results:
-            result_categories = wiki_service.get_page_categories(result["pageid"])
-            if any(category.lower() in cat.lower() for cat in result_categories):
-                filtered_results.append(result)
-        results = filtered_results
-    
-    # Dosya adını otomatik oluştur
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_query = re.sub(r'[^\w\s-]', '', query).strip().replace(' ', '_')
-    if not safe_query:
-        safe_query = "wiki_search"
-    output_file = f"advanced_{safe_query}_{timestamp}.txt"
-    
+    output_file = None
     if results:
-        output_file = wiki_service.save_results_to_file(advanced_query, results, output_file)
+        output_file = wiki_service.schedule_report(
+            background_tasks, advanced_query, results, wiki_service.report_file_name(query, prefix="advanced_")
+        )
     
     return {
         "query": advanced_query,
         "original_query": query,
         "results_count": len(results),
         "results": results,
-        "output_file": output_file if results else None
+        "output_file": output_file
     }
 
 @app.get("/topic-search", response_model=Dict[str, Any])
 async def topic_search(
+    background_tasks: BackgroundTasks,
     topic: str = Query(..., description="Araştırılacak konu"),
     depth: int = Query(2, ge=1, le=3, description="Araştırma derinliği"),
     language: str = Query("tr", description="Dil kodu"),
@@ -935,105 +3252,110 @@ async def topic_search(
 ):
     """
     Belirli bir konu hakkında derinlemesine araştırma yapar.
-    Ana sayfaları ve bağlantılı alt konuları araştırır.
+    Ana sayfaları ve bağlantılı alt konuları (depth derinliğe kadar) paralel
+    ve tekrarsız bir tarama ile araştırır; tarama istatistiklerini döndürür.
     """
-    wiki_service = WikipediaService(language=language)
+    wiki_service = get_wiki_service(language=language)
     
     # Ana sayfaları bul
-    main_results = wiki_service.search(query=topic, limit=limit)
+    main_results = await wiki_service.search(query=topic, limit=limit)
     
     if not main_results:
         return {
             "topic": topic,
             "main_pages": [],
             "related_topics": [],
-            "output_file": None
+            "output_file": None,
+            "crawl_stats": None
         }
     
+    crawler = TopicCrawler(wiki_service, depth)
     main_pages = []
     related_topics = []
     all_results = []
+    async for kind, page, result, order in crawler.crawl(main_results):
+        if kind == "main_page":
+            main_pages.append((order, page))
+        else:
+            related_topics.append((order, page))
+        all_results.append((order, result))
     
-    # Her bir ana sayfa için
-    for result in main_results:
-        page_id = result["pageid"]
-        title = result["title"]
-        
-        page_content = wiki_service.get_page_content(page_id)
-        categories = wiki_service.get_page_categories(page_id)
-        url = wiki_service.get_page_url(title)
-        
-        main_page = {
-            "title": title,
-            "page_id": page_id,
-            "url": url,
-            "categories": categories[:5],  # İlk 5 kategori
-            "summary": page_content.split("\n\n")[0] if page_content else ""
-        }
-        
-        main_pages.append(main_page)
-        all_results.append(result)
-        
-        # Alt konuları (bağlantılı sayfaları) bul (derinlik 1)
-        if depth >= 2:
-            params = {
-                "action": "query",
-                "format": "json",
-                "prop": "links",
-                "pageids": page_id,
-                "plnamespace": 0,
-                "pllimit": 10
-            }
-            
-            response = requests.get(wiki_service.base_url, params=params)
-            data = response.json()
-            
-            related_page_titles = []
-            if "query" in data and "pages" in data["query"]:
-                page_data = data["query"]["pages"].get(str(page_id))
-                if page_data and "links" in page_data:
-                    for link in page_data["links"]:
-                        related_page_titles.append(link["title"])
-            
-            # Her bir bağlantılı başlık için arama yap
-            for related_title in related_page_titles[:3]:  # İlk 3 bağlantılı başlık
-                related_results = wiki_service.search(query=related_title, limit=1)
-                
-                if related_results:
-                    related_result = related_results[0]
-                    related_id = related_result["pageid"]
-                    
-                    related_content = wiki_service.get_page_content(related_id)
-                    related_url = wiki_service.get_page_url(related_title)
-                    
-                    related_topic = {
-                        "title": related_title,
-                        "page_id": related_id,
-                        "url": related_url,
-                        "summary": related_content.split("\n\n")[0] if related_content else "",
-                        "main_topic": title
-                    }
-                    
-                    related_topics.append(related_topic)
-                    all_results.append(related_result)
-    
-    # Dosya adını otomatik oluştur
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_topic = re.sub(r'[^\w\s-]', '', topic).strip().replace(' ', '_')
-    if not safe_topic:
-        safe_topic = "topic_search"
-    output_file = f"topic_{safe_topic}_{timestamp}.txt"
+    # Sayfalar tamamlanma sırasıyla gelir; yanıtta arama ve bağlantı sırasına dizelim
+    main_pages = [page for _, page in sorted(main_pages, key=lambda item: item[0])]
+    related_topics = [page for _, page in sorted(related_topics, key=lambda item: item[0])]
+    all_results = [result for _, result in sorted(all_results, key=lambda item: item[0])]
     
+    output_file = None
     if all_results:
-        output_file = wiki_service.save_results_to_file(f"Konu Araştırması: {topic}", all_results, output_file)
+        output_file = wiki_service.schedule_report(
+            background_tasks, f"Konu Araştırması: {topic}", all_results, _topic_output_file(topic)
+        )
     
     return {
         "topic": topic,
         "main_pages": main_pages,
         "related_topics": related_topics,
-        "output_file": output_file
+        "output_file": output_file,
+        "crawl_stats": crawler.get_stats()
     }
 
+@app.get("/topic-search/stream")
+async def topic_search_stream(
+    background_tasks: BackgroundTasks,
+    topic: str = Query(..., description="Araştırılacak konu"),
+    depth: int = Query(2, ge=1, le=3, description="Araştırma derinliği"),
+    language: str = Query("tr", description="Dil kodu"),
+    limit: int = Query(5, ge=1, le=10, description="Ana başlık sayısı"),
+    stream_format: str = Query("ndjson", alias="format", description="Akış biçimi (ndjson, sse)")
+):
+    """
+    /topic-search ile aynı araştırmayı yapar; her ana sayfa ve alt konu
+    araştırması biter bitmez gönderilir. Son çerçeve (summary) toplamları ve
+    tarama istatistiklerini içerir.
+    """
+    check_stream_format(stream_format)
+    wiki_service = get_wiki_service(language=language)
+    
+    async def frames():
+        crawler = TopicCrawler(wiki_service, depth)
+        main_count = 0
+        related_count = 0
+        all_results = []
+        # Ana sayfalar bulundukça taramaya eklenir
+        roots = wiki_service.iter_search(query=topic, limit=limit)
+        async for kind, page, result, _ in crawler.crawl(roots):
+            if kind == "main_page":
+                main_count += 1
+            else:
+                related_count += 1
+            all_results.append(result)
+            yield format_stream_frame(kind, page, stream_format)
+        
+        output_file = None
+        if all_results:
+            output_file = wiki_service.schedule_report(
+                background_tasks, f"Konu Araştırması: {topic}", all_results, _topic_output_file(topic)
+            )
+        yield format_stream_frame("summary", {
+            "topic": topic,
+            "main_pages_count": main_count,
+            "related_topics_count": related_count,
+            "output_file": output_file,
+            "crawl_stats": crawler.get_stats()
+        }, stream_format)
+    
+    return StreamingResponse(frames(), media_type=STREAM_MEDIA_TYPES[stream_format])
+
+def _topic_output_file(topic):
+    """
+    Konu araştırması için zaman damgalı dosya adı oluşturur
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_topic = re.sub(r'[^\w\s-]', '', topic).strip().replace(' ', '_')
+    if not safe_topic:
+        safe_topic = "topic_search"
+    return f"topic_{safe_topic}_{timestamp}.txt"
+
 # Uygulamayı çalıştırma
 if __name__ == "__main__":
     import uvicorn